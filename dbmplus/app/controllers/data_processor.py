@@ -18,11 +18,11 @@ from datetime import timedelta
 from ..utils import (
     get_logger, config, ensure_directory, 
     load_csv, find_header_row, save_df_to_csv,
-    convert_to_binary, flip_data, apply_mask,
-    calculate_loss_points, plot_basemap, 
-    plot_lossmap, plot_fpy_map, plot_fpy_bar,
+    convert_to_binary, ensure_categorical, flip_data, apply_mask,
+    calculate_loss_points, calculate_loss_chain, plot_basemap, 
+    plot_lossmap, plot_fpy_map, plot_fpy_bar, submit_plot, render_plots,
     check_csv_alignment, remove_header_and_rename,
-    AOI_FILENAME_PATTERN, PROCESSED_FILENAME_PATTERN,
+    AOI_FILENAME_PATTERN, PROCESSED_FILENAME_PATTERN, MAP_COLUMNS, MAP_DTYPES,
     extract_component_from_filename
 )
 from ..models import (
@@ -82,6 +82,7 @@ class ProcessingTask:
 # 任務回調信號器類
 class TaskSignaler(QObject):
     """用於在線程間安全傳遞信號的類"""
+    progress_updated = Signal(str, str)  # task_id, 進度訊息
     task_completed = Signal(str, bool, str)
 
 
@@ -837,10 +838,13 @@ class DataProcessor:
                 plot_path = Path(rule.get("plot", ""))
             
             # 讀取 CSV 資料
-            df = load_csv(component.csv_path)
+            df = load_csv(component.csv_path, usecols=MAP_COLUMNS, dtypes=MAP_DTYPES)
             if df is None:
                 return False, "讀取處理後的CSV失敗"
             
+            # DefectType 在繪圖時會多次分組與比較，先轉為類別型
+            df = ensure_categorical(df)
+            
             # 應用遮罩
             mask_rules = []
             if mask_path.exists():
@@ -930,6 +934,9 @@ class DataProcessor:
             lot_obj = db_manager.get_lot(lot_id)
             original_lot_id = lot_obj.original_lot_id
             
+            # 已提交到繪圖進程池的 (元件, 輸出路徑, Future)
+            pending_plots = []
+            
             for component in components:
                 # 獲取對應的前站元件
                 prev_component = db_manager.get_component(lot_id, prev_station, component.component_id)
@@ -950,8 +957,8 @@ class DataProcessor:
                     continue
                     
                 # 讀取當前站與前站CSV
-                df_curr = load_csv(component.csv_path)
-                df_prev = load_csv(prev_component.csv_path)
+                df_curr = load_csv(component.csv_path, usecols=MAP_COLUMNS, dtypes=MAP_DTYPES)
+                df_prev = load_csv(prev_component.csv_path, usecols=MAP_COLUMNS, dtypes=MAP_DTYPES)
                 
                 if df_curr is None or df_prev is None:
                     logger.warning(f"讀取CSV失敗: {component.component_id}")
@@ -987,9 +994,20 @@ class DataProcessor:
                 ensure_directory(output_dir)
                 output_path = output_dir / f"{component.component_id}.png"
                 
-                # 生成圖像
-                if plot_lossmap(status_points, str(output_path)):
-                    # 更新元件資訊
+                # 提交到繪圖進程池，繼續處理下一個元件
+                pending_plots.append(
+                    (component, output_path, submit_plot(plot_lossmap, status_points, str(output_path)))
+                )
+            
+            # 收集繪圖結果並更新元件資訊
+            for component, output_path, future in pending_plots:
+                try:
+                    plotted = future.result()
+                except Exception as e:
+                    logger.error(f"生成Lossmap圖像失敗 {component.component_id}: {e}")
+                    plotted = False
+                
+                if plotted:
                     component.lossmap_path = str(output_path)
                     db_manager.update_component(component)
                     success_count += 1
@@ -1054,6 +1072,10 @@ class DataProcessor:
             current_station_flip = self.flip_config.get(station, False)
             prev_station_flip_config = {ps: self.flip_config.get(ps, False) for ps in prev_stations}
             
+            # 待繪製的 (元件, 輸出路徑) 與對應的繪圖工作，全部元件處理完後一次交給繪圖進程池
+            plot_targets = []
+            plot_jobs = []
+            
             for component in components:
                 # 檢查CSV是否存在
                 if not component.csv_path or not Path(component.csv_path).exists():
@@ -1069,7 +1091,7 @@ class DataProcessor:
                     continue
                 
                 # 讀取當前站CSV
-                df_curr = load_csv(component.csv_path)
+                df_curr = load_csv(component.csv_path, usecols=MAP_COLUMNS, dtypes=MAP_DTYPES)
                 if df_curr is None:
                     logger.warning(f"讀取CSV失敗: {component.component_id}")
                     fail_count += 1
@@ -1081,7 +1103,6 @@ class DataProcessor:
                 
                 # 轉換為二進制格式
                 df_curr_bin = convert_to_binary(df_curr)
-                df_curr_bin = df_curr_bin.rename(columns={"binary": f"binary_{station}"})
                 
                 # 準備合併前站資料
                 all_dfs = [df_curr_bin]
@@ -1099,7 +1120,7 @@ class DataProcessor:
                         logger.warning(f"跳過前站非處理後格式的CSV: {prev_csv_filename}")
                         continue
                     
-                    df_prev = load_csv(prev_component.csv_path)
+                    df_prev = load_csv(prev_component.csv_path, usecols=MAP_COLUMNS, dtypes=MAP_DTYPES)
                     if df_prev is None:
                         continue
                     
@@ -1109,28 +1130,15 @@ class DataProcessor:
                     
                     # 轉換為二進制格式
                     df_prev_bin = convert_to_binary(df_prev)
-                    df_prev_bin = df_prev_bin.rename(columns={"binary": f"binary_{prev_station}"})
                     
                     all_dfs.append(df_prev_bin)
                 
                 # 合併所有站點資料
                 if len(all_dfs) == 1:
                     logger.warning(f"元件只有當前站資料: {component.component_id}")
-                    # 僅有當前站資料的情況
-                    merged_df = all_dfs[0]
-                    merged_df["CombinedDefectType"] = merged_df[f"binary_{station}"]
-                else:
-                    # 合併所有站點資料
-                    merged_df = all_dfs[0]
-                    for df in all_dfs[1:]:
-                        merged_df = pd.merge(merged_df, df, on=["Col", "Row"], how="outer")
-                    
-                    # 填充缺失值
-                    merged_df = merged_df.fillna(0)
-                    
-                    # 計算綜合缺陷類型 (1代表全部站均為良品)
-                    binary_cols = [col for col in merged_df.columns if col.startswith("binary_")]
-                    merged_df["CombinedDefectType"] = merged_df[binary_cols].min(axis=1)
+                
+                # 一次合併所有站點並計算綜合缺陷類型 (1代表全部站均為良品)
+                merged_df = calculate_loss_chain(all_dfs)
                 
                 # 計算 FPY 數值
                 fpy = merged_df["CombinedDefectType"].mean() * 100
@@ -1147,9 +1155,12 @@ class DataProcessor:
                 ensure_directory(output_dir)
                 output_path = output_dir / f"{component.component_id}.png"
                 
-                # 生成圖像
-                if plot_fpy_map(merged_df, str(output_path)):
-                    # 更新元件資訊
+                plot_targets.append((component, output_path))
+                plot_jobs.append((plot_fpy_map, merged_df, str(output_path)))
+            
+            # 平行生成圖像並更新元件資訊
+            for (component, output_path), plotted in zip(plot_targets, render_plots(plot_jobs)):
+                if plotted:
                     component.fpy_path = str(output_path)
                     db_manager.update_component(component)
                     success_count += 1
@@ -1252,7 +1263,7 @@ class DataProcessor:
                         return False, None
                     
                     # 讀取當前站CSV
-                    df_curr = load_csv(component.csv_path)
+                    df_curr = load_csv(component.csv_path, usecols=MAP_COLUMNS, dtypes=MAP_DTYPES)
                     if df_curr is None:
                         logger.warning(f"讀取CSV失敗: {component.component_id}")
                         return False, None
@@ -1263,7 +1274,6 @@ class DataProcessor:
                     
                     # 轉換為二進制格式
                     df_curr_bin = convert_to_binary(df_curr)
-                    df_curr_bin = df_curr_bin.rename(columns={"binary": f"binary_{station}"})
                     
                     # 準備合併前站資料
                     all_dfs = [df_curr_bin]
@@ -1281,7 +1291,7 @@ class DataProcessor:
                             logger.warning(f"跳過前站非處理後格式的CSV: {prev_csv_filename}")
                             continue
                         
-                        df_prev = load_csv(prev_component.csv_path)
+                        df_prev = load_csv(prev_component.csv_path, usecols=MAP_COLUMNS, dtypes=MAP_DTYPES)
                         if df_prev is None:
                             continue
                         
@@ -1291,27 +1301,11 @@ class DataProcessor:
                         
                         # 轉換為二進制格式
                         df_prev_bin = convert_to_binary(df_prev)
-                        df_prev_bin = df_prev_bin.rename(columns={"binary": f"binary_{prev_station}"})
                         
                         all_dfs.append(df_prev_bin)
                     
-                    # 合併所有站點資料
-                    if len(all_dfs) == 1:
-                        # 僅有當前站資料的情況
-                        merged_df = all_dfs[0]
-                        merged_df["CombinedDefectType"] = merged_df[f"binary_{station}"]
-                    else:
-                        # 合併所有站點資料
-                        merged_df = all_dfs[0]
-                        for df in all_dfs[1:]:
-                            merged_df = pd.merge(merged_df, df, on=["Col", "Row"], how="outer")
-                        
-                        # 填充缺失值
-                        merged_df = merged_df.fillna(0)
-                        
-                        # 計算綜合缺陷類型 (1代表全部站均為良品)
-                        binary_cols = [col for col in merged_df.columns if col.startswith("binary_")]
-                        merged_df["CombinedDefectType"] = merged_df[binary_cols].min(axis=1)
+                    # 一次合併所有站點並計算綜合缺陷類型 (1代表全部站均為良品)
+                    merged_df = calculate_loss_chain(all_dfs)
                     
                     # 計算 FPY 數值
                     fpy = merged_df["CombinedDefectType"].mean() * 100
@@ -1469,6 +1463,7 @@ class DataProcessor:
             
         task = self.active_tasks[task_id]
         task.start()
+        self.signaler.progress_updated.emit(task_id, task.task_type)
         
         logger.info(f"開始執行任務: {task_id} ({task.task_type})")
         
@@ -3,13 +3,14 @@
 """
 import os
 import shutil
+import logging
 import threading
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict
 from datetime import datetime, timedelta
 from queue import Queue
 
-from ..utils import get_logger, config
+from ..utils import get_logger, log_lazy, config
 from ..models import db_manager
 from ..utils.storage_monitor import StorageMonitor
 
@@ -44,8 +45,8 @@ class StorageMoveManager:
             target_dir = os.path.dirname(target)
             os.makedirs(target_dir, exist_ok=True)
             
-            # 檢查目標硬碟空間
-            target_usage = self.monitor.get_disk_usage(target_dir)
+            # 檢查目標硬碟空間，移動會持續消耗空間，不使用快取結果
+            target_usage = self.monitor.get_disk_usage(target_dir, max_age=0)
             if target_usage and target_usage['free_gb'] < (os.path.getsize(source) / (1024**3)):
                 return False, "目標硬碟空間不足"
             
@@ -182,8 +183,9 @@ class StorageMoveManager:
                                             file_type
                                         ))
                                     
-                                    logger.debug(f"找到舊檔案組件: {product_id}/{lot_id}/{station}/{component_id}, "
-                                               f"檔案數量: {len(files)}, 最舊檔案: {oldest_time.strftime('%Y-%m-%d')}")
+                                    log_lazy("storage_manager", logging.DEBUG,
+                                             "找到舊檔案組件: %s/%s/%s/%s, 檔案數量: %d, 最舊檔案: %s",
+                                             product_id, lot_id, station, component_id, len(files), oldest_time.date())
         
         except Exception as e:
             logger.error(f"掃描文件系統時發生錯誤: {e}")
@@ -447,9 +449,9 @@ class StorageMoveManager:
             # 修復：正確解包6個值
             source_path, component_id, lot_id, station, product, file_type = file_tuple
             
-            logger.debug(f"處理檔案: {component_id} - {os.path.basename(source_path)}")
-            logger.debug(f"  路徑: {source_path}")
-            logger.debug(f"  組件: {component_id}, 批次: {lot_id}, 站點: {station}, 產品: {product}")
+            log_lazy("storage_manager", logging.DEBUG, "處理檔案: %s - %s", component_id, os.path.basename(source_path))
+            log_lazy("storage_manager", logging.DEBUG, "  路徑: %s", source_path)
+            log_lazy("storage_manager", logging.DEBUG, "  組件: %s, 批次: %s, 站點: %s, 產品: %s", component_id, lot_id, station, product)
             
             component_key = f"{component_id}_{lot_id}_{station}_{product}"
             if component_key not in component_groups:
@@ -518,9 +520,9 @@ class StorageMoveManager:
             # 修復：正確解包6個值
             source_path, component_id, lot_id, station, product, file_type = file_tuple
             
-            logger.debug(f"處理檔案: {component_id} - {os.path.basename(source_path)}")
-            logger.debug(f"  路徑: {source_path}")
-            logger.debug(f"  組件: {component_id}, 批次: {lot_id}, 站點: {station}, 產品: {product}")
+            log_lazy("storage_manager", logging.DEBUG, "處理檔案: %s - %s", component_id, os.path.basename(source_path))
+            log_lazy("storage_manager", logging.DEBUG, "  路徑: %s", source_path)
+            log_lazy("storage_manager", logging.DEBUG, "  組件: %s, 批次: %s, 站點: %s, 產品: %s", component_id, lot_id, station, product)
             
             component_key = f"{component_id}_{lot_id}_{station}_{product}"
             if component_key not in component_groups:
@@ -4,6 +4,8 @@
 import os
 import json
 import uuid
+import threading
+import concurrent.futures
 from pathlib import Path
 from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
@@ -15,6 +17,12 @@ from .data_models import ProductInfo, LotInfo, ComponentInfo
 
 logger = get_logger("database_manager")
 
+# 快取檔案中以相對於資料庫基礎目錄保存的路徑欄位
+CACHED_PATH_FIELDS = (
+    "org_path", "roi_path", "csv_path", "original_csv_path",
+    "basemap_path", "lossmap_path", "fpy_path"
+)
+
 
 class DatabaseManager:
     """數據庫管理器，處理檔案系統上的數據存取"""
@@ -42,6 +50,10 @@ class DatabaseManager:
             "lot_keys": {}  # 添加批次鍵映射字典
         }
         self.cache_file = Path(__file__).parent.parent.parent / "data" / "db_cache.json"
+        self._scan_executor = None
+        self._scan_future = None
+        # 保護 _scan_executor/_scan_future 的替換，多個執行緒同時等待掃描時只由一個負責關閉
+        self._scan_lock = threading.Lock()
         
         # 確保資料庫目錄存在
         if not self.base_path.exists():
@@ -55,97 +67,195 @@ class DatabaseManager:
         self._load_cache()
     
     def _load_cache(self):
-        """載入快取檔案"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                    
-                # 恢復產品信息
-                for product_data in cache_data.get("products", []):
-                    product = ProductInfo(
-                        product_id=product_data["product_id"],
-                        lots=product_data.get("lots", []),
-                        description=product_data.get("description"),
-                        created_at=datetime.fromisoformat(product_data.get("created_at", datetime.now().isoformat())),
-                        modified_at=datetime.fromisoformat(product_data.get("modified_at", datetime.now().isoformat()))
-                    )
-                    self.data_cache["products"][product.product_id] = product
-                
-                # 恢復批次信息
-                for lot_data in cache_data.get("lots", []):
-                    # 獲取原始批次ID，如果不存在則使用lot_id
-                    original_lot_id = lot_data.get("original_lot_id", lot_data["lot_id"])
-                    
-                    lot = LotInfo(
-                        lot_id=lot_data["lot_id"],
-                        product_id=lot_data["product_id"],
-                        original_lot_id=original_lot_id,
-                        stations=lot_data.get("stations", []),
-                        description=lot_data.get("description"),
-                        created_at=datetime.fromisoformat(lot_data.get("created_at", datetime.now().isoformat())),
-                        modified_at=datetime.fromisoformat(lot_data.get("modified_at", datetime.now().isoformat()))
-                    )
-                    self.data_cache["lots"][lot.lot_id] = lot
-                    
-                    # 建立批次映射關係，確保能夠通過 product_id + original_lot_id 找到唯一批次ID
-                    lot_key = f"{lot.product_id}_{original_lot_id}"
-                    self.data_cache["lot_keys"][lot_key] = lot.lot_id
-                
-                # 恢復元件信息
-                for comp_data in cache_data.get("components", []):
-                    component = ComponentInfo(
-                        component_id=comp_data["component_id"],
-                        lot_id=comp_data["lot_id"],
-                        station=comp_data["station"],
-                        original_filename=comp_data.get("original_filename"),
-                        processed_filename=comp_data.get("processed_filename"),
-                        org_path=comp_data.get("org_path"),
-                        csv_path=comp_data.get("csv_path"),
-                        original_csv_path=comp_data.get("original_csv_path"),
-                        basemap_path=comp_data.get("basemap_path"),
-                        lossmap_path=comp_data.get("lossmap_path"),
-                        fpy_path=comp_data.get("fpy_path"),
-                        defect_stats=comp_data.get("defect_stats", {}),
-                        created_at=datetime.fromisoformat(comp_data.get("created_at", datetime.now().isoformat())),
-                        modified_at=datetime.fromisoformat(comp_data.get("modified_at", datetime.now().isoformat()))
-                    )
-                    
-                    # 獲取批次信息
-                    lot = self.data_cache["lots"].get(component.lot_id)
-                    if lot:
-                        # 使用批次的產品ID建立組件鍵
-                        key = f"{lot.product_id}_{component.lot_id}_{component.station}_{component.component_id}"
-                        self.data_cache["components"][key] = component
-                    else:
-                        # 如果找不到批次，記錄警告並嘗試用舊格式保存（向後兼容）
-                        logger.warning(f"載入快取時找不到批次 {component.lot_id}，組件: {component.component_id}")
-                        key = f"{component.lot_id}_{component.station}_{component.component_id}"
-                        self.data_cache["components"][key] = component
-                
-                # 恢復lot_keys映射（如果存在）
-                if "lot_keys" in cache_data:
-                    self.data_cache["lot_keys"] = cache_data["lot_keys"]
-                
-                logger.info(f"已載入資料庫快取: {len(self.data_cache['products'])} 產品, "
-                           f"{len(self.data_cache['lots'])} 批次, "
-                           f"{len(self.data_cache['components'])} 元件")
-            except Exception as e:
-                logger.error(f"載入快取檔案失敗: {e}")
-                # 如果讀取失敗，則重新掃描
-                self.scan_database()
-        else:
-            # 快取不存在，執行掃描
-            logger.info("快取檔案不存在，將掃描資料庫")
+        """載入快取檔案
+
+        只有在快取檔案無法讀取或 JSON 整體損毀時才重新掃描資料庫；
+        個別損毀的紀錄會被跳過並在最後統一記錄。
+        """
+        if not self.cache_file.exists():
+            # 快取不存在，於背景執行掃描，不阻塞啟動流程
+            logger.info("快取檔案不存在，將在背景掃描資料庫")
+            self._start_background_scan()
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"載入快取檔案失敗: {e}")
+            # 如果讀取失敗，則重新掃描
+            self.scan_database()
+            return
+
+        if not isinstance(cache_data, dict):
+            logger.error(f"快取檔案格式錯誤: {self.cache_file}")
             self.scan_database()
+            return
+
+        skipped = 0
+        # 新版快取的路徑欄位以相對於 base_path 的形式保存
+        cache_base = cache_data.get("base_path")
+
+        # 恢復產品信息
+        for product_data in cache_data.get("products", []):
+            try:
+                product = ProductInfo(
+                    product_id=product_data["product_id"],
+                    lots=product_data.get("lots", []),
+                    description=product_data.get("description"),
+                    created_at=datetime.fromisoformat(product_data.get("created_at", datetime.now().isoformat())),
+                    modified_at=datetime.fromisoformat(product_data.get("modified_at", datetime.now().isoformat()))
+                )
+            except (KeyError, TypeError, ValueError, AttributeError):
+                skipped += 1
+                continue
+            self.data_cache["products"][product.product_id] = product
+
+        # 恢復批次信息
+        for lot_data in cache_data.get("lots", []):
+            try:
+                # 獲取原始批次ID，如果不存在則使用lot_id
+                original_lot_id = lot_data.get("original_lot_id", lot_data["lot_id"])
+
+                lot = LotInfo(
+                    lot_id=lot_data["lot_id"],
+                    product_id=lot_data["product_id"],
+                    original_lot_id=original_lot_id,
+                    stations=lot_data.get("stations", []),
+                    description=lot_data.get("description"),
+                    created_at=datetime.fromisoformat(lot_data.get("created_at", datetime.now().isoformat())),
+                    modified_at=datetime.fromisoformat(lot_data.get("modified_at", datetime.now().isoformat()))
+                )
+            except (KeyError, TypeError, ValueError, AttributeError):
+                skipped += 1
+                continue
+            self.data_cache["lots"][lot.lot_id] = lot
+
+            # 建立批次映射關係，確保能夠通過 product_id + original_lot_id 找到唯一批次ID
+            lot_key = f"{lot.product_id}_{original_lot_id}"
+            self.data_cache["lot_keys"][lot_key] = lot.lot_id
+
+        # 恢復元件信息
+        for comp_data in cache_data.get("components", []):
+            try:
+                component = ComponentInfo(
+                    component_id=comp_data["component_id"],
+                    lot_id=comp_data["lot_id"],
+                    station=comp_data["station"],
+                    original_filename=comp_data.get("original_filename"),
+                    processed_filename=comp_data.get("processed_filename"),
+                    org_path=self._from_cache_path(comp_data.get("org_path"), cache_base),
+                    roi_path=self._from_cache_path(comp_data.get("roi_path"), cache_base),
+                    csv_path=self._from_cache_path(comp_data.get("csv_path"), cache_base),
+                    original_csv_path=self._from_cache_path(comp_data.get("original_csv_path"), cache_base),
+                    basemap_path=self._from_cache_path(comp_data.get("basemap_path"), cache_base),
+                    lossmap_path=self._from_cache_path(comp_data.get("lossmap_path"), cache_base),
+                    fpy_path=self._from_cache_path(comp_data.get("fpy_path"), cache_base),
+                    defect_stats=comp_data.get("defect_stats", {}),
+                    created_at=datetime.fromisoformat(comp_data.get("created_at", datetime.now().isoformat())),
+                    modified_at=datetime.fromisoformat(comp_data.get("modified_at", datetime.now().isoformat()))
+                )
+            except (KeyError, TypeError, ValueError, AttributeError):
+                skipped += 1
+                continue
+
+            # 獲取批次信息
+            lot = self.data_cache["lots"].get(component.lot_id)
+            if lot:
+                # 使用批次的產品ID建立組件鍵
+                key = f"{lot.product_id}_{component.lot_id}_{component.station}_{component.component_id}"
+                self.data_cache["components"][key] = component
+            else:
+                # 如果找不到批次，記錄警告並嘗試用舊格式保存（向後兼容）
+                logger.warning(f"載入快取時找不到批次 {component.lot_id}，組件: {component.component_id}")
+                key = f"{component.lot_id}_{component.station}_{component.component_id}"
+                self.data_cache["components"][key] = component
+
+        # 恢復lot_keys映射（如果存在）
+        if isinstance(cache_data.get("lot_keys"), dict):
+            self.data_cache["lot_keys"] = cache_data["lot_keys"]
+
+        if skipped:
+            logger.warning(f"載入快取時跳過 {skipped} 筆損毀的紀錄")
+
+        logger.info(f"已載入資料庫快取: {len(self.data_cache['products'])} 產品, "
+                   f"{len(self.data_cache['lots'])} 批次, "
+                   f"{len(self.data_cache['components'])} 元件")
+    
+    def _start_background_scan(self):
+        """在背景執行緒中掃描資料庫，讓UI初始化與磁碟掃描同時進行"""
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="db_scan"
+        )
+        future = executor.submit(self.scan_database)
+        with self._scan_lock:
+            self._scan_executor, self._scan_future = executor, future
+
+    def _wait_for_scan(self):
+        """若背景掃描仍在進行中，等待其完成"""
+        future = self._scan_future
+        if future is None:
+            return
+
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"背景掃描資料庫失敗: {e}")
+        finally:
+            # 只由第一個完成等待的執行緒取出並關閉執行器
+            executor = None
+            with self._scan_lock:
+                if self._scan_future is future:
+                    executor = self._scan_executor
+                    self._scan_executor = self._scan_future = None
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def get_products_key(self, wait: bool = True) -> Optional[Tuple[int, int]]:
+        """返回產品字典的識別鍵 (id, 數量)，重新掃描或新增產品時改變
+
+        Args:
+            wait: 背景掃描進行中時是否等待；為 False 時掃描未完成返回 None
+        """
+        if not wait:
+            future = self._scan_future
+            if future is not None and not future.done():
+                return None
+        self._wait_for_scan()
+        products = self.data_cache["products"]
+        return id(products), len(products)
+    
+    def _to_cache_path(self, path: Optional[str]) -> Optional[str]:
+        """將絕對路徑轉為相對於 base_path 的路徑，不在 base_path 下的路徑保持原樣"""
+        if not path:
+            return path
+        try:
+            return str(Path(path).relative_to(self.base_path))
+        except ValueError:
+            return path
+
+    @staticmethod
+    def _from_cache_path(path: Optional[str], cache_base: Optional[str]) -> Optional[str]:
+        """將快取中的相對路徑還原為絕對路徑，舊版快取的絕對路徑保持原樣"""
+        if not path or not cache_base or os.path.isabs(path):
+            return path
+        return str(Path(cache_base) / path)
+
+    def _component_cache_dict(self, component: ComponentInfo) -> Dict[str, Any]:
+        """轉換元件為快取格式，路徑欄位只保存 base_path 之後的部分"""
+        data = component.to_dict()
+        for field_name in CACHED_PATH_FIELDS:
+            data[field_name] = self._to_cache_path(data.get(field_name))
+        return data
     
     def _save_cache(self):
         """保存快取到檔案"""
         try:
             cache_data = {
+                "base_path": str(self.base_path),
                 "products": [product.to_dict() for product in self.data_cache["products"].values()],
                 "lots": [lot.to_dict() for lot in self.data_cache["lots"].values()],
-                "components": [component.to_dict() for component in self.data_cache["components"].values()],
+                "components": [self._component_cache_dict(component) for component in self.data_cache["components"].values()],
                 "lot_keys": self.data_cache["lot_keys"]  # 保存批次映射關係
             }
             
@@ -160,8 +270,9 @@ class DatabaseManager:
         """掃描檔案系統，建立產品和批次資訊"""
         logger.info("開始掃描資料庫...")
         
-        # 清空現有資料
-        self.data_cache = {
+        # 建立在區域字典中，完成後一次替換 self.data_cache，
+        # 掃描期間其他線程讀取的仍是完整的舊快取
+        cache = {
             "products": {},
             "lots": {},
             "components": {},
@@ -182,16 +293,17 @@ class DatabaseManager:
                 continue
                 
             product = ProductInfo(product_id=product_id)
-            self.data_cache["products"][product_id] = product
+            cache["products"][product_id] = product
             
             # 先掃描標準csv目錄中的批次
             if csv_dir.exists():
-                self._scan_directory_structure(csv_dir, product, product_id, is_processed=False)
+                self._scan_directory_structure(cache, csv_dir, product, product_id, is_processed=False)
             
             # 再掃描processed_csv目錄中的批次
             if processed_csv_dir.exists():
-                self._scan_directory_structure(processed_csv_dir, product, product_id, is_processed=True)
+                self._scan_directory_structure(cache, processed_csv_dir, product, product_id, is_processed=True)
         
+        self.data_cache = cache
         logger.info(f"資料庫掃描完成: {len(self.data_cache['products'])} 產品, "
                    f"{len(self.data_cache['lots'])} 批次, "
                    f"{len(self.data_cache['components'])} 元件")
@@ -199,10 +311,11 @@ class DatabaseManager:
         # 保存快取
         self._save_cache()
     
-    def _scan_directory_structure(self, root_dir, product, product_id, is_processed=False):
+    def _scan_directory_structure(self, cache, root_dir, product, product_id, is_processed=False):
         """掃描指定目錄結構下的批次和站點
         
         Args:
+            cache: 掃描中建立的資料快取字典
             root_dir: 目錄路徑 (csv或processed_csv)
             product: 產品對象
             product_id: 產品ID
@@ -214,13 +327,13 @@ class DatabaseManager:
             
             # 獲取或創建批次對象 - 此處根據產品ID和批次ID組合創建批次
             lot_key = f"{product_id}_{lot_id}"
-            if lot_key in self.data_cache.get("lot_keys", {}):
-                lot = self.data_cache["lots"][self.data_cache["lot_keys"][lot_key]]
+            if lot_key in cache.get("lot_keys", {}):
+                lot = cache["lots"][cache["lot_keys"][lot_key]]
             else:
                 # 對於同名但不同產品的批次，創建唯一批次ID
                 unique_lot_id = lot_id
-                if lot_id in self.data_cache["lots"]:
-                    existing_lot = self.data_cache["lots"][lot_id]
+                if lot_id in cache["lots"]:
+                    existing_lot = cache["lots"][lot_id]
                     if existing_lot.product_id != product_id:
                         # 如果已存在相同批次ID但產品不同，創建唯一批次ID
                         unique_lot_id = f"{product_id}_{lot_id}"
@@ -232,12 +345,12 @@ class DatabaseManager:
                     product_id=product_id,
                     original_lot_id=lot_id  # 設置原始批次ID，用於UI顯示
                 )
-                self.data_cache["lots"][unique_lot_id] = lot
+                cache["lots"][unique_lot_id] = lot
                 
                 # 保存映射關係以便後續查找
-                if "lot_keys" not in self.data_cache:
-                    self.data_cache["lot_keys"] = {}
-                self.data_cache["lot_keys"][lot_key] = unique_lot_id
+                if "lot_keys" not in cache:
+                    cache["lot_keys"] = {}
+                cache["lot_keys"][lot_key] = unique_lot_id
                 
                 product.add_lot(unique_lot_id)
             
@@ -263,8 +376,8 @@ class DatabaseManager:
                     component_key = f"{product_id}_{lot.lot_id}_{station}_{component_id}"
                     
                     # 檢查組件是否已存在
-                    if component_key in self.data_cache["components"]:
-                        component = self.data_cache["components"][component_key]
+                    if component_key in cache["components"]:
+                        component = cache["components"][component_key]
                         
                         # 處理路徑更新邏輯
                         if is_processed:
@@ -301,7 +414,7 @@ class DatabaseManager:
                     self._check_component_files(component, product_id)
                     
                     # 儲存元件
-                    self.data_cache["components"][component_key] = component
+                    cache["components"][component_key] = component
     
     def _check_component_files(self, component: ComponentInfo, product_id: str):
         """檢查元件的相關檔案並更新路徑"""
@@ -343,14 +456,17 @@ class DatabaseManager:
     
     def get_products(self) -> List[ProductInfo]:
         """獲取所有產品信息"""
+        self._wait_for_scan()
         return list(self.data_cache["products"].values())
     
     def get_product(self, product_id: str) -> Optional[ProductInfo]:
         """獲取指定產品信息"""
+        self._wait_for_scan()
         return self.data_cache["products"].get(product_id)
     
     def get_lots_by_product(self, product_id: str) -> List[LotInfo]:
         """獲取指定產品的所有批次"""
+        self._wait_for_scan()
         return [
             self.data_cache["lots"][lot_id]
             for lot_id in self.data_cache["products"].get(product_id, ProductInfo(product_id="")).lots
@@ -359,6 +475,7 @@ class DatabaseManager:
     
     def get_lot(self, lot_id: str) -> Optional[LotInfo]:
         """獲取指定批次信息"""
+        self._wait_for_scan()
         # 直接通過批次ID查找
         lot = self.data_cache["lots"].get(lot_id)
         if lot:
@@ -378,11 +495,13 @@ class DatabaseManager:
     
     def get_stations_by_lot(self, lot_id: str) -> List[str]:
         """獲取指定批次的所有站點"""
+        self._wait_for_scan()
         lot = self.data_cache["lots"].get(lot_id)
         return lot.stations if lot else []
     
     def get_components_by_lot_station(self, lot_id: str, station: str) -> List[ComponentInfo]:
         """獲取指定批次和站點的所有元件"""
+        self._wait_for_scan()
         components = []
         # 檢查是否是重命名後的批次ID
         lot = self.data_cache["lots"].get(lot_id)
@@ -412,6 +531,7 @@ class DatabaseManager:
     
     def get_component(self, lot_id: str, station: str, component_id: str) -> Optional[ComponentInfo]:
         """獲取指定元件信息"""
+        self._wait_for_scan()
         # 檢查是否是重命名後的批次ID
         lot = self.data_cache["lots"].get(lot_id)
         
@@ -435,6 +555,7 @@ class DatabaseManager:
     
     def update_component(self, component: ComponentInfo) -> bool:
         """更新元件信息"""
+        self._wait_for_scan()
         # 獲取批次對象，確定產品ID
         lot = self.get_lot(component.lot_id)
         if not lot:
@@ -465,6 +586,7 @@ class DatabaseManager:
     
     def add_component(self, component: ComponentInfo) -> bool:
         """添加新元件"""
+        self._wait_for_scan()
         # 獲取批次對象，確定產品ID
         lot = self.get_lot(component.lot_id)
         if not lot:
@@ -530,6 +652,7 @@ class DatabaseManager:
     
     def remove_component(self, lot_id: str, station: str, component_id: str) -> bool:
         """移除元件"""
+        self._wait_for_scan()
         # 獲取批次對象，確定產品ID
         lot = self.data_cache["lots"].get(lot_id)
         
@@ -558,6 +681,7 @@ class DatabaseManager:
 
     def get_component_count(self) -> Dict[str, int]:
         """獲取各種元件的數量統計"""
+        self._wait_for_scan()
         stats = {
             "total": len(self.data_cache["components"]),
             "by_station": {},
@@ -579,6 +703,40 @@ class DatabaseManager:
         
         return stats
 
+    def get_component_counts(self) -> Dict[Tuple[str, str], int]:
+        """
+        一次遍歷統計各批次各站點的元件數量
+        
+        Returns:
+            Dict[Tuple[str, str], int]: {(批次ID, 站點): 元件數量}
+        """
+        self._wait_for_scan()
+        counts: Dict[Tuple[str, str], int] = {}
+        for component in self.data_cache["components"].values():
+            key = (component.lot_id, component.station)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def get_all_lot_summaries(self) -> List[Tuple[str, LotInfo, Dict[str, int]]]:
+        """
+        獲取所有批次的摘要，供產品資料表一次載入
+        
+        Returns:
+            List[Tuple[str, LotInfo, Dict[str, int]]]: [(產品ID, 批次, {站點: 元件數量}), ...]，
+            順序與 get_products / get_lots_by_product 相同
+        """
+        counts = self.get_component_counts()
+        lots = self.data_cache["lots"]
+        summaries = []
+        for product_id, product in self.data_cache["products"].items():
+            for lot_id in product.lots:
+                lot = lots.get(lot_id)
+                if lot is None:
+                    continue
+                station_counts = {station: counts.get((lot_id, station), 0) for station in lot.stations}
+                summaries.append((product_id, lot, station_counts))
+        return summaries
+
     def get_lots_display(self) -> List[Dict[str, Any]]:
         """
         獲取用於顯示的批次列表，使用原始批次ID
@@ -586,6 +744,7 @@ class DatabaseManager:
         Returns:
             List[Dict]: 包含顯示信息的批次列表
         """
+        self._wait_for_scan()
         result = []
         for lot in self.data_cache["lots"].values():
             # 創建用於顯示的批次信息，使用原始批次ID
@@ -608,6 +767,7 @@ class DatabaseManager:
         Returns:
             Dict: 批次顯示信息
         """
+        self._wait_for_scan()
         # 首先查找批次對象
         lot = self.get_lot(lot_id)
         if not lot:
@@ -636,6 +796,7 @@ class DatabaseManager:
         Returns:
             Tuple[bool, Dict]: (是否匹配, 詳細信息)
         """
+        self._wait_for_scan()
         station_order = config.get("processing.station_order", [])
         if not station_order:
             return False, {"status": False, "message": "未找到站點順序配置"}
@@ -2,22 +2,24 @@
 工具模塊
 """
 from .config_manager import config
-from .logger import get_logger
+from .logger import get_logger, log_lazy
 from .file_utils import (
     ensure_directory, list_files, list_directories, 
     load_csv, find_header_row, save_df_to_csv, backup_file,
     extract_component_from_filename, remove_header_and_rename,
-    AOI_FILENAME_PATTERN, PROCESSED_FILENAME_PATTERN
+    AOI_FILENAME_PATTERN, PROCESSED_FILENAME_PATTERN, MAP_COLUMNS, MAP_DTYPES
 )
 from .data_utils import (
-    convert_to_binary, flip_data, apply_mask, calculate_loss_points,
-    plot_basemap, plot_lossmap, plot_fpy_map, plot_fpy_bar,
-    check_csv_alignment, find_header_row
+    convert_to_binary, ensure_categorical, flip_data, apply_mask, calculate_loss_points,
+    calculate_loss_chain,
+    plot_basemap, plot_lossmap, plot_fpy_map, plot_fpy_bar, submit_plot, render_plots,
+    check_csv_alignment
 )
 
 __all__ = [
     'config',
     'get_logger',
+    'log_lazy',
     'ensure_directory',
     'list_files',
     'list_directories',
@@ -29,13 +31,19 @@ __all__ = [
     'remove_header_and_rename',
     'AOI_FILENAME_PATTERN',
     'PROCESSED_FILENAME_PATTERN',
+    'MAP_COLUMNS',
+    'MAP_DTYPES',
     'convert_to_binary',
+    'ensure_categorical',
     'flip_data',
     'apply_mask',
     'calculate_loss_points',
+    'calculate_loss_chain',
     'plot_basemap',
     'plot_lossmap',
     'plot_fpy_map',
     'plot_fpy_bar',
+    'submit_plot',
+    'render_plots',
     'check_csv_alignment'
 ] 
\ No newline at end of file
@@ -3,8 +3,54 @@
 """
 import os
 import json
+import time
+import atexit
 import logging
+import functools
+import multiprocessing
+import threading
 from pathlib import Path
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:  # orjson 為可選依賴，未安裝時使用標準庫 json
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec 為可選依賴，未安裝時不使用 MessagePack 快照
+    msgspec = None
+
+
+def _atomic_write(path, data):
+    """先寫入暫存檔再以 os.replace 取代目標檔，避免寫入中斷留下不完整的檔案"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _deep_freeze(value):
+    """遞迴將 dict 轉為唯讀的 MappingProxyType、list 轉為 tuple"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _deep_freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_deep_freeze(v) for v in value)
+    return value
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_path(template, items):
+    """格式化路徑模板，結果依模板與參數快取
+    
+    Args:
+        template: 路徑模板
+        items: 排序後的 (參數名, 值) 元組
+    
+    Returns:
+        格式化後的路徑
+    """
+    return template.format(**dict(items))
 
 
 class ConfigManager:
@@ -12,6 +58,9 @@ class ConfigManager:
     
     _instance = None  # 單例實例
     
+    # save_config() 之後延遲寫檔的間隔 (秒)，期間的多次保存合併為一次寫入
+    FLUSH_DELAY = 0.5
+    
     def __new__(cls):
         """實現單例模式"""
         if cls._instance is None:
@@ -27,18 +76,46 @@ class ConfigManager:
         self._initialized = True
         self.logger = logging.getLogger("config_manager")
         self.config = {}
+        # get() 讀取的唯讀配置，update() 後於下次讀取時重建
+        self._frozen = MappingProxyType({})
+        self._dirty = False
+        # save_config() 要求但尚未寫入檔案的變更，由背景線程延遲寫入
+        self._unsaved = False
+        self._last_save = 0.0
+        self._write_lock = threading.RLock()
+        self._save_requested = threading.Condition(self._write_lock)
+        self._writer_thread = None
         self.config_file = Path(__file__).parent.parent.parent / "config" / "settings.json"
+        # settings.json 的 MessagePack 快照，僅作為加速載入用途
+        self.msgpack_file = self.config_file.with_suffix(".msgpack")
+        # get() 的查詢快取，於 load_config/update 時失效
+        self._get_cache = {}
+        self._parts_cache = {}
         self.load_config()
 
     def load_config(self):
-        """載入配置文件"""
+        """載入配置文件
+
+        settings.json 仍為唯一的設定來源；若 MessagePack 快照存在且不舊於
+        settings.json，則直接解碼快照，否則解析 JSON 並重建快照。
+        """
         try:
             if not self.config_file.exists():
                 self.logger.error(f"配置文件不存在: {self.config_file}")
                 raise FileNotFoundError(f"配置文件不存在: {self.config_file}")
-                
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                self.config = json.load(f)
+
+            if self._msgpack_is_current():
+                self.config = msgspec.msgpack.decode(self.msgpack_file.read_bytes())
+            else:
+                self.config = self._read_json()
+                # 快照只由主進程重建，子進程（如繪圖進程）同時寫入同一個暫存檔會互相覆蓋
+                if multiprocessing.parent_process() is None:
+                    self._write_msgpack()
+
+            with self._write_lock:
+                self._frozen = _deep_freeze(self.config)
+                self._dirty = False
+                self._invalidate_cache()
                 
             self.logger.info(f"成功載入配置文件: {self.config_file}")
         except Exception as e:
@@ -46,29 +123,130 @@ class ConfigManager:
             raise
 
     def save_config(self):
-        """保存配置到文件"""
+        """保存配置到文件（JSON 供人工編輯，MessagePack 快照供快速載入）
+
+        寫入由背景線程在最後一次呼叫後靜置 FLUSH_DELAY 秒才執行，
+        連續多次保存只寫入一次；尚未寫入的變更於程式結束時寫入
+        """
+        with self._save_requested:
+            self._unsaved = True
+            self._last_save = time.monotonic()
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(
+                    target=self._writer_loop, name="config_writer", daemon=True
+                )
+                self._writer_thread.start()
+                atexit.register(self._flush_pending)
+            self._save_requested.notify()
+
+    def _flush(self):
+        """將目前配置寫入檔案並清除未保存標記"""
+        with self._write_lock:
+            self._write_json()
+            self._write_msgpack()
+            self._unsaved = False
+        self.logger.info(f"配置已保存到: {self.config_file}")
+
+    def _flush_pending(self):
+        """程式結束時寫入尚未保存的變更"""
+        if self._unsaved:
+            try:
+                self._flush()
+            except Exception as e:
+                self.logger.error(f"保存配置失敗: {e}")
+
+    def _writer_loop(self):
+        """背景寫入線程：等待 save_config() 通知，最後一次呼叫後靜置 FLUSH_DELAY 秒才寫檔"""
+        with self._save_requested:
+            while True:
+                while not self._unsaved:
+                    self._save_requested.wait()
+                remaining = self._last_save + self.FLUSH_DELAY - time.monotonic()
+                if remaining > 0:
+                    self._save_requested.wait(remaining)
+                    continue
+                try:
+                    self._flush()
+                except Exception as e:
+                    self.logger.error(f"保存配置失敗: {e}")
+                    self._last_save = time.monotonic()
+
+    def _read_json(self):
+        """解析 settings.json"""
+        if orjson is not None:
+            return orjson.loads(self.config_file.read_bytes())
+        with open(self.config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_json(self):
+        """寫入 settings.json"""
+        if orjson is not None:
+            data = orjson.dumps(self.config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            data = json.dumps(self.config, indent=4, ensure_ascii=False).encode('utf-8')
+        _atomic_write(self.config_file, data)
+
+    def _msgpack_is_current(self):
+        """MessagePack 快照存在且修改時間不早於 settings.json 時才可使用"""
+        if msgspec is None or not self.msgpack_file.exists():
+            return False
+        return self.msgpack_file.stat().st_mtime >= self.config_file.stat().st_mtime
+
+    def _write_msgpack(self):
+        """寫入 MessagePack 快照，失敗時僅記錄警告，不影響 JSON 設定"""
+        if msgspec is None:
+            return
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
-            self.logger.info(f"配置已保存到: {self.config_file}")
+            _atomic_write(self.msgpack_file, msgspec.msgpack.encode(self.config))
         except Exception as e:
-            self.logger.error(f"保存配置失敗: {e}")
-            raise
+            self.logger.warning(f"寫入 MessagePack 配置快照失敗: {e}")
 
-    def get(self, key, default=None):
-        """獲取配置值，支援使用點號分隔的鍵路徑"""
-        if '.' not in key:
-            return self.config.get(key, default)
-        
-        # 處理多層級配置(如 "database.base_path")
-        parts = key.split('.')
-        value = self.config
-        for part in parts:
-            if isinstance(value, dict) and part in value:
-                value = value[part]
+    def get(self, key, default=None, cached=True):
+        """獲取配置值，支援使用點號分隔的鍵路徑
+
+        返回的字典與列表為唯讀的 MappingProxyType 與 tuple，修改配置請使用 update()
+
+        Args:
+            key: 配置鍵，例如 "database.base_path"
+            default: 找不到配置時的返回值
+            cached: 是否使用查詢快取，對結果正確性敏感的呼叫者可設為 False
+        """
+        if cached:
+            try:
+                return self._get_cache[key]
+            except KeyError:
+                pass
+
+        # 快取未命中時在鎖內重建與查詢，確保寫入快取的值不早於最近一次 update()
+        with self._write_lock:
+            if self._dirty:
+                self._frozen = _deep_freeze(self.config)
+                self._dirty = False
+
+            if '.' not in key:
+                if key not in self._frozen:
+                    return default
+                value = self._frozen[key]
             else:
-                return default
-        return value
+                # 處理多層級配置(如 "database.base_path")
+                parts = self._parts_cache.get(key)
+                if parts is None:
+                    parts = self._parts_cache.setdefault(key, key.split('.'))
+                value = self._frozen
+                for part in parts:
+                    if isinstance(value, MappingProxyType) and part in value:
+                        value = value[part]
+                    else:
+                        return default
+
+            # 只快取實際存在的配置，避免把呼叫者各自的預設值寫入快取
+            if cached:
+                self._get_cache[key] = value
+            return value
+
+    def _invalidate_cache(self):
+        """清除 get() 的查詢快取"""
+        self._get_cache.clear()
 
     def get_path(self, path_key, **format_args):
         """獲取格式化的路徑配置並替換變數
@@ -92,30 +270,42 @@ class ConfigManager:
             
         # 格式化路徑
         try:
-            formatted_path = path_template.format(**format_args)
-            return formatted_path
+            try:
+                return _format_path(path_template, tuple(sorted(format_args.items())))
+            except TypeError:  # 參數值不可雜湊時不使用快取
+                return path_template.format(**format_args)
         except KeyError as e:
             self.logger.error(f"格式化路徑失敗，缺少參數: {e}")
             return None
 
     def update(self, key, value):
-        """更新配置的特定部分"""
-        if '.' not in key:
-            self.config[key] = value
-            return
-            
-        # 處理多層級配置更新
-        parts = key.split('.')
-        config_section = self.config
-        
-        # 導航到最後一層
-        for part in parts[:-1]:
-            if part not in config_section:
-                config_section[part] = {}
-            config_section = config_section[part]
+        """更新記憶體中配置的特定部分，唯讀配置於下次 get() 時重建
+
+        不會寫入檔案，需要保存時請呼叫 save_config()
+        """
+        # 先修改配置再讓快取失效，並與 get() 重建唯讀配置共用同一把鎖，
+        # 避免並行的 get() 以修改前的配置重新寫入快取
+        with self._write_lock:
+            if '.' not in key:
+                self.config[key] = value
+            else:
+                # 處理多層級配置更新
+                parts = key.split('.')
+                config_section = self.config
                 
-        # 設置值
-        config_section[parts[-1]] = value
+                # 導航到最後一層
+                for part in parts[:-1]:
+                    if part not in config_section:
+                        config_section[part] = {}
+                    config_section = config_section[part]
+                        
+                # 設置值
+                config_section[parts[-1]] = value
+
+            self._dirty = True
+            self._invalidate_cache()
+            if key.startswith("database."):
+                _format_path.cache_clear()
         self.logger.info(f"已更新配置: {key}")
 
 
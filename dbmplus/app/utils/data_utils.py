@@ -3,15 +3,153 @@
 """
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import ListedColormap, to_rgba_array
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 from pathlib import Path
+import atexit
+import concurrent.futures
 import json
 import csv
-from .logger import get_logger
+import multiprocessing
+import functools
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+from .logger import get_logger, forward_child_logs, use_parent_log_queue
 from .config_manager import config
+from .file_utils import find_header_row, MAP_DTYPES
+
+try:
+    import numexpr
+except ImportError:  # numexpr 為可選依賴，未安裝時使用 NumPy
+    numexpr = None
+
+try:
+    import datashader
+    import datashader.transfer_functions as ds_tf
+except ImportError:  # datashader 為可選依賴，未安裝時使用 matplotlib 散點圖
+    datashader = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pyarrow 為可選依賴，未安裝時跨進程直接 pickle DataFrame
+    pyarrow = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba 為可選依賴，未安裝時使用 NumPy 實作
+    njit = None
 
 logger = get_logger("data_utils")
 
+# 每個工作線程各自保留的可重用圖形，依圖形尺寸區分
+_FIG_POOL = threading.local()
+
+# 繪圖進程池，首次 submit_plot 時建立
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+# 繪圖進程的啟動方式；主程式含 Qt 與工作線程，fork 後子進程可能繼承被鎖住的鎖
+RENDER_POOL_START_METHOD = 'spawn'
+
+# 繪圖進程數，保留一個核心給主程式
+RENDER_POOL_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
+
+# 超過此列數時才使用 numexpr 的多執行緒運算，小資料使用 NumPy 即可
+NUMEXPR_MIN_ROWS = 100_000
+
+# 點數達到此門檻時，地圖改以點陣化影像取代逐點散點圖
+RASTER_MIN_POINTS = 50_000
+
+# 點陣化影像單邊的最大像素數
+RASTER_MAX_PIXELS = 2000
+
+# 點陣化點位的透明度，對應散點圖的 alpha=0.6
+RASTER_ALPHA = 153
+
+# 圖像輸出的默認 DPI
+PLOT_DPI = 100
+
+# PNG 壓縮等級，1 以少量檔案大小換取數倍的 zlib 壓縮速度
+PNG_SAVE_KWARGS = {'compress_level': 1}
+
+# 需要較小輸出檔案時的 PNG 參數，可透過 plot_config['pil_kwargs'] 指定給 plot_basemap
+PNG_COMPACT_KWARGS = {'optimize': True, 'compress_level': 6}
+
+# plot_basemap 未提供繪圖配置時使用的默認值
+DEFAULT_BASEMAP_CONFIG = {
+    'map_size': (20, 20),
+    'point_size': 100 / 15,  # 原始大小除以 15
+    'title_fontsize': 20,
+    'invert_y_axis': True,
+    'invert_x_axis': False,
+    'colors': {
+        'ok': 'black',
+        'dirty': 'red',
+        'miss': 'blue',
+        'hurt': 'orange',
+        'default': 'green'
+    }
+}
+
+# FPY 地圖配色，索引為 CombinedDefectType (0=缺陷, 1=良品)
+FPY_CMAP = ListedColormap(['red', 'black'])
+
+# 損失地圖各狀態的繪製順序與顏色，後繪製者覆蓋在上
+LOSS_STATUS_COLORS = {
+    'good_to_good': 'lightgray',  # 良品→良品
+    'good_to_bad': 'red',         # 良品→缺陷 (損失點)
+    'bad_to_bad': 'black'         # 缺陷→缺陷
+}
+
+# 稠密網格的最大格數，超過時改用打包鍵交集，避免網格佔用過多記憶體
+DENSE_GRID_MAX_CELLS = 16_000_000
+
+# 點位狀態代碼 (prev_binary << 1) | curr_binary 對應的狀態名稱
+LOSS_STATUS_LABELS = np.array(['bad_to_bad', 'bad_to_good', 'good_to_bad', 'good_to_good'], dtype=object)
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _loss_codes_kernel(prev_col, prev_row, prev_bin, curr_grid):
+        """依當前站稠密網格計算前站每個點位的狀態代碼，-1 表示當前站沒有此點位"""
+        out = np.empty(prev_col.size, np.int8)
+        for i in prange(prev_col.size):
+            curr = curr_grid[prev_col[i], prev_row[i]]
+            if curr < 0:
+                out[i] = -1
+            else:
+                out[i] = (prev_bin[i] << 1) | curr
+        return out
+
+    @njit(cache=True, parallel=True)
+    def _classify(prev, curr):
+        """單次掃描計算已對齊點位的狀態代碼 (prev << 1) | curr"""
+        out = np.empty(prev.size, np.int8)
+        for i in prange(prev.size):
+            out[i] = (prev[i] << 1) | curr[i]
+        return out
+
+    @njit(cache=True, parallel=True)
+    def _mask_kernel(rows, cols, starts_r, ends_r, starts_c, ends_c):
+        """單次掃描計算保留遮罩，點位落在任一遮罩範圍內即不保留"""
+        keep = np.ones(rows.size, np.bool_)
+        for i in prange(rows.size):
+            r = rows[i]
+            c = cols[i]
+            for j in range(starts_r.size):
+                if starts_r[j] <= r <= ends_r[j] and starts_c[j] <= c <= ends_c[j]:
+                    keep[i] = False
+                    break
+        return keep
+else:
+    _loss_codes_kernel = None
+    _classify = None
+    _mask_kernel = None
+
 
 def convert_to_binary(df, rules=None):
     """
@@ -23,7 +161,8 @@ def convert_to_binary(df, rules=None):
                如果未提供，則從配置中讀取
     
     Returns:
-        DataFrame: 含有 'Col', 'Row', 'binary' 欄位的 DataFrame
+        DataFrame: 含有 'Col', 'Row', 'binary' 欄位的 DataFrame；
+                   Col 與 Row 可能與輸入共用底層緩衝區，呼叫端不應就地修改
     """
     if rules is None:
         rules = {
@@ -35,9 +174,41 @@ def convert_to_binary(df, rules=None):
         logger.error("DataFrame 缺少 DefectType 欄位")
         raise ValueError("DataFrame 缺少 DefectType 欄位")
     
-    df_copy = df.copy()
-    df_copy['binary'] = df_copy['DefectType'].apply(lambda x: 1 if x in rules['good'] else 0)
-    return df_copy[['Col', 'Row', 'binary']]
+    # 以 isin 在 C 層完成成員判斷，並直接使用原欄位的 ndarray 建立結果，不複製整個 DataFrame
+    good_set = frozenset(rules['good'])
+    defect_type = df['DefectType']
+    if isinstance(defect_type.dtype, pd.CategoricalDtype):
+        # 類別型欄位只需判斷類別字典，再以整數代碼查表；末位 False 對應缺失值代碼 -1
+        lookup = np.append(defect_type.cat.categories.isin(good_set), False).astype(np.uint8)
+        binary = lookup[defect_type.cat.codes.to_numpy()]
+    else:
+        # bool 與 uint8 同為單位元組，以 view 重新解讀即可，不需再轉型複製
+        binary = defect_type.isin(good_set).to_numpy().view(np.uint8)
+    return pd.DataFrame(
+        {'Col': df['Col'].to_numpy(), 'Row': df['Row'].to_numpy(), 'binary': binary},
+        copy=False
+    )
+
+
+def ensure_categorical(df, cols=('DefectType',)):
+    """
+    將指定欄位轉為 category 型別，後續的 isin、groupby 與比較都改用整數代碼
+    
+    Args:
+        df: DataFrame
+        cols: 要轉換的欄位名稱
+    
+    Returns:
+        DataFrame: 轉換後的 DataFrame，欄位已是 category 或不存在時返回原 DataFrame
+    """
+    if df is None:
+        return df
+    
+    converted = {
+        col: df[col].astype('category') for col in cols
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+    return df.assign(**converted) if converted else df
 
 
 def flip_data(df, axis='horizontal'):
@@ -49,18 +220,32 @@ def flip_data(df, axis='horizontal'):
         axis: 鏡像軸，'horizontal'=左右翻轉，'vertical'=上下翻轉
     
     Returns:
-        DataFrame: 翻轉後的 DataFrame
+        DataFrame: 翻轉後的 DataFrame；未翻轉的欄位與輸入共用底層緩衝區，
+                   呼叫端不應就地修改
     """
-    df_copy = df.copy()
-    
     if axis == 'horizontal':
-        df_copy['Col'] = df_copy['Col'].max() - df_copy['Col']
+        column = 'Col'
     elif axis == 'vertical':
-        df_copy['Row'] = df_copy['Row'].max() - df_copy['Row']
+        column = 'Row'
     else:
         logger.warning(f"無效的翻轉軸: {axis}，支援的選項為 'horizontal' 或 'vertical'")
+        return df
+    
+    if df.empty:
+        return df
     
-    return df_copy
+    # 只計算被翻轉的欄位，其他欄位以淺複製與原 DataFrame 共用
+    values = df[column].to_numpy()
+    mx = values.max()
+    if numexpr is not None and values.size >= NUMEXPR_MIN_ROWS:
+        flipped = numexpr.evaluate("mx - values")
+    else:
+        flipped = np.subtract(mx, values)
+    
+    # 未啟用 copy-on-write 的 pandas 中 assign 會深複製整個 DataFrame，改以淺複製後替換單一欄位
+    result = df.copy(deep=False)
+    result[column] = flipped
+    return result
 
 
 def apply_mask(df, mask_rules):
@@ -73,7 +258,8 @@ def apply_mask(df, mask_rules):
                     {'start_row': int, 'end_row': int, 'start_col': int, 'end_col': int}
     
     Returns:
-        DataFrame: 過濾後的 DataFrame
+        DataFrame: 過濾後的 DataFrame；沒有點位被遮罩時直接返回輸入本身，
+                   呼叫端不應就地修改
     """
     if df is None or df.empty:
         return df
@@ -82,23 +268,57 @@ def apply_mask(df, mask_rules):
         logger.warning("DataFrame 缺少 Row 或 Col 欄位，無法應用遮罩")
         return df
     
-    df_copy = df.copy()
-    
+    # 先將規則整理為邊界陣列，無效規則記錄錯誤後跳過
+    bounds = []
     for rule in mask_rules:
         try:
-            start_row = int(rule["start_row"])
-            end_row = int(rule["end_row"])
-            start_col = int(rule["start_col"])
-            end_col = int(rule["end_col"])
-            
-            mask = ~((df_copy['Row'] >= start_row) & (df_copy['Row'] <= end_row) &
-                     (df_copy['Col'] >= start_col) & (df_copy['Col'] <= end_col))
-            
-            df_copy = df_copy[mask]
+            bounds.append((
+                int(rule["start_row"]), int(rule["end_row"]),
+                int(rule["start_col"]), int(rule["end_col"])
+            ))
         except (KeyError, TypeError) as e:
             logger.error(f"處理遮罩規則時出錯: {e}")
     
-    return df_copy
+    if not bounds:
+        return df
+    
+    starts_r, ends_r, starts_c, ends_c = np.asarray(bounds, dtype=np.int64).T
+    rows = df['Row'].to_numpy()
+    cols = df['Col'].to_numpy()
+    large = rows.size >= NUMEXPR_MIN_ROWS
+    
+    # 大量整數座標時以 numba 單次掃描完成所有規則
+    if (_mask_kernel is not None and large
+            and rows.dtype.kind in 'iu' and cols.dtype.kind in 'iu'):
+        keep = _mask_kernel(rows, cols, starts_r, ends_r, starts_c, ends_c)
+    else:
+        use_numexpr = numexpr is not None and large
+        
+        # 累積所有規則的保留遮罩，最後只過濾一次；比較結果寫入預先配置的緩衝區，不產生暫存陣列
+        keep = np.ones(len(df), dtype=bool)
+        inside = np.empty_like(keep)
+        buf = np.empty_like(keep)
+        for sr, er, sc, ec in zip(starts_r, ends_r, starts_c, ends_c):
+            if use_numexpr:
+                numexpr.evaluate(
+                    "keep & ~((rows >= sr) & (rows <= er) & (cols >= sc) & (cols <= ec))", out=keep
+                )
+                continue
+            np.greater_equal(rows, sr, out=inside)
+            np.less_equal(rows, er, out=buf)
+            inside &= buf
+            np.greater_equal(cols, sc, out=buf)
+            inside &= buf
+            np.less_equal(cols, ec, out=buf)
+            inside &= buf
+            np.logical_not(inside, out=inside)
+            keep &= inside
+    
+    # 沒有點位被遮罩時直接返回原 DataFrame，不產生複本
+    if keep.all():
+        return df
+    return df.iloc[keep]
+    
 
 
 def calculate_loss_points(prev_df, curr_df):
@@ -110,7 +330,7 @@ def calculate_loss_points(prev_df, curr_df):
         curr_df: 當前站點的 DataFrame，需包含 'Col', 'Row', 'binary' 欄位
     
     Returns:
-        DataFrame: 包含 'Col', 'Row', 'status' 的 DataFrame，其中status為:
+        DataFrame: 包含 'Col', 'Row', 'status' 的 DataFrame，其中status為類別型:
                  'good_to_good': 良品→良品
                  'good_to_bad': 良品→缺陷(損失點)
                  'bad_to_bad': 缺陷→缺陷
@@ -121,29 +341,156 @@ def calculate_loss_points(prev_df, curr_df):
             logger.error(f"{name} 缺少必要欄位")
             raise ValueError(f"{name} 缺少必要欄位: 'Col', 'Row', 'binary'")
     
-    # 合併兩個 DataFrame 以查找所有重疊點
-    merged = pd.merge(prev_df, curr_df, on=['Col', 'Row'], suffixes=('_prev', '_curr'))
+    prev_cols = prev_df['Col'].to_numpy()
+    prev_rows = prev_df['Row'].to_numpy()
+    prev_bin = prev_df['binary'].to_numpy().astype(np.int8, copy=False)
+    curr_cols = curr_df['Col'].to_numpy()
+    curr_rows = curr_df['Row'].to_numpy()
+    curr_bin = curr_df['binary'].to_numpy().astype(np.int8, copy=False)
+    
+    codes = _dense_loss_codes(prev_cols, prev_rows, prev_bin, curr_cols, curr_rows, curr_bin)
+    idx = None
+    if codes is None:
+        # 將 (Col, Row) 打包成單一 int64 鍵，以排序後的二分搜尋取代 merge 的多欄位雜湊
+        prev_keys = _pack_coords(prev_cols, prev_rows)
+        curr_keys = _pack_coords(curr_cols, curr_rows)
+        
+        # 找出兩站重疊的點位，重複座標與 merge 相同地產生所有配對
+        idx, curr_idx = _join_keys(prev_keys, curr_keys)
+        if _classify is not None:
+            codes = _classify(prev_bin[idx], curr_bin[curr_idx])
+        else:
+            codes = (prev_bin[idx] << 1) | curr_bin[curr_idx]
+    
+    # 只保留重疊點位，並排除缺陷→良品；先算出最終列索引，座標只需取值一次
+    kept = (codes >= 0) & (codes != 1)
+    rows_idx = np.flatnonzero(kept) if idx is None else idx[kept]
+    
+    return pd.DataFrame({
+        'Col': prev_cols[rows_idx],
+        'Row': prev_rows[rows_idx],
+        # 狀態代碼直接作為類別代碼，不逐列建立字串
+        'status': pd.Categorical.from_codes(codes[kept], categories=LOSS_STATUS_LABELS)
+    }, copy=False)
+
+
+def calculate_loss_chain(dfs):
+    """
+    合併多個站點的 binary 資料，計算每個點位在所有站點的綜合結果
+    
+    結果等同依序以 (Col, Row) outer merge、fillna(0) 後取各站最小值，
+    但所有站點的座標只建立一次索引，不需逐站重新雜湊合併
+    
+    Args:
+        dfs: DataFrame 列表，每個需包含 'Col', 'Row', 'binary' 欄位
+    
+    Returns:
+        DataFrame: 包含 'Col', 'Row', 'CombinedDefectType' 的 DataFrame，
+                   1 代表所有站點均為良品，0 代表任一站為缺陷或缺少該點位
+    """
+    for i, df in enumerate(dfs):
+        if not all(col in df.columns for col in ['Col', 'Row', 'binary']):
+            logger.error(f"dfs[{i}] 缺少必要欄位")
+            raise ValueError(f"dfs[{i}] 缺少必要欄位: 'Col', 'Row', 'binary'")
+    
+    cols = [df['Col'].to_numpy() for df in dfs]
+    rows = [df['Row'].to_numpy() for df in dfs]
+    keys = np.concatenate([_pack_coords(c, r) for c, r in zip(cols, rows)])
+    
+    # 所有站點的座標一次取聯集，inverse 為每列對應的點位編號
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    bounds = np.cumsum([len(df) for df in dfs])[:-1]
+    
+    # 缺少點位的站點視為缺陷，逐站以 AND 累積
+    combined = np.ones(first.size, dtype=np.uint8)
+    station_bin = np.empty_like(combined)
+    for df, point_idx in zip(dfs, np.split(inverse, bounds)):
+        station_bin.fill(0)
+        station_bin[point_idx] = df['binary'].to_numpy()
+        combined &= station_bin
     
-    # 分類三種狀態
-    merged['status'] = 'unknown'  # 初始狀態
+    return pd.DataFrame({
+        'Col': np.concatenate(cols)[first],
+        'Row': np.concatenate(rows)[first],
+        'CombinedDefectType': combined
+    }, copy=False)
+
+
+def _dense_loss_codes(prev_cols, prev_rows, prev_bin, curr_cols, curr_rows, curr_bin):
+    """
+    以 Numba 核心在稠密網格上計算狀態代碼
     
-    # 良品→良品 (Good → Good)
-    good_to_good = merged[(merged['binary_prev'] == 1) & (merged['binary_curr'] == 1)]
-    good_to_good['status'] = 'good_to_good'
+    Returns:
+        Optional[ndarray]: 每個前站點位的 int8 狀態代碼；不適用（未安裝 numba、
+                           座標非整數或為負、網格過大）時返回 None
+    """
+    if _loss_codes_kernel is None or prev_cols.size == 0 or curr_cols.size == 0:
+        return None
     
-    # 良品→缺陷 (Good → Bad，即損失點)
-    good_to_bad = merged[(merged['binary_prev'] == 1) & (merged['binary_curr'] == 0)]
-    good_to_bad['status'] = 'good_to_bad'
+    coords = (prev_cols, prev_rows, curr_cols, curr_rows)
+    if not all(np.issubdtype(arr.dtype, np.integer) for arr in coords):
+        return None
+    if min(arr.min() for arr in coords) < 0:
+        return None
     
-    # 缺陷→缺陷 (Bad → Bad)
-    bad_to_bad = merged[(merged['binary_prev'] == 0) & (merged['binary_curr'] == 0)]
-    bad_to_bad['status'] = 'bad_to_bad'
+    n_cols = int(max(prev_cols.max(), curr_cols.max())) + 1
+    n_rows = int(max(prev_rows.max(), curr_rows.max())) + 1
+    if n_cols * n_rows > DENSE_GRID_MAX_CELLS:
+        return None
+    
+    # -1 代表當前站沒有此點位
+    curr_grid = np.full((n_cols, n_rows), -1, dtype=np.int8)
+    curr_grid[curr_cols, curr_rows] = curr_bin
+    
+    # 當前站有重複座標時，網格每格只能保存一個值，改用 _join_keys 產生所有配對
+    if np.count_nonzero(curr_grid >= 0) != curr_cols.size:
+        return None
+    
+    # 核心依輸入型別延遲編譯，縮減後的 int16/int32 座標不需轉回 int64
+    return _loss_codes_kernel(
+        np.ascontiguousarray(prev_cols),
+        np.ascontiguousarray(prev_rows),
+        np.ascontiguousarray(prev_bin),
+        curr_grid
+    )
+
+
+def _join_keys(left_keys, right_keys):
+    """
+    以排序後的 searchsorted 完成等值內連接，結果與 pd.merge(how='inner') 相同：
+    依左側順序輸出，每個左側鍵對應右側所有相同的鍵（依右側原順序）
+    
+    Args:
+        left_keys: 左側 int64 鍵陣列
+        right_keys: 右側 int64 鍵陣列
+    
+    Returns:
+        tuple: (左側列索引, 右側列索引)
+    """
+    order = np.argsort(right_keys, kind='stable')
+    sorted_keys = right_keys[order]
+    starts = np.searchsorted(sorted_keys, left_keys, side='left')
+    counts = np.searchsorted(sorted_keys, left_keys, side='right') - starts
+    
+    left_idx = np.repeat(np.arange(left_keys.size), counts)
+    # 每個配對在其左側鍵的相同鍵區段中的位移
+    offsets = np.arange(left_idx.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    right_idx = order[np.repeat(starts, counts) + offsets]
+    return left_idx, right_idx
+
+
+def _pack_coords(cols, rows):
+    """
+    將 Col/Row 座標打包為單一 int64 鍵（高 32 位元為 Col，低 32 位元為 Row）
     
-    # 合併所有狀態
-    result = pd.concat([good_to_good, good_to_bad, bad_to_bad])
+    Args:
+        cols: Col 座標陣列
+        rows: Row 座標陣列
     
-    # 只返回需要的列
-    return result[['Col', 'Row', 'status']]
+    Returns:
+        ndarray: int64 鍵陣列
+    """
+    return (cols.astype(np.int64) << 32) | (rows.astype(np.int64) & 0xFFFFFFFF)
 
 
 def plot_basemap(df, output_path, title=None, plot_config=None):
@@ -154,7 +501,7 @@ def plot_basemap(df, output_path, title=None, plot_config=None):
         df: 包含 'Col', 'Row', 'DefectType' 欄位的 DataFrame
         output_path: 圖像保存路徑
         title: 圖像標題，默認為檔名
-        plot_config: 繪圖配置，如顏色、大小等
+        plot_config: 繪圖配置，如顏色、大小等；可用 'pil_kwargs' 覆寫 PNG 壓縮參數
     
     Returns:
         bool: 是否成功生成圖像
@@ -168,89 +515,45 @@ def plot_basemap(df, output_path, title=None, plot_config=None):
             logger.error("DataFrame 缺少必要欄位: 'Col', 'Row', 'DefectType'")
             return False
         
-        # 設置默認繪圖配置
-        if plot_config is None:
-            plot_config = {
-                'map_size': (20, 20),
-                'point_size': 100 / 15,  # 原始大小除以 15
-                'title_fontsize': 20,
-                'invert_y_axis': True,
-                'invert_x_axis': False,
-                'colors': {
-                    'ok': 'black',
-                    'dirty': 'red',
-                    'miss': 'blue',
-                    'hurt': 'orange',
-                    'default': 'green'
-                }
-            }
-        
-        # 從databasemanager格式配置中提取所需參數
-        if 'map_configurations' in plot_config:
-            # 處理databasemanager格式的配置
-            map_configs = plot_config.get('map_configurations', {})
-            # 獲取第一個站點的配置或使用默認MT
-            station_config = None
-            for station_key in map_configs:
-                station_config = map_configs[station_key]
-                break
-            
-            if not station_config:
-                station_config = map_configs.get('MT', {})
-            
-            if station_config:
-                color_map = station_config.get('colors', {})
-                plot_config['colors'] = color_map
-        
-        # 處理其他databasemanager格式參數
-        if 'map_size' in plot_config:
-            # 如果是元組格式，直接使用
-            if isinstance(plot_config['map_size'], list):
-                plot_config['map_size'] = tuple(plot_config['map_size'])
-        else:
-            plot_config['map_size'] = (20, 20)
-            
-        # 處理點大小
-        if 'original_size' in plot_config:
-            plot_config['point_size'] = plot_config['original_size'] / 15
-        
-        # 軸反轉配置
-        if 'invert_x_axis' in plot_config:
-            plot_config['invert_x_axis'] = plot_config['invert_x_axis']
-            
-        # 標題字號
-        if 'title_fontsize' in plot_config:
-            plot_config['title_fontsize'] = plot_config['title_fontsize']
-        
-        # 根據缺陷類型設置顏色
-        df_sorted = df.sort_values(by=['Col', 'Row'])
-        color_map = plot_config.get('colors', {})
+        # 繪圖配置只在內容改變時重新解析
+        cfg = _resolve_plot_config(plot_config)
         
         # 創建和配置圖形
-        fig, ax = plt.subplots(figsize=plot_config.get('map_size', (20, 20)))
+        fig, ax = _get_fig(cfg.map_size)
         fig.subplots_adjust(left=0.07, right=0.93, bottom=0.07, top=0.93)
         
         # 繪製散點圖，根據 DefectType 進行顏色編碼
-        defect_types = df_sorted['DefectType'].unique()
-        
-        for defect_type in defect_types:
-            # 獲取顏色，若未定義則使用默認顏色
-            color = None
-            for key, value in color_map.items():
-                if str(defect_type).lower().startswith(key.lower()):
-                    color = value
-                    break
-            if color is None:
-                color = color_map.get('default', 'green')
+        defect_types = df['DefectType'].unique()
+        # 顏色只解析一次，迴圈內直接查表
+        defect_colors = _build_defect_colors(defect_types, cfg.color_keys, cfg.default_color)
+        
+        if datashader is not None and len(df) >= RASTER_MIN_POINTS:
+            # 大量點位時直接點陣化，避免 matplotlib 逐點處理
+            _rasterize_defects(ax, df, defect_colors)
+        else:
+            # 重複的 (Col, Row, DefectType) 點位只需繪製一次
+            points = df.groupby(
+                ['Col', 'Row', 'DefectType'], sort=False, observed=True
+            ).size().reset_index(name='n')
             
-            subset = df_sorted[df_sorted['DefectType'] == defect_type]
+            # 依類型代碼查出每個點的 RGBA，所有類型以單一散點圖繪製
+            type_codes, types = pd.factorize(points['DefectType'])
+            palette = to_rgba_array([defect_colors[dt] for dt in types])
             ax.scatter(
-                subset['Col'], subset['Row'], 
-                c=color, label=defect_type, 
-                s=plot_config.get('point_size', 6.67), 
-                alpha=0.6, edgecolors='w'
+                points['Col'].to_numpy(), points['Row'].to_numpy(),
+                c=palette[type_codes],
+                s=cfg.point_size,
+                alpha=0.6, edgecolors='w', rasterized=True
             )
         
+        # 圖例以代理圖形建立，不依賴散點圖物件
+        legend_elements = [
+            Line2D([0], [0], marker='o', color='w', label=str(dt),
+                   markerfacecolor=color, markersize=8)
+            for dt, color in defect_colors.items() if not pd.isna(dt)
+        ]
+        ax.legend(handles=legend_elements, title='Defect Type', loc='center left', bbox_to_anchor=(1, 0.5))
+        
         # 設置軸和標題
         ax.set_xlabel('Col Coordinate')
         ax.set_ylabel('Row Coordinate')
@@ -258,18 +561,19 @@ def plot_basemap(df, output_path, title=None, plot_config=None):
         if title is None:
             title = Path(output_path).stem
         
-        ax.set_title(f'Map of Defects - {title}', fontsize=plot_config.get('title_fontsize', 20))
-        ax.legend(title='Defect Type', loc='center left', bbox_to_anchor=(1, 0.5))
+        ax.set_title(f'Map of Defects - {title}', fontsize=cfg.title_fontsize)
         
         # 軸反轉
         ax.invert_yaxis()  # Y軸始終反轉
-        if plot_config.get('invert_x_axis', False):
+        if cfg.invert_x_axis:
             ax.invert_xaxis()
         
         # 保存圖像
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(output_path, bbox_inches='tight')
-        plt.close()
+        fig.savefig(
+            output_path, bbox_inches='tight',
+            dpi=cfg.dpi, pil_kwargs=cfg.pil_kwargs
+        )
         
         logger.info(f"成功生成基本地圖: {output_path}")
         return True
@@ -279,6 +583,312 @@ def plot_basemap(df, output_path, title=None, plot_config=None):
         return False
 
 
+def submit_plot(fn, df, *args, **kwargs):
+    """
+    將繪圖函數提交到繪圖進程池執行
+    
+    繪圖為純函數 (DataFrame -> PNG)，在獨立進程中執行可避開 GIL，批次生成大量圖像時
+    可隨核心數線性加速
+    
+    Args:
+        fn: 模塊層級的繪圖函數，如 plot_basemap、plot_lossmap、plot_fpy_map
+        df: 繪圖資料
+        *args, **kwargs: 傳給繪圖函數的其餘參數
+    
+    Returns:
+        concurrent.futures.Future: 結果為繪圖函數的返回值
+    """
+    return _get_render_pool().submit(_run_plot, fn, _pack_frame(df), args, kwargs)
+
+
+def render_plots(jobs):
+    """
+    將多個繪圖工作一次提交到繪圖進程池，並依提交順序收集結果
+    
+    Args:
+        jobs: (繪圖函數, DataFrame, 輸出路徑) 元組的列表，可再附加 kwargs 字典作為第四個元素
+    
+    Returns:
+        list: 每個工作的結果，繪圖失敗或拋出例外時為 False
+    """
+    futures = [
+        submit_plot(fn, df, output_path, **(extra[0] if extra else {}))
+        for fn, df, output_path, *extra in jobs
+    ]
+    
+    results = []
+    for (fn, _, output_path, *_), future in zip(jobs, futures):
+        try:
+            results.append(future.result())
+        except Exception as e:
+            logger.error(f"{fn.__name__} 繪製 {output_path} 失敗: {e}")
+            results.append(False)
+    return results
+
+
+def _get_render_pool():
+    """取得繪圖進程池，不存在時建立"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            ctx = multiprocessing.get_context(RENDER_POOL_START_METHOD)
+            # 繪圖進程的日誌經佇列送回主進程，由主進程統一寫入日誌檔
+            log_queue = ctx.Queue()
+            forward_child_logs(log_queue)
+            _render_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=RENDER_POOL_WORKERS,
+                mp_context=ctx,
+                initializer=_init_render_worker,
+                initargs=(log_queue,)
+            )
+            atexit.register(_render_pool.shutdown, wait=False, cancel_futures=True)
+        return _render_pool
+
+
+def _init_render_worker(log_queue):
+    """繪圖進程初始化：日誌改送主進程
+
+    繪圖函數直接建立 Figure 並掛上 FigureCanvasAgg，不經 pyplot，因此不需設定後端
+    """
+    use_parent_log_queue(log_queue)
+
+
+def _run_plot(fn, payload, args, kwargs):
+    """在繪圖進程中還原 DataFrame 並執行繪圖函數"""
+    return fn(_unpack_frame(payload), *args, **kwargs)
+
+
+def _pack_frame(df):
+    """
+    將 DataFrame 轉為跨進程傳遞的資料，有 pyarrow 時使用 Arrow IPC 格式以省去逐列 pickle
+    
+    Args:
+        df: DataFrame
+    
+    Returns:
+        bytes 或 DataFrame
+    """
+    if pyarrow is None or df is None:
+        return df
+    table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _unpack_frame(payload):
+    """還原 _pack_frame 的結果"""
+    if isinstance(payload, bytes):
+        return pyarrow.ipc.open_stream(payload).read_pandas()
+    return payload
+
+
+def _get_fig(size):
+    """
+    取得本線程可重用的圖形，並建立全新的座標軸後返回
+    
+    圖形不經 pyplot 管理，直接綁定 Agg 畫布，因此可在多個工作線程中同時繪圖，
+    且不需要 plt.close。只重用 Figure 與畫布，座標軸每次重建，上一張圖設定的
+    背景色、範圍、比例與軸顯示狀態都不會殘留到下一張圖
+    
+    Args:
+        size: 圖形尺寸 (英吋)
+    
+    Returns:
+        tuple: (Figure, Axes)
+    """
+    size = tuple(size)
+    figs = getattr(_FIG_POOL, 'figs', None)
+    if figs is None:
+        figs = _FIG_POOL.figs = {}
+    
+    fig = figs.get(size)
+    if fig is None:
+        fig = figs[size] = Figure(figsize=size)
+        FigureCanvasAgg(fig)
+    
+    fig.clear()
+    return fig, fig.add_subplot(111)
+
+
+@dataclass(frozen=True)
+class _PlotConfig:
+    """plot_basemap 使用的已解析繪圖配置"""
+    map_size: Tuple[float, float]
+    point_size: float
+    title_fontsize: float
+    invert_x_axis: bool
+    color_keys: Tuple[Tuple[str, Any], ...]  # (小寫前綴, 顏色)，由長到短排序
+    default_color: Any
+    dpi: float
+    pil_kwargs: Dict[str, Any]
+
+
+def _resolve_plot_config(plot_config):
+    """
+    解析 plot_basemap 的繪圖配置，結果依配置內容快取
+    
+    同一份配置檔每次都會重新載入為新的 dict，因此以序列化後的內容作為快取鍵
+    
+    Args:
+        plot_config: 繪圖配置 dict，None 時使用 DEFAULT_BASEMAP_CONFIG
+    
+    Returns:
+        _PlotConfig: 已解析的繪圖配置
+    """
+    if plot_config is None:
+        plot_config = DEFAULT_BASEMAP_CONFIG
+    return _parse_plot_config(json.dumps(plot_config, sort_keys=True, default=str))
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_plot_config(config_json):
+    """
+    將序列化的繪圖配置轉為 _PlotConfig，支援 databasemanager 格式的 map_configurations
+    
+    Args:
+        config_json: json.dumps 後的繪圖配置
+    
+    Returns:
+        _PlotConfig: 已解析的繪圖配置
+    """
+    plot_config = json.loads(config_json)
+    color_map = plot_config.get('colors', {})
+    
+    # databasemanager 格式：使用第一個站點的配置，沒有時使用 MT
+    if 'map_configurations' in plot_config:
+        map_configs = plot_config.get('map_configurations', {})
+        station_config = next(iter(map_configs.values()), None) or map_configs.get('MT', {})
+        if station_config:
+            color_map = station_config.get('colors', {})
+    
+    # 原始點大小需除以 15
+    if 'original_size' in plot_config:
+        point_size = plot_config['original_size'] / 15
+    else:
+        point_size = plot_config.get('point_size', 6.67)
+    
+    # 前綴轉為小寫並由長到短排序，最長前綴優先比對，例如 'miss12' 不會被較短的 'miss1' 先行匹配
+    color_keys = sorted(
+        ((str(key).lower(), value) for key, value in color_map.items()),
+        key=lambda pair: -len(pair[0])
+    )
+    
+    return _PlotConfig(
+        map_size=tuple(plot_config.get('map_size', (20, 20))),
+        point_size=point_size,
+        title_fontsize=plot_config.get('title_fontsize', 20),
+        invert_x_axis=plot_config.get('invert_x_axis', False),
+        color_keys=tuple(color_keys),
+        default_color=color_map.get('default', 'green'),
+        dpi=plot_config.get('dpi', PLOT_DPI),
+        pil_kwargs=plot_config.get('pil_kwargs', PNG_SAVE_KWARGS)
+    )
+
+
+def _build_defect_colors(defect_types, color_keys, default):
+    """
+    依缺陷類型名稱的前綴建立缺陷類型到顏色的映射，若未定義則使用默認顏色
+    
+    Args:
+        defect_types: 缺陷類型列表
+        color_keys: _PlotConfig.color_keys
+        default: 默認顏色
+    
+    Returns:
+        dict: 缺陷類型到顏色的映射
+    """
+    defect_colors = {}
+    for defect_type in defect_types:
+        name = str(defect_type).lower()
+        defect_colors[defect_type] = next(
+            (value for key, value in color_keys if name.startswith(key)), default
+        )
+    return defect_colors
+
+
+def _rasterize_defects(ax, df, defect_colors):
+    """
+    使用 datashader 將缺陷點位點陣化為單張影像並繪製到 ax
+    
+    Args:
+        ax: matplotlib Axes
+        df: 包含 'Col', 'Row', 'DefectType' 欄位的 DataFrame
+        defect_colors: 缺陷類型到顏色的映射
+    """
+    x0, x1 = float(df['Col'].min()), float(df['Col'].max())
+    y0, y1 = float(df['Row'].min()), float(df['Row'].max())
+    # 每個座標格對應一個像素，並限制影像大小
+    width = int(min(max(x1 - x0 + 1, 1), RASTER_MAX_PIXELS))
+    height = int(min(max(y1 - y0 + 1, 1), RASTER_MAX_PIXELS))
+    
+    defect_type = df['DefectType']
+    if isinstance(defect_type.dtype, pd.CategoricalDtype):
+        # 已是類別型時只轉換類別字典，不逐列轉字串
+        defect_type = defect_type.cat.remove_unused_categories()
+        defect_type = defect_type.cat.rename_categories([str(c) for c in defect_type.cat.categories])
+    else:
+        defect_type = defect_type.astype(str).astype('category')
+    
+    points = pd.DataFrame({
+        'Col': df['Col'].to_numpy(dtype=np.float64),
+        'Row': df['Row'].to_numpy(dtype=np.float64),
+        'DefectType': defect_type
+    })
+    canvas = datashader.Canvas(
+        plot_width=width, plot_height=height,
+        x_range=(x0 - 0.5, x1 + 0.5), y_range=(y0 - 0.5, y1 + 0.5)
+    )
+    agg = canvas.points(points, 'Col', 'Row', datashader.count_cat('DefectType'))
+    color_key = {str(dt): color for dt, color in defect_colors.items()}
+    # 讓單點格子也清楚可見
+    img = ds_tf.shade(agg, color_key=color_key, min_alpha=RASTER_ALPHA)
+    
+    rgba = img.data.view(np.uint8).reshape(img.shape + (4,))
+    ax.imshow(
+        rgba, origin='lower', interpolation='nearest', aspect='auto',
+        extent=(x0 - 0.5, x1 + 0.5, y0 - 0.5, y1 + 0.5)
+    )
+
+
+def _draw_raster_points(ax, cols, rows, codes, colors):
+    """
+    以 NumPy 索引將點位直接寫入 RGBA 影像並繪製到 ax，每個座標格對應一個像素
+    
+    Args:
+        ax: matplotlib Axes
+        cols: 點位 Col 座標
+        rows: 點位 Row 座標
+        codes: 每個點位的顏色索引，負值表示不繪製
+        colors: 顏色列表
+    """
+    cols = np.asarray(cols, dtype=np.float64)
+    rows = np.asarray(rows, dtype=np.float64)
+    codes = np.asarray(codes)
+    
+    x0, x1 = cols.min(), cols.max()
+    y0, y1 = rows.min(), rows.max()
+    width = int(min(max(x1 - x0 + 1, 1), RASTER_MAX_PIXELS))
+    height = int(min(max(y1 - y0 + 1, 1), RASTER_MAX_PIXELS))
+    
+    # 座標範圍未超過上限時，像素索引即為座標偏移量
+    xi = ((cols - x0) * ((width - 1) / max(x1 - x0, 1))).astype(np.intp)
+    yi = ((rows - y0) * ((height - 1) / max(y1 - y0, 1))).astype(np.intp)
+    
+    palette = (to_rgba_array(colors) * 255).astype(np.uint8)
+    palette[:, 3] = RASTER_ALPHA
+    
+    drawn = codes >= 0
+    img = np.zeros((height, width, 4), dtype=np.uint8)
+    img[yi[drawn], xi[drawn]] = palette[codes[drawn]]
+    
+    ax.imshow(
+        img, origin='lower', interpolation='nearest', aspect='auto',
+        extent=(x0 - 0.5, x1 + 0.5, y0 - 0.5, y1 + 0.5)
+    )
+
+
 def plot_lossmap(df, output_path, title=None):
     """
     繪製損失點地圖（LOSS MAP），樣式與FPY map保持一致
@@ -309,29 +919,28 @@ def plot_lossmap(df, output_path, title=None):
         point_size = 100 / 50
         title_fontsize = 20
         
-        # 創建新的圖形 - 確保線程安全
-        plt.ioff()  # 關閉交互模式
-        fig = plt.figure(figsize=map_size)
-        ax = fig.add_subplot(111)
+        # 取得本線程的可重用圖形
+        fig, ax = _get_fig(map_size)
         fig.subplots_adjust(left=0.07, right=0.93, bottom=0.07, top=0.93)
         
         # 設置黑色背景
         ax.set_facecolor('black')
         
+        # 大量點位時直接寫入點陣影像，不經 matplotlib 逐點處理
+        use_raster = len(df) >= RASTER_MIN_POINTS
+        
         if has_status:
             # 根據status分類點
-            status_colors = {
-                'good_to_good': 'lightgray',  # 良品→良品: 黑色
-                'good_to_bad': 'red',     # 良品→缺陷: 紅色(損失點)
-                'bad_to_bad': 'black'       # 缺陷→缺陷: 紅色
-            }
-            
-            # 為每種狀態繪製散點
-            for status, color in status_colors.items():
-                points = df[df['status'] == status]
-                if not points.empty:
-                    ax.scatter(points['Col'], points['Row'], c=color, s=point_size, 
-                              label=status, alpha=0.6)
+            if use_raster:
+                codes = pd.Categorical(df['status'], categories=list(LOSS_STATUS_COLORS)).codes
+                _draw_raster_points(ax, df['Col'], df['Row'], codes, list(LOSS_STATUS_COLORS.values()))
+            else:
+                # 為每種狀態繪製散點
+                for status, color in LOSS_STATUS_COLORS.items():
+                    points = df[df['status'] == status]
+                    if not points.empty:
+                        ax.scatter(points['Col'], points['Row'], c=color, s=point_size, 
+                                  label=status, alpha=0.6, rasterized=True)
             
             # 添加自定義圖例
             from matplotlib.lines import Line2D
@@ -347,7 +956,11 @@ def plot_lossmap(df, output_path, title=None):
                      bbox_to_anchor=(1, 0.5))
         else:
             # 向後兼容，處理舊版本返回的DataFrame
-            ax.scatter(df['Col'], df['Row'], c='red', s=point_size, label='Loss', alpha=0.6)
+            if use_raster:
+                _draw_raster_points(ax, df['Col'], df['Row'], np.zeros(len(df), np.intp), ['red'])
+            else:
+                ax.scatter(df['Col'], df['Row'], c='red', s=point_size, label='Loss', alpha=0.6,
+                           rasterized=True)
             
             # 簡單圖例
             from matplotlib.lines import Line2D
@@ -370,19 +983,13 @@ def plot_lossmap(df, output_path, title=None):
         
         # 保存圖像
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-        fig.savefig(output_path, bbox_inches='tight')
-        plt.close(fig)
+        fig.savefig(output_path, bbox_inches='tight', dpi=PLOT_DPI, pil_kwargs=PNG_SAVE_KWARGS)
         
         logger.info(f"成功生成損失地圖: {output_path}")
         return True
     
     except Exception as e:
         logger.error(f"生成損失地圖時出錯: {e}")
-        # 確保關閉任何開啟的圖形
-        try:
-            plt.close()
-        except:
-            pass
         return False
 
 
@@ -408,17 +1015,21 @@ def plot_fpy_map(df, output_path, title=None):
         point_size = 100 / 15
         title_fontsize = 20
         
-        # 創建新的圖形 - 確保線程安全
-        plt.ioff()  # 關閉交互模式
-        fig = plt.figure(figsize=map_size)
-        ax = fig.add_subplot(111)
+        # 取得本線程的可重用圖形
+        fig, ax = _get_fig(map_size)
         fig.subplots_adjust(left=0.07, right=0.93, bottom=0.07, top=0.93)
         
-        # 根據 CombinedDefectType 設置顏色 (0=缺陷, 1=良品)
-        colors = df['CombinedDefectType'].map({0: 'red', 1: 'black'})
+        # 根據 CombinedDefectType 設置顏色 (0=缺陷, 1=良品)，以整數代碼查色表，不逐點解析顏色字串
+        codes = df['CombinedDefectType'].to_numpy(dtype=np.intp)
         
-        # 繪製散點圖
-        ax.scatter(df['Col'], df['Row'], c=colors, s=point_size, alpha=0.6)
+        # 繪製散點圖，大量點位時直接寫入點陣影像
+        if len(df) >= RASTER_MIN_POINTS:
+            _draw_raster_points(ax, df['Col'], df['Row'], codes, FPY_CMAP.colors)
+        else:
+            ax.scatter(
+                df['Col'].to_numpy(), df['Row'].to_numpy(), c=codes, cmap=FPY_CMAP, vmin=0, vmax=1,
+                s=point_size, alpha=0.6, rasterized=True
+            )
         
         # 配置軸和標題
         ax.invert_yaxis()
@@ -430,31 +1041,24 @@ def plot_fpy_map(df, output_path, title=None):
         
         ax.set_title(f'FPY Defect Map - {title}', fontsize=title_fontsize)
         
-        # 添加圖例
-        from matplotlib.lines import Line2D
+        # 添加圖例，顏色與色表一致
         legend_elements = [
             Line2D([0], [0], marker='o', color='w', label='No Defect (1)',
-                   markerfacecolor='black', markersize=8),
+                   markerfacecolor=FPY_CMAP.colors[1], markersize=8),
             Line2D([0], [0], marker='o', color='w', label='Defect (0)',
-                   markerfacecolor='red', markersize=8),
+                   markerfacecolor=FPY_CMAP.colors[0], markersize=8),
         ]
         ax.legend(handles=legend_elements, title='FPY Class', loc='center left', bbox_to_anchor=(1, 0.5))
         
         # 保存圖像
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-        fig.savefig(output_path, bbox_inches='tight')
-        plt.close(fig)
+        fig.savefig(output_path, bbox_inches='tight', dpi=PLOT_DPI, pil_kwargs=PNG_SAVE_KWARGS)
         
         logger.info(f"成功生成FPY地圖: {output_path}")
         return True
     
     except Exception as e:
         logger.error(f"生成FPY地圖時出錯: {e}")
-        # 確保關閉任何開啟的圖形
-        try:
-            plt.close()
-        except:
-            pass
         return False
 
 
@@ -478,32 +1082,24 @@ def plot_fpy_bar(summary_df, output_path):
             logger.error("DataFrame 缺少必要欄位: 'ID', 'FPY'")
             return False
         
-        # 創建和配置圖形 - 確保線程安全
-        plt.ioff()  # 關閉交互模式
-        fig = plt.figure(figsize=(10, 5))
-        ax = fig.add_subplot(111)
+        # 取得本線程的可重用圖形
+        fig, ax = _get_fig((10, 5))
         ax.bar(summary_df['ID'], summary_df['FPY'], color='skyblue')
         ax.set_ylim(0, 100)
-        plt.setp(ax.get_xticklabels(), rotation=45)
+        ax.tick_params(axis='x', labelrotation=45)
         ax.set_ylabel('FPY (%)')
         ax.set_title('First Pass Yield')
         fig.tight_layout()
         
         # 保存圖像
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-        fig.savefig(output_path)
-        plt.close(fig)
+        fig.savefig(output_path, dpi=PLOT_DPI, pil_kwargs=PNG_SAVE_KWARGS)
         
         logger.info(f"成功生成FPY長條圖: {output_path}")
         return True
     
     except Exception as e:
         logger.error(f"生成FPY長條圖時出錯: {e}")
-        # 確保關閉任何開啟的圖形
-        try:
-            plt.close()
-        except:
-            pass
         return False
 
 
@@ -527,36 +1123,41 @@ def check_csv_alignment(csv_path, recipe, align_config):
             return "error", f"找不到配方 {recipe} 的對齊關鍵字"
             
         # 讀取CSV並解析，查找包含標頭行的CSV
-        header_row = find_header_row(csv_path)
+        header_row = find_header_row(csv_path, comma_fallback=True)
         if header_row is None:
             return "error", "找不到CSV標頭行"
             
-        # 使用pandas讀取CSV
-        import pandas as pd
+        # 確保必要的列存在
+        required_cols = ['Col', 'Row', 'DefectType']
+        
+        # 使用pandas讀取CSV，只解析對齊檢查需要的欄位；缺少的欄位在下方回報
         try:
-            df = pd.read_csv(csv_path, skiprows=header_row)
+            df = pd.read_csv(
+                csv_path, skiprows=header_row, usecols=lambda col: col in required_cols, dtype=MAP_DTYPES
+            )
         except Exception as e:
             logger.error(f"讀取CSV失敗: {e}")
             return "error", f"讀取CSV失敗: {e}"
             
-        # 確保必要的列存在
-        required_cols = ['Col', 'Row', 'DefectType']
         if not all(col in df.columns for col in required_cols):
             missing_cols = [col for col in required_cols if col not in df.columns]
             return "error", f"CSV缺少必要列: {', '.join(missing_cols)}"
             
-        # 檢查對齊點是否存在
+        # 檢查對齊點是否存在：先以類別代碼篩出對齊點的缺陷類型，再將候選點位建成雜湊集合，
+        # 每個對齊點只需一次查找
         found_points = 0
         total_points = len(alignment_points)
+        point_types = {point[2] for point in alignment_points if isinstance(point, list) and len(point) >= 3}
+        candidates = df[df['DefectType'].isin(point_types)]
+        key_set = set(zip(
+            candidates['Col'].tolist(), candidates['Row'].tolist(), candidates['DefectType'].tolist()
+        ))
         
         for point in alignment_points:
             if isinstance(point, list) and len(point) >= 3:
                 col_val, row_val, defect_type = point[0], point[1], point[2]
                 
-                # 查找匹配的行
-                matches = df[(df['Col'] == col_val) & (df['Row'] == row_val) & (df['DefectType'] == defect_type)]
-                
-                if not matches.empty:
+                if (col_val, row_val, defect_type) in key_set:
                     found_points += 1
                     logger.info(f"找到對齊點: Col={col_val}, Row={row_val}, DefectType={defect_type}")
                 else:
@@ -573,46 +1174,3 @@ def check_csv_alignment(csv_path, recipe, align_config):
     except Exception as e:
         logger.error(f"檢查CSV對齊時發生錯誤: {e}")
         return "error", f"檢查失敗: {str(e)}"
-
-
-def find_header_row(file_path, max_lines=30):
-    """
-    智能查找CSV檔案中的標頭行
-    
-    Args:
-        file_path: CSV檔案路徑
-        max_lines: 最大檢查行數
-        
-    Returns:
-        int: 標頭行號，如果找不到則返回None
-    """
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = []
-            for i in range(max_lines):
-                line = f.readline()
-                if not line:
-                    break
-                lines.append(line.strip())
-        
-        # 尋找包含 "Row", "Col", "DefectType" 的行
-        for i, line in enumerate(lines):
-            if all(field in line for field in ["Row", "Col", "DefectType"]):
-                logger.info(f"在第 {i} 行找到標頭")
-                return i
-                
-        # 第二種啟發式: 尋找包含大量逗號的行
-        comma_counts = [line.count(',') for line in lines]
-        if comma_counts:
-            max_commas = max(comma_counts)
-            if max_commas > 3:  # 假設至少需要有4列
-                header_idx = comma_counts.index(max_commas)
-                logger.info(f"根據逗號數量，在第 {header_idx} 行找到可能的標頭")
-                return header_idx
-                
-        logger.warning(f"在檔案 {file_path} 中找不到標頭行")
-        return None
-        
-    except Exception as e:
-        logger.error(f"查找標頭行時發生錯誤: {e}")
-        return None 
\ No newline at end of file
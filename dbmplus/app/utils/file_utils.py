@@ -3,13 +3,21 @@
 """
 import os
 import re
+import csv
 import shutil
+import functools
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 from .logger import get_logger
 from typing import Optional
 
+try:
+    import pyarrow
+except ImportError:  # pyarrow 為可選依賴，未安裝時使用 pandas 的 C 引擎
+    pyarrow = None
+
 logger = get_logger("file_utils")
 
 # 檔名正規表達式：{device}_{component}_{time}.csv
@@ -18,6 +26,20 @@ AOI_FILENAME_PATTERN = re.compile(r'^[A-Z0-9]+_([A-Z0-9]+)_\d{12}\.csv$')
 # 處理後格式: 僅剩 component.csv
 PROCESSED_FILENAME_PATTERN = re.compile(r'^[A-Z0-9]+\.csv$')
 
+# 繪圖與良率計算只需要的欄位及其讀取型別
+MAP_COLUMNS = ['Col', 'Row', 'DefectType']
+MAP_DTYPES = {'DefectType': 'category'}
+
+# 讀取後縮減為最小整數型別的座標欄位
+COORD_COLUMNS = ('Col', 'Row')
+
+# 座標欄位可縮減的整數型別，由小到大嘗試；不使用 int8，避免後續座標運算溢位
+COORD_DTYPES = (np.int16, np.int32)
+
+# 分隔符偵測讀取的樣本大小與候選分隔符
+SNIFF_SAMPLE_BYTES = 4096
+SNIFF_DELIMITERS = ',\t;'
+
 
 def ensure_directory(directory_path):
     """
@@ -50,9 +72,13 @@ def list_files(directory, pattern=None):
         logger.warning(f"目錄不存在: {directory}")
         return []
         
-    if pattern:
-        return [f for f in os.listdir(directory) if re.match(pattern, f)]
-    return [f for f in os.listdir(directory) if Path(directory / f).is_file()]
+    # scandir 的 DirEntry 在讀取目錄時已取得檔案類型，不需再逐一 stat
+    regex = re.compile(pattern) if pattern else None
+    with os.scandir(directory) as it:
+        return [
+            entry.name for entry in it
+            if entry.is_file() and (regex is None or regex.match(entry.name))
+        ]
 
 
 def list_directories(directory):
@@ -70,22 +96,45 @@ def list_directories(directory):
         logger.warning(f"目錄不存在: {directory}")
         return []
         
-    return [f for f in os.listdir(directory) if Path(directory / f).is_dir()]
+    with os.scandir(directory) as it:
+        return [entry.name for entry in it if entry.is_dir()]
 
 
-def load_csv(file_path: str, skiprows: int = 0) -> Optional[pd.DataFrame]:
+def load_csv(file_path: str, skiprows: int = 0, usecols=None, dtypes=None) -> Optional[pd.DataFrame]:
     """
     讀取CSV檔案為DataFrame，可選擇跳過開頭的行數
     
+    安裝 pyarrow 時優先使用多執行緒的 pyarrow 引擎，失敗時改用 C 引擎；
+    分隔符先偵測後直接傳入，不需先失敗再重讀
+    
     Args:
         file_path: CSV檔案路徑
         skiprows: 要跳過的行數（預設為 0）
+        usecols: 只讀取的欄位列表（預設讀取全部）
+        dtypes: 欄位型別，例如 MAP_DTYPES
         
     Returns:
-        Optional[DataFrame]: 讀取的DataFrame或None（如果讀取失敗）
+        Optional[DataFrame]: 讀取的DataFrame或None（如果讀取失敗）；
+                             Col/Row 整數欄位會縮減為可容納數值的最小整數型別
     """
+    sep = _sniff_sep(file_path)
+    read_kwargs = {'sep': sep, 'skiprows': skiprows, 'usecols': usecols, 'dtype': dtypes}
+    df = _read_csv(file_path, read_kwargs)
+    return _downcast(df) if df is not None else None
+
+
+def _read_csv(file_path, read_kwargs):
+    """依序嘗試 pyarrow 引擎、C 引擎與替代分隔符讀取CSV，失敗時返回 None"""
+    if pyarrow is not None:
+        try:
+            return pd.read_csv(file_path, engine='pyarrow', **read_kwargs)
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            logger.debug(f"pyarrow 引擎讀取CSV失敗: {file_path}, 改用 C 引擎: {e}")
+    
     try:
-        return pd.read_csv(file_path, skiprows=skiprows)
+        return pd.read_csv(file_path, **read_kwargs)
     except pd.errors.ParserError:
         logger.warning(f"標準讀取CSV失敗: {file_path}, 嘗試替代方法...")
 
@@ -103,11 +152,13 @@ def load_csv(file_path: str, skiprows: int = 0) -> Optional[pd.DataFrame]:
                 sep = None
 
             if sep:
-                df = pd.read_csv(file_path, sep=sep, skiprows=skiprows, on_bad_lines='skip')
+                read_kwargs = {**read_kwargs, 'sep': sep}
+                df = pd.read_csv(file_path, on_bad_lines='skip', **read_kwargs)
                 logger.info(f"使用分隔符 '{sep}' 成功讀取CSV: {file_path}")
                 return df
 
-            df = pd.read_csv(file_path, skiprows=skiprows, engine='python', on_bad_lines='skip')
+            read_kwargs = {**read_kwargs, 'sep': ','}
+            df = pd.read_csv(file_path, engine='python', on_bad_lines='skip', **read_kwargs)
             logger.info(f"使用Python引擎成功讀取CSV: {file_path}")
             return df
 
@@ -119,14 +170,89 @@ def load_csv(file_path: str, skiprows: int = 0) -> Optional[pd.DataFrame]:
         return None
 
 
+def _sniff_sep(file_path):
+    """
+    偵測CSV的分隔符，結果依檔案路徑、修改時間與大小快取
+    
+    Args:
+        file_path: CSV檔案路徑
+    
+    Returns:
+        str: 分隔符，無法偵測或標題行無法確認時返回 ','
+    """
+    try:
+        stat = os.stat(file_path)
+        return _sniff_sep_cached(str(file_path), stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return ','
+
+
+@functools.lru_cache(maxsize=1024)
+def _sniff_sep_cached(file_path, mtime_ns, size):
+    """
+    以標題行之後的樣本偵測分隔符，並以標題行確認
+    
+    標題行以偵測到的分隔符切分後須為多欄，且欄數與第一筆資料相同，否則返回 ','；
+    無法偵測時同樣返回 ','，讓結果也被快取，不會每次讀取都重新偵測；
+    mtime_ns 與 size 僅作為快取鍵，檔案變更後會重新偵測
+    """
+    header_row = find_header_row(file_path) or 0
+    with open(file_path, 'rb') as f:
+        lines = f.read(SNIFF_SAMPLE_BYTES).decode('utf-8', errors='replace').splitlines()
+    lines = lines[header_row:]
+    if len(lines) < 2:
+        return ','
+    
+    try:
+        delimiter = csv.Sniffer().sniff('\n'.join(lines), delimiters=SNIFF_DELIMITERS).delimiter
+    except csv.Error:
+        return ','
+    header_fields = lines[0].count(delimiter) + 1
+    if header_fields < 2 or lines[1].count(delimiter) + 1 != header_fields:
+        return ','
+    return delimiter
+
+
+def _downcast(df):
+    """
+    將整數座標欄位縮減為 int16/int32，binary 欄位轉為 uint8，減少記憶體與後續運算的資料量
+    
+    Args:
+        df: DataFrame
+    
+    Returns:
+        DataFrame: 縮減型別後的 DataFrame（原地修改）
+    """
+    for col in COORD_COLUMNS:
+        if col not in df.columns or df[col].dtype.kind not in 'iu':
+            continue
+        values = df[col].to_numpy()
+        lo, hi = (values.min(), values.max()) if values.size else (0, 0)
+        for dtype in COORD_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                df[col] = values.astype(dtype)
+                break
+    # 有空值的 binary 欄位會被讀成浮點數，保持原樣，不在讀取時拋出例外
+    if 'binary' in df.columns and df['binary'].dtype.kind in 'iub':
+        df['binary'] = df['binary'].astype(np.uint8)
+    return df
+
+
 
-def find_header_row(csv_path, header_columns=None):
+def find_header_row(csv_path, header_columns=None, comma_fallback=False, max_lines=30):
     """
     尋找CSV檔案中的標題行
     
+    尋找包含所有標題列名的行；comma_fallback 為 True 時，若整個檔案都找不到，
+    退而取前 max_lines 行中逗號最多的行。結果依檔案路徑、修改時間與大小快取，
+    同一檔案不會重複讀取
+    
     Args:
         csv_path: CSV檔案路徑
         header_columns: 標題行應包含的列名列表，默認為['Col', 'Row', 'DefectType']
+        comma_fallback: 找不到標題列名時是否改用逗號數量判斷標題行
+        max_lines: 逗號啟發式檢查的最大行數
     
     Returns:
         int: 標題行的索引，若找不到則返回None
@@ -135,16 +261,45 @@ def find_header_row(csv_path, header_columns=None):
         header_columns = ['Col', 'Row', 'DefectType']
         
     try:
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
-            for i, line in enumerate(f):
-                if all(col in line for col in header_columns):
-                    return i
-        return None
+        stat = os.stat(csv_path)
+        return _find_header_row_cached(
+            str(csv_path), stat.st_mtime_ns, stat.st_size, tuple(header_columns),
+            max_lines if comma_fallback else 0
+        )
     except Exception as e:
         logger.error(f"查找標題行失敗: {csv_path}, 錯誤: {e}")
         return None
 
 
+@functools.lru_cache(maxsize=1024)
+def _find_header_row_cached(csv_path, mtime_ns, size, header_columns, max_lines):
+    """
+    以位元組模式掃描標題行，標題列名皆為 ASCII，不需解碼整行
+    
+    mtime_ns 與 size 僅作為快取鍵，檔案變更後會重新掃描；max_lines 為 0 時不使用逗號啟發式
+    """
+    tokens = [col.encode('utf-8') for col in header_columns]
+    comma_counts = []
+    
+    with open(csv_path, 'rb') as f:
+        for i, line in enumerate(f):
+            if all(token in line for token in tokens):
+                return i
+            if i < max_lines:
+                comma_counts.append(line.count(b','))
+    
+    # 第二種啟發式: 尋找包含大量逗號的行
+    if comma_counts:
+        max_commas = max(comma_counts)
+        if max_commas > 3:  # 假設至少需要有4列
+            header_idx = comma_counts.index(max_commas)
+            logger.info(f"根據逗號數量，在第 {header_idx} 行找到可能的標頭")
+            return header_idx
+    
+    logger.warning(f"在檔案 {csv_path} 中找不到標頭行")
+    return None
+
+
 def save_df_to_csv(df, file_path, index=False, encoding='utf-8-sig'):
     """
     安全保存DataFrame到CSV檔案
@@ -197,7 +352,11 @@ def backup_file(file_path, backup_dir=None):
     backup_path = backup_dir / backup_filename
     
     try:
-        shutil.copy2(file_path, backup_path)
+        # copyfile 在 Linux 上以 sendfile、在 macOS 上以 fcopyfile 於核心內複製；
+        # 只保留時間戳記，省去 copy2 的權限與擴充屬性複製
+        shutil.copyfile(file_path, backup_path)
+        st = file_path.stat()
+        os.utime(backup_path, ns=(st.st_atime_ns, st.st_mtime_ns))
         logger.info(f"已備份檔案: {file_path} -> {backup_path}")
         return str(backup_path)
     except Exception as e:
@@ -1,6 +1,10 @@
 import os
 import sys
+import time
+import queue
+import atexit
 import logging
+import multiprocessing
 import logging.handlers
 from pathlib import Path
 
@@ -10,10 +14,23 @@ DEFAULT_LOG_CONFIG = {
     "log_dir": "logs",
     "level": "INFO",
     "log_format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    "max_size": 10 * 1024 * 1024,  # 10 MB
+    "max_size": 32 * 1024 * 1024,  # 32 MB
     "backup_count": 5
 }
 
+# 設定檔中的等級名稱對應的 logging 等級
+_LEVELS = {
+    "CRITICAL": logging.CRITICAL,
+    "ERROR": logging.ERROR,
+    "WARNING": logging.WARNING,
+    "INFO": logging.INFO,
+    "DEBUG": logging.DEBUG,
+}
+
+LOG_STREAM_BUFFER = 1 << 20          # 日誌檔案寫入緩衝區 1 MB
+LOG_ROLLOVER_CHECK_BYTES = 64 * 1024  # 約每寫入 64 KB 才檢查一次是否需要輪替
+LOG_FLUSH_INTERVAL = 1.0              # 最長每秒把緩衝內容寫入檔案，供介面讀取日誌
+
 # ---------------------- [工具函數] ----------------------
 
 def get_base_dir() -> Path:
@@ -29,6 +46,98 @@ def resolve_log_dir(config_dir: str) -> Path:
         return raw_path
     return get_base_dir() / raw_path
 
+# ---------------------- [日誌處理器] ----------------------
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    使用大緩衝區的輪替檔案處理器
+
+    每筆記錄只格式化一次，輪替檢查改為依累計寫入量進行，不再每筆記錄都定位檔案尾端；
+    緩衝內容在累計達檢查間隔、超過刷新間隔或出現警告以上的記錄時才寫入檔案，
+    閒置時由 FlushingQueueListener 呼叫 flush_now() 寫出。
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._bytes_since_check = 0
+        self._flush_due = True
+        self._unflushed = False  # 緩衝區中是否有尚未寫入檔案的內容
+        self._last_flush = time.monotonic()
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_STREAM_BUFFER,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+            # 以已格式化的訊息長度估算寫入量，跨過檢查間隔時才做實際的大小檢查
+            self._bytes_since_check += len(msg) + len(self.terminator)
+            if self._bytes_since_check >= LOG_ROLLOVER_CHECK_BYTES:
+                self._bytes_since_check = 0
+                self._flush_due = True
+                if self._exceeds_max_bytes(msg):
+                    self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(msg + self.terminator)
+            self._unflushed = True
+            if record.levelno >= logging.WARNING:
+                self._flush_due = True
+            self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _exceeds_max_bytes(self, msg):
+        """寫入 msg 後檔案是否會超過 maxBytes"""
+        if self.maxBytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        self.stream.seek(0, 2)
+        return self.stream.tell() + len(msg) >= self.maxBytes
+
+    def flush(self):
+        now = time.monotonic()
+        if self._flush_due or now - self._last_flush >= LOG_FLUSH_INTERVAL:
+            super().flush()
+            self._flush_due = False
+            self._unflushed = False
+            self._last_flush = now
+
+    def flush_now(self):
+        """立即把緩衝內容寫入檔案"""
+        if self._unflushed:
+            self._flush_due = True
+            self.flush()
+
+    def close(self):
+        self._flush_due = True
+        super().close()
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """佇列閒置超過 LOG_FLUSH_INTERVAL 時，把緩衝式 handler 的內容寫入檔案"""
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(timeout=LOG_FLUSH_INTERVAL)
+            except queue.Empty:
+                for handler in self.handlers:
+                    if isinstance(handler, BufferedRotatingFileHandler):
+                        handler.flush_now()
+
+class _ForwardHandler(logging.Handler):
+    """把子進程送來的記錄交給主進程中同名的 logger 處理"""
+
+    def emit(self, record):
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
 # ---------------------- [Logger 管理器] ----------------------
 
 class LoggerManager:
@@ -51,14 +160,63 @@ class LoggerManager:
         cfg = config or DEFAULT_LOG_CONFIG
 
         self.log_dir = resolve_log_dir(cfg.get("log_dir", "logs"))
-        self.log_level = getattr(logging, cfg.get("level", "INFO").upper(), logging.INFO)
+        self.log_level = _LEVELS.get(cfg.get("level", "INFO").upper(), logging.INFO)
         self.log_format = cfg.get("log_format", DEFAULT_LOG_CONFIG["log_format"])
+        self._formatter = logging.Formatter(self.log_format)
+        # 格式未用到的執行緒/進程欄位不再於每筆 LogRecord 中收集
+        logging.logThreads = "%(thread" in self.log_format
+        logging.logProcesses = "%(process" in self.log_format
+        logging.logMultiprocessing = "%(processName" in self.log_format
         self.max_size = cfg.get("max_size", DEFAULT_LOG_CONFIG["max_size"])
         self.backup_count = cfg.get("backup_count", DEFAULT_LOG_CONFIG["backup_count"])
 
+        # 檔案與終端輸出由背景線程負責，呼叫端只需把記錄放入佇列
+        self._listeners = []
+        atexit.register(self.shutdown)
+
+        # 子進程（如繪圖進程）不開啟日誌檔，記錄經 use_parent_queue() 交給主進程寫入；
+        # 多個進程輪替同一個檔案會失敗，Windows 上檔案被其他進程開啟時無法改名
+        self._is_child = multiprocessing.parent_process() is not None
+        if self._is_child:
+            return
+
         os.makedirs(self.log_dir, exist_ok=True)
         self._configure_root_logger()
 
+    def _attach_queue(self, logger: logging.Logger, *handlers: logging.Handler):
+        """為 logger 加上 QueueHandler，實際輸出交給背景 QueueListener"""
+        log_queue = queue.SimpleQueue()
+        listener = FlushingQueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        self._listeners.append(listener)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    def forward_from(self, log_queue):
+        """在主進程中接收子進程經 log_queue 送來的記錄，交給同名 logger 輸出"""
+        listener = logging.handlers.QueueListener(log_queue, _ForwardHandler())
+        listener.start()
+        self._listeners.append(listener)
+
+    def use_parent_queue(self, log_queue):
+        """在子進程中把所有記錄送往主進程的 log_queue"""
+        root_logger = logging.getLogger()
+        root_logger.setLevel(self.log_level)
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    def shutdown(self):
+        """停止背景寫入線程，並把佇列中剩餘的記錄寫出"""
+        while self._listeners:
+            listener = self._listeners.pop()
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+            # 子進程日誌佇列的送出線程需在直譯器結束前關閉，否則結束時會報錯
+            if hasattr(listener.queue, 'join_thread'):
+                listener.queue.close()
+                listener.queue.join_thread()
+
     def _configure_root_logger(self):
         root_logger = logging.getLogger()
         root_logger.setLevel(self.log_level)
@@ -70,19 +228,19 @@ class LoggerManager:
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setLevel(self.log_level)
-        console_handler.setFormatter(logging.Formatter(self.log_format))
-        root_logger.addHandler(console_handler)
+        console_handler.setFormatter(self._formatter)
 
         # File handler
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = BufferedRotatingFileHandler(
             self.log_dir / "app.log",
             maxBytes=self.max_size,
             backupCount=self.backup_count,
             encoding="utf-8"
         )
         file_handler.setLevel(self.log_level)
-        file_handler.setFormatter(logging.Formatter(self.log_format))
-        root_logger.addHandler(file_handler)
+        file_handler.setFormatter(self._formatter)
+
+        self._attach_queue(root_logger, console_handler, file_handler)
 
     def get_logger(self, name: str):
         """取得指定 logger（可為模組名）"""
@@ -93,25 +251,51 @@ class LoggerManager:
         logger.setLevel(self.log_level)
 
         # 讓特殊模組寫入獨立檔案
-        if name in ["data_processor", "ui_controller"]:
-            handler = logging.handlers.RotatingFileHandler(
+        if name in ["data_processor", "ui_controller"] and not self._is_child:
+            handler = BufferedRotatingFileHandler(
                 self.log_dir / f"{name}.log",
                 maxBytes=self.max_size,
                 backupCount=self.backup_count,
                 encoding="utf-8"
             )
-            handler.setFormatter(logging.Formatter(self.log_format))
-            logger.addHandler(handler)
+            handler.setFormatter(self._formatter)
+            self._attach_queue(logger, handler)
 
         self._loggers[name] = logger
         return logger
 
+    def log_lazy(self, name: str, level: int, fmt: str, *args):
+        """
+        僅在該等級啟用時才記錄，訊息以 % 格式延後到輸出時才組合
+
+        用法: log_lazy("data_processor", logging.DEBUG, "已處理 %s 個項目", n)
+        """
+        logger = self.get_logger(name)
+        if logger.isEnabledFor(level):
+            logger.log(level, fmt, *args)
+
 # ---------------------- [外部存取接口] ----------------------
 
-logger_manager = LoggerManager()
+# 日誌管理器於第一次取得 logger 時才建立，匯入本模組不會設定 handler
+_mgr = None
+
+def _get_mgr() -> LoggerManager:
+    global _mgr
+    if _mgr is None:
+        _mgr = LoggerManager()
+    return _mgr
 
 def get_logger(name: str):
-    return logger_manager.get_logger(name)
+    return _get_mgr().get_logger(name)
+
+def log_lazy(name: str, level: int, fmt: str, *args):
+    _get_mgr().log_lazy(name, level, fmt, *args)
+
+def forward_child_logs(log_queue):
+    _get_mgr().forward_from(log_queue)
+
+def use_parent_log_queue(log_queue):
+    _get_mgr().use_parent_queue(log_queue)
 
 def setup_logging():
     logger = get_logger("main")
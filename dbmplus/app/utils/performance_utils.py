@@ -2,16 +2,59 @@
 性能監控工具模塊，提供數據分析和圖表生成功能
 """
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
+import html
+import importlib.util
+import concurrent.futures
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 import datetime
 from .logger import get_logger
 
+# pandas 與 matplotlib 載入耗時，只在實際讀取或繪圖時才匯入
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pyarrow 為可選依賴，只檢查是否安裝，實際匯入交給 pandas；未安裝時使用 C 引擎
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
 logger = get_logger("performance_utils")
 
-def get_performance_data(days: int = 7, task_type: Optional[str] = None) -> pd.DataFrame:
+# 同時讀取性能日誌的最大線程數
+PERF_READ_WORKERS = 8
+
+# FPY 相關任務的函數名稱關鍵字
+FPY_TASK_KEYWORD = "fpy"
+
+# 性能報告詳細數據表格的最大行數
+REPORT_TABLE_ROWS = 100
+
+# 讀取性能日誌時使用的欄位型別：重複度高的文字欄位以 category 儲存，耗時以 float32 儲存
+PERF_DTYPES = {
+    "function": "category",
+    "station": "category",
+    "status": "category",
+    "elapsed_time": "float32",
+}
+
+
+def _read_perf_log(log_file: Path) -> Optional["pd.DataFrame"]:
+    """讀取單日性能日誌，安裝 pyarrow 時優先使用 pyarrow 引擎，失敗時返回 None"""
+    import pandas as pd
+    
+    if HAS_PYARROW:
+        try:
+            return pd.read_csv(log_file, engine="pyarrow", dtype=PERF_DTYPES)
+        except Exception as e:
+            logger.debug(f"pyarrow 引擎讀取性能日誌失敗: {log_file}, 改用 C 引擎: {e}")
+    
+    try:
+        return pd.read_csv(log_file, dtype=PERF_DTYPES)
+    except Exception as e:
+        logger.error(f"讀取性能日誌失敗: {log_file}, 錯誤: {e}")
+        return None
+
+
+def get_performance_data(days: int = 7, task_type: Optional[str] = None) -> "pd.DataFrame":
     """
     讀取性能數據日誌
     
@@ -22,6 +65,8 @@ def get_performance_data(days: int = 7, task_type: Optional[str] = None) -> pd.D
     Returns:
         DataFrame: 性能數據
     """
+    import pandas as pd
+    
     try:
         log_dir = Path("logs/performance")
         if not log_dir.exists():
@@ -32,16 +77,18 @@ def get_performance_data(days: int = 7, task_type: Optional[str] = None) -> pd.D
         today = datetime.datetime.now()
         date_list = [(today - datetime.timedelta(days=i)).strftime("%Y%m%d") for i in range(days)]
         
-        # 讀取所有日期的日誌
+        # 單次列出目錄，依檔名中的日期篩選，不逐日檢查檔案是否存在；與原順序相同由新到舊
+        wanted_dates = set(date_list)
+        file_list = sorted(
+            (log_file for log_file in log_dir.glob("perf_*.csv") if log_file.stem[5:] in wanted_dates),
+            reverse=True
+        )
+        
+        # 以線程池同時讀取所有日期的日誌，檔案 I/O 與解析期間會釋放 GIL
         all_data = []
-        for date in date_list:
-            log_file = log_dir / f"perf_{date}.csv"
-            if log_file.exists():
-                try:
-                    df = pd.read_csv(log_file)
-                    all_data.append(df)
-                except Exception as e:
-                    logger.error(f"讀取性能日誌失敗: {log_file}, 錯誤: {e}")
+        if file_list:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(PERF_READ_WORKERS, len(file_list))) as executor:
+                all_data = [df for df in executor.map(_read_perf_log, file_list) if df is not None]
         
         if not all_data:
             logger.warning("沒有找到性能數據")
@@ -50,9 +97,14 @@ def get_performance_data(days: int = 7, task_type: Optional[str] = None) -> pd.D
         # 合併數據
         perf_data = pd.concat(all_data, ignore_index=True)
         
-        # 過濾指定任務類型
+        # 各日誌的類別不同時合併後會退回 object，重新統一為 category
+        for column, dtype in PERF_DTYPES.items():
+            if dtype == "category" and column in perf_data.columns:
+                perf_data[column] = perf_data[column].astype("category")
+        
+        # 過濾指定任務類型，task_type 視為純文字子字串
         if task_type:
-            perf_data = perf_data[perf_data["function"].str.contains(task_type)]
+            perf_data = perf_data[perf_data["function"].str.contains(task_type, regex=False, na=False)]
             
         return perf_data
     
@@ -71,6 +123,11 @@ def generate_performance_charts(output_dir: str = "reports/performance", days: i
     Returns:
         bool: 是否成功生成圖表
     """
+    import pandas as pd
+    import matplotlib
+    matplotlib.use('Agg')  # 只輸出檔案，不探測 GUI 後端
+    import matplotlib.pyplot as plt
+    
     try:
         # 確保輸出目錄存在
         output_path = Path(output_dir)
@@ -88,59 +145,67 @@ def generate_performance_charts(output_dir: str = "reports/performance", days: i
         # 設置matplotlib風格
         plt.style.use("ggplot")
         
-        # 圖表1: 各任務類型的執行時間對比
-        if "elapsed_time" in df.columns and "function" in df.columns:
-            task_time_data = df[df["elapsed_time"].notna()].groupby("function")["elapsed_time"].agg(['mean', 'min', 'max']).reset_index()
-            
-            plt.figure(figsize=(12, 6))
-            bars = plt.bar(task_time_data["function"], task_time_data["mean"], yerr=task_time_data["max"]-task_time_data["min"])
-            plt.xlabel("任務類型")
-            plt.ylabel("執行時間 (秒)")
-            plt.title("各類任務平均執行時間")
-            plt.xticks(rotation=45)
-            
-            # 在柱狀圖上添加數值標籤
-            for bar in bars:
-                height = bar.get_height()
-                plt.text(bar.get_x() + bar.get_width()/2., height + 0.1, f"{height:.2f}s", ha="center")
+        # 所有圖表共用同一個 Figure，每張圖清空後重畫，省去重複建立畫布的成本
+        fig = plt.figure()
+        try:
+            # 圖表1: 各任務類型的執行時間對比
+            if "elapsed_time" in df.columns and "function" in df.columns:
+                task_time_data = df[df["elapsed_time"].notna()].groupby("function", observed=True)["elapsed_time"].agg(['mean', 'min', 'max']).reset_index()
                 
-            plt.tight_layout()
-            plt.savefig(output_path / "task_execution_time.png")
-            plt.close()
-            
-        # 圖表2: FPY處理與FPY並行處理的效率對比
-        fpy_data = df[df["function"].str.contains("fpy")]
-        if not fpy_data.empty and "elapsed_time" in fpy_data.columns:
-            fpy_comparison = fpy_data.groupby("function")["elapsed_time"].mean().reset_index()
-            
-            plt.figure(figsize=(10, 5))
-            plt.bar(fpy_comparison["function"], fpy_comparison["elapsed_time"])
-            plt.xlabel("處理方式")
-            plt.ylabel("平均執行時間 (秒)")
-            plt.title("FPY處理與並行處理效率對比")
-            plt.tight_layout()
-            plt.savefig(output_path / "fpy_comparison.png")
-            plt.close()
-            
-        # 圖表3: 任務成功率統計
-        if "status" in df.columns:
-            status_counts = df.groupby(["function", "status"]).size().unstack(fill_value=0)
-            
-            # 計算成功率
-            if "成功" in status_counts.columns and "錯誤" in status_counts.columns:
-                total = status_counts.sum(axis=1)
-                success_rate = (status_counts["成功"] / total * 100).fillna(0)
+                fig.clf()
+                fig.set_size_inches(12, 6)
+                ax = fig.add_subplot()
+                bars = ax.bar(task_time_data["function"], task_time_data["mean"], yerr=task_time_data["max"]-task_time_data["min"])
+                ax.set_xlabel("任務類型")
+                ax.set_ylabel("執行時間 (秒)")
+                ax.set_title("各類任務平均執行時間")
+                ax.tick_params(axis='x', labelrotation=45)
+                
+                # 在柱狀圖上添加數值標籤
+                for bar in bars:
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height + 0.1, f"{height:.2f}s", ha="center")
+                    
+                fig.tight_layout()
+                fig.savefig(output_path / "task_execution_time.png")
+                
+            # 圖表2: FPY處理與FPY並行處理的效率對比
+            fpy_data = df[df["function"].str.contains(FPY_TASK_KEYWORD, regex=False, na=False)]
+            if not fpy_data.empty and "elapsed_time" in fpy_data.columns:
+                fpy_comparison = fpy_data.groupby("function", observed=True)["elapsed_time"].mean().reset_index()
                 
-                plt.figure(figsize=(10, 5))
-                plt.bar(success_rate.index, success_rate)
-                plt.xlabel("任務類型")
-                plt.ylabel("成功率 (%)")
-                plt.title("各類任務成功率")
-                plt.ylim(0, 100)
-                plt.xticks(rotation=45)
-                plt.tight_layout()
-                plt.savefig(output_path / "task_success_rate.png")
-                plt.close()
+                fig.clf()
+                fig.set_size_inches(10, 5)
+                ax = fig.add_subplot()
+                ax.bar(fpy_comparison["function"], fpy_comparison["elapsed_time"])
+                ax.set_xlabel("處理方式")
+                ax.set_ylabel("平均執行時間 (秒)")
+                ax.set_title("FPY處理與並行處理效率對比")
+                fig.tight_layout()
+                fig.savefig(output_path / "fpy_comparison.png")
+                
+            # 圖表3: 任務成功率統計
+            if "status" in df.columns:
+                status_counts = df.groupby(["function", "status"], observed=True).size().unstack(fill_value=0)
+                
+                # 計算成功率
+                if "成功" in status_counts.columns and "錯誤" in status_counts.columns:
+                    total = status_counts.sum(axis=1)
+                    success_rate = (status_counts["成功"] / total * 100).fillna(0)
+                    
+                    fig.clf()
+                    fig.set_size_inches(10, 5)
+                    ax = fig.add_subplot()
+                    ax.bar(success_rate.index, success_rate)
+                    ax.set_xlabel("任務類型")
+                    ax.set_ylabel("成功率 (%)")
+                    ax.set_title("各類任務成功率")
+                    ax.set_ylim(0, 100)
+                    ax.tick_params(axis='x', labelrotation=45)
+                    fig.tight_layout()
+                    fig.savefig(output_path / "task_success_rate.png")
+        finally:
+            plt.close(fig)
         
         # 生成性能報告HTML
         generate_performance_report(df, output_path)
@@ -152,7 +217,7 @@ def generate_performance_charts(output_dir: str = "reports/performance", days: i
         logger.error(f"生成性能圖表時發生錯誤: {e}")
         return False
 
-def generate_performance_report(df: pd.DataFrame, output_path: Path) -> bool:
+def generate_performance_report(df: "pd.DataFrame", output_path: Path) -> bool:
     """
     生成性能報告HTML文件
     
@@ -166,7 +231,8 @@ def generate_performance_report(df: pd.DataFrame, output_path: Path) -> bool:
     try:
         # 基本統計信息
         total_tasks = len(df)
-        task_types = df["function"].unique()
+        # 任務類型清單與表格一樣需轉義，空值不列入
+        task_types = html.escape(", ".join(map(str, df["function"].dropna().unique())))
         
         # 生成HTML
         html_content = f"""
@@ -191,7 +257,7 @@ def generate_performance_report(df: pd.DataFrame, output_path: Path) -> bool:
             <div class="summary">
                 <h2>摘要</h2>
                 <p>總任務數: {total_tasks}</p>
-                <p>任務類型: {", ".join(task_types)}</p>
+                <p>任務類型: {task_types}</p>
                 <p>報告生成時間: {datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
             </div>
             
@@ -212,40 +278,27 @@ def generate_performance_report(df: pd.DataFrame, output_path: Path) -> bool:
             </div>
         """
         
-        # 添加數據表格
+        # 各段內容先收集到列表，最後一次串接
+        parts = [html_content]
+        
+        # 添加數據表格 (最多顯示100行)，由 pandas 一次產生整個表格
         if not df.empty:
-            html_content += """
+            parts.append("""
             <h2>詳細數據</h2>
-            <table>
-                <tr>
-            """
-            
-            # 表頭
-            for col in df.columns:
-                html_content += f"<th>{col}</th>"
-                
-            html_content += "</tr>"
-            
-            # 數據行 (最多顯示100行)
-            for _, row in df.head(100).iterrows():
-                html_content += "<tr>"
-                for col in df.columns:
-                    html_content += f"<td>{row[col]}</td>"
-                html_content += "</tr>"
-                
-            html_content += "</table>"
+            """)
+            parts.append(df.head(REPORT_TABLE_ROWS).to_html(index=False, border=0))
             
-            if len(df) > 100:
-                html_content += f"<p>僅顯示前100行，總計{len(df)}行數據</p>"
+            if len(df) > REPORT_TABLE_ROWS:
+                parts.append(f"<p>僅顯示前{REPORT_TABLE_ROWS}行，總計{len(df)}行數據</p>")
         
-        html_content += """
+        parts.append("""
         </body>
         </html>
-        """
+        """)
         
         # 保存HTML文件
         with open(output_path / "performance_report.html", "w", encoding="utf-8") as f:
-            f.write(html_content)
+            f.write("".join(parts))
             
         logger.info(f"已生成性能報告: {output_path}/performance_report.html")
         return True
@@ -270,14 +323,25 @@ def analyze_fpy_bottlenecks(days: int = 7) -> Dict[str, Any]:
             return {"status": False, "message": "沒有可用的性能數據"}
             
         # 過濾FPY相關任務
-        fpy_data = df[df["function"].str.contains("fpy")]
+        fpy_data = df[df["function"].str.contains(FPY_TASK_KEYWORD, regex=False, na=False)]
         if fpy_data.empty:
             return {"status": False, "message": "沒有FPY相關的性能數據"}
             
         # 按站點分組計算
         if "station" in fpy_data.columns and "elapsed_time" in fpy_data.columns:
-            station_perf = fpy_data.groupby("station")["elapsed_time"].agg(['count', 'mean', 'min', 'max']).reset_index()
-            station_perf = station_perf.sort_values('mean', ascending=False)
+            # 一次分組取得 (站點, 任務) 統計，站點與任務的彙總都由此推導；
+            # 保留空站點的分組，任務平均值才會與逐列計算一致
+            stats = (
+                fpy_data.astype({"function": "category"})
+                .groupby(["station", "function"], observed=True, dropna=False)["elapsed_time"]
+                .agg(['count', 'sum', 'min', 'max'])
+            )
+            by_station = stats.groupby(level="station", observed=True)
+            station_perf = by_station.agg({'count': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max'})
+            station_perf.insert(1, 'mean', station_perf.pop('sum') / station_perf['count'])
+            station_perf = station_perf.reset_index().sort_values('mean', ascending=False)
+            by_function = stats.groupby(level="function", observed=True)[['sum', 'count']].sum()
+            fpy_vs_parallel = (by_function['sum'] / by_function['count']).to_dict()
             
             # 找出耗時最長的站點
             if not station_perf.empty:
@@ -289,7 +353,7 @@ def analyze_fpy_bottlenecks(days: int = 7) -> Dict[str, Any]:
                     "slowest_station": slowest_station,
                     "fastest_station": fastest_station,
                     "station_performance": station_perf.to_dict('records'),
-                    "fpy_vs_parallel": fpy_data.groupby("function")["elapsed_time"].mean().to_dict(),
+                    "fpy_vs_parallel": fpy_vs_parallel,
                     "total_fpy_tasks": len(fpy_data)
                 }
         
@@ -2,40 +2,135 @@
 存儲監控模組
 """
 import os
-import psutil
+import mmap
+import time
+import atexit
+import bisect
+import shutil
 import json
+import threading
+import itertools
+from collections import deque
 from pathlib import Path
 from typing import Dict, Optional, List
 from datetime import datetime, timedelta
 from . import get_logger
 
+try:
+    import orjson
+except ImportError:  # orjson 為可選依賴，未安裝時使用標準庫 json
+    orjson = None
+
 logger = get_logger("storage_monitor")
 
+# 記憶體中保留的歸檔報告數量
+ARCHIVE_REPORT_LIMIT = 100
+
+# 報告檔的寫入緩衝區大小
+ARCHIVE_REPORT_BUFFER = 1 << 16
+
+# 新報告由背景線程批次追加到文件的間隔秒數
+ARCHIVE_FLUSH_INTERVAL = 5.0
+
+# 硬碟使用情況與存儲狀態的快取秒數
+DISK_USAGE_TTL = 3.0
+
+
+def _loads(data):
+    """解析 JSON 位元組，有 orjson 時使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _report_epoch(report: Dict) -> float:
+    """解析報告的 ISO 時間戳為 epoch 秒數，無法解析時視為最舊"""
+    try:
+        return datetime.fromisoformat(report['timestamp']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def _tail_offset(mm: mmap.mmap, count: int) -> int:
+    """從檔尾往前找換行符，返回最後 count 行的起始位置"""
+    pos = len(mm)
+    if pos and mm[pos - 1] == ord('\n'):
+        pos -= 1
+    for _ in range(count):
+        pos = mm.rfind(b'\n', 0, pos)
+        if pos < 0:
+            return 0
+    return pos + 1
+
+
+def _dump_report_line(report: Dict) -> bytes:
+    """將單筆報告序列化為一行 JSON Lines"""
+    if orjson is not None:
+        return orjson.dumps(report, default=str) + b"\n"
+    return (json.dumps(report, ensure_ascii=False, default=str) + "\n").encode('utf-8')
+
+
 class StorageMonitor:
     """存儲監控器"""
     
     def __init__(self):
         self.local_path = "D:/Database-PC"
         self.archive_path = "E:/Database-PC"
-        self.archive_reports = []
+        # 只保留最近的報告，超過上限時自動捨棄最舊的
+        self.archive_reports = deque(maxlen=ARCHIVE_REPORT_LIMIT)
+        # 與 archive_reports 對齊的 epoch 時間，依時間排序供 bisect 查找
+        self._report_times = deque(maxlen=ARCHIVE_REPORT_LIMIT)
+        self._report_fp = None
+        self._appended_reports = 0
+        # 已序列化但尚未寫入文件的報告，由背景線程定期批次寫入
+        self._pending_reports = []
+        self._report_lock = threading.RLock()
+        self._flusher_thread = None
+        atexit.register(self.close)
+        
+        # {路徑: (到期時間, 使用情況)} 與 (到期時間, 存儲狀態)
+        self._usage_cache = {}
+        self._status_cache = None
     
-    def get_disk_usage(self, path: str) -> Optional[Dict]:
-        """獲取指定路徑的硬碟使用情況"""
+    def get_disk_usage(self, path: str, max_age: float = DISK_USAGE_TTL) -> Optional[Dict]:
+        """
+        獲取指定路徑的硬碟使用情況，max_age 秒內的查詢結果直接重用
+        
+        Args:
+            path: 路徑
+            max_age: 可接受的快取秒數，0 表示一定重新查詢
+        """
+        now = time.monotonic()
+        cached = self._usage_cache.get(path)
+        if cached is not None and max_age > 0 and now < cached[0]:
+            return cached[1]
+        
         try:
-            usage = psutil.disk_usage(path)
-            return {
+            usage = shutil.disk_usage(path)
+            # 與 psutil 相同，使用率以一般使用者可用的空間計算，不含保留區塊
+            available = usage.used + usage.free
+            result = {
                 'total_gb': usage.total / (1024**3),
                 'used_gb': usage.used / (1024**3),
                 'free_gb': usage.free / (1024**3),
-                'percent': usage.percent,
+                'percent': round(usage.used / available * 100, 1) if available else 0.0,
                 'path': path
             }
         except Exception as e:
             logger.error(f"獲取硬碟使用情況失敗 {path}: {e}")
             return None
+        
+        # 清除過期項目，避免查詢過的目標目錄不斷累積
+        self._usage_cache = {p: c for p, c in self._usage_cache.items() if now < c[0]}
+        self._usage_cache[path] = (now + DISK_USAGE_TTL, result)
+        return result
     
     def check_storage_status(self) -> Dict:
-        """檢查存儲狀態"""
+        """檢查存儲狀態，DISK_USAGE_TTL 秒內重複呼叫時直接返回上次結果"""
+        now = time.monotonic()
+        if self._status_cache is not None and now < self._status_cache[0]:
+            return self._status_cache[1]
+        
         local_usage = self.get_disk_usage(self.local_path)
         archive_usage = self.get_disk_usage(self.archive_path)
         
@@ -59,6 +154,7 @@ class StorageMonitor:
                 status['needs_action'] = True
                 status['action_type'] = 'warning'
         
+        self._status_cache = (now + DISK_USAGE_TTL, status)
         return status
     
     def get_storage_info(self) -> str:
@@ -81,27 +177,24 @@ class StorageMonitor:
     
     def add_archive_report(self, report: Dict):
         """添加歸檔報告"""
-        report['timestamp'] = datetime.now().isoformat()
-        self.archive_reports.append(report)
-        
-        # 限制報告數量，保留最近100個
-        if len(self.archive_reports) > 100:
-            self.archive_reports = self.archive_reports[-100:]
-        
-        # 保存到文件
-        self._save_archive_reports()
+        now = datetime.now()
+        report['timestamp'] = now.isoformat()
+        # 背景寫入線程會在鎖內走訪 archive_reports 重寫文件
+        with self._report_lock:
+            self.archive_reports.append(report)
+            self._report_times.append(now.timestamp())
+            
+            # 只追加新報告到文件
+            self._append_archive_report(report)
     
     def get_archive_reports(self, days: int = 7) -> List[Dict]:
         """獲取指定天數內的歸檔報告"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_reports = []
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
         
-        for report in self.archive_reports:
-            report_time = datetime.fromisoformat(report['timestamp'])
-            if report_time >= cutoff_date:
-                recent_reports.append(report)
-        
-        return recent_reports
+        # 報告依時間排序，以二分搜尋找出時間窗口的起點
+        with self._report_lock:
+            start = bisect.bisect_left(self._report_times, cutoff)
+            return list(itertools.islice(self.archive_reports, start, None))
     
     def get_archive_statistics(self, days: int = 30) -> Dict:
         """獲取歸檔統計信息"""
@@ -136,34 +229,128 @@ class StorageMonitor:
             'success_rate': round(success_count / len(reports) * 100, 1) if reports else 0
         }
     
-    def _save_archive_reports(self):
-        """保存歸檔報告到文件"""
-        try:
-            from ..utils import config
-            log_file = config.get("storage_management.scheduled_archive.reporting.log_file", "logs/archive_reports.log")
+    def _report_log_file(self) -> str:
+        """取得歸檔報告檔路徑並確保目錄存在"""
+        from ..utils import config
+        log_file = config.get("storage_management.scheduled_archive.reporting.log_file", "logs/archive_reports.log")
+        
+        # 確保日誌目錄存在
+        log_dir = os.path.dirname(log_file)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
+        return log_file
+    
+    def _append_archive_report(self, report: Dict):
+        """將報告序列化為 JSON Lines 放入待寫入緩衝，首次呼叫時啟動背景寫入線程"""
+        with self._report_lock:
+            self._pending_reports.append(_dump_report_line(report))
+            if self._flusher_thread is None:
+                self._flusher_thread = threading.Thread(
+                    target=self._flusher_loop, name="archive_report_writer", daemon=True
+                )
+                self._flusher_thread.start()
+    
+    def _flusher_loop(self):
+        """背景寫入線程：每 ARCHIVE_FLUSH_INTERVAL 秒批次追加待寫入的報告"""
+        while True:
+            time.sleep(ARCHIVE_FLUSH_INTERVAL)
+            self._flush_pending_reports()
+    
+    def _flush_pending_reports(self):
+        """將待寫入的報告一次追加到文件，不重寫既有內容"""
+        with self._report_lock:
+            if not self._pending_reports:
+                return
+            lines = self._pending_reports
+            try:
+                if self._report_fp is None:
+                    self._report_fp = open(self._report_log_file(), 'ab', buffering=ARCHIVE_REPORT_BUFFER)
+                
+                self._report_fp.writelines(lines)
+                self._report_fp.flush()
+            except Exception as e:
+                # 保留待寫入的報告，下次重試時重新開啟文件
+                logger.error(f"保存歸檔報告失敗: {e}")
+                self._close_report_file()
+                return
             
-            # 確保日誌目錄存在
-            log_dir = os.path.dirname(log_file)
-            if log_dir and not os.path.exists(log_dir):
-                os.makedirs(log_dir, exist_ok=True)
+            # 寫入成功後才清除待寫入的報告
+            self._pending_reports = []
             
-            # 保存報告
-            with open(log_file, 'w', encoding='utf-8') as f:
-                json.dump(self.archive_reports, f, ensure_ascii=False, indent=2)
+            # 累積的舊報告超過上限時壓縮文件，只保留記憶體中的最近報告
+            self._appended_reports += len(lines)
+            if self._appended_reports >= ARCHIVE_REPORT_LIMIT:
+                self._save_archive_reports()
+    
+    def _save_archive_reports(self):
+        """以記憶體中的報告重寫整個報告檔，待寫入的報告已包含在內"""
+        with self._report_lock:
+            try:
+                self._close_report_file()
+                log_file = self._report_log_file()
                 
-        except Exception as e:
-            logger.error(f"保存歸檔報告失敗: {e}")
+                tmp_file = log_file + ".tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.writelines(_dump_report_line(report) for report in self.archive_reports)
+                os.replace(tmp_file, log_file)
+                # 重寫成功後待寫入的報告已在文件中
+                self._pending_reports = []
+                self._appended_reports = 0
+                    
+            except Exception as e:
+                logger.error(f"保存歸檔報告失敗: {e}")
     
     def load_archive_reports(self):
         """從文件加載歸檔報告"""
+        # 先寫出尚未保存的報告，避免重新載入時遺失
+        self._flush_pending_reports()
         try:
             from ..utils import config
             log_file = config.get("storage_management.scheduled_archive.reporting.log_file", "logs/archive_reports.log")
             
-            if os.path.exists(log_file):
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    self.archive_reports = json.load(f)
+            if not os.path.exists(log_file):
+                return
+            
+            if os.path.getsize(log_file) == 0:
+                self._set_archive_reports([])
+                return
+            
+            # 以記憶體映射讀取，JSON Lines 只解析檔尾最近的報告，不載入整個歷史檔
+            with open(log_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                legacy = mm[:64].lstrip().startswith(b'[')
+                if legacy:
+                    reports = _loads(mm[:])
+                    has_older = False
+                else:
+                    start = _tail_offset(mm, ARCHIVE_REPORT_LIMIT)
+                    reports = [_loads(line) for line in mm[start:].splitlines() if line.strip()]
+                    has_older = start > 0
+            
+            self._set_archive_reports(reports)
+            
+            # 舊版格式為整個 JSON 列表時改寫為 JSON Lines；文件中的舊報告過多時壓縮
+            if legacy or has_older:
+                self._save_archive_reports()
                     
         except Exception as e:
             logger.error(f"加載歸檔報告失敗: {e}")
-            self.archive_reports = [] 
\ No newline at end of file
+            self._set_archive_reports([])
+    
+    def _set_archive_reports(self, reports: List[Dict]):
+        """依時間排序並保留最近的報告，同時建立對應的 epoch 時間列表"""
+        timed = sorted(((_report_epoch(report), report) for report in reports), key=lambda item: item[0])
+        with self._report_lock:
+            self._report_times = deque((epoch for epoch, _ in timed), maxlen=ARCHIVE_REPORT_LIMIT)
+            self.archive_reports = deque((report for _, report in timed), maxlen=ARCHIVE_REPORT_LIMIT)
+    
+    def close(self):
+        """寫入尚未保存的報告並關閉歸檔報告檔"""
+        self._flush_pending_reports()
+        self._close_report_file()
+    
+    def _close_report_file(self):
+        """關閉歸檔報告檔"""
+        with self._report_lock:
+            if self._report_fp is not None:
+                self._report_fp.close()
+                self._report_fp = None
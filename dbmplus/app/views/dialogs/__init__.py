@@ -1 +1 @@
-from .move_file_dialog import MoveFileDialog, BatchMoveFileDialog 
\ No newline at end of file
+from .move_file_dialog import MoveFileDialog, BatchMoveFileDialog, invalidate_products_cache 
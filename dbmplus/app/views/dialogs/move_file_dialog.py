@@ -1,59 +1,120 @@
 """
 移動檔案對話框模塊
 """
+import sys
+import time
+
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
     QComboBox, QCheckBox, QPushButton, QGroupBox,
     QMessageBox, QFrame, QTableWidget, QTableWidgetItem,
     QHeaderView
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QTimer, QObject, QRunnable, QThreadPool
 from ...models import db_manager
 from ...utils import get_logger
 
 logger = get_logger("move_file_dialog")
 
+# 產品列表快取秒數：連續開啟多個對話框時共用同一次查詢結果
+PRODUCTS_CACHE_TTL = 5.0
 
-class MoveFileDialog(QDialog):
-    """移動檔案對話框"""
+# 批量移動的組件數超過此值時，先顯示對話框再於下一輪事件循環填充表格
+DEFERRED_TABLE_ROWS = 200
+
+_PRODUCTS_CACHE = {"ts": 0.0, "key": None, "data": None}
+
+
+def _products_cache_key(wait: bool = True):
+    """資料庫重新掃描會替換產品字典、新增產品會改變數量，兩者皆使快取失效"""
+    return db_manager.get_products_key(wait)
+
+
+def _peek_product_ids(ttl: float = PRODUCTS_CACHE_TTL):
+    """返回仍有效的快取產品ID，快取過期、產品變動或背景掃描未完成時返回 None
+
+    供 GUI 線程呼叫，不等待背景掃描
+    """
+    cache = _PRODUCTS_CACHE
+    if (cache["data"] is not None and time.monotonic() - cache["ts"] <= ttl
+            and cache["key"] == _products_cache_key(wait=False)):
+        return cache["data"]
+    return None
+
+
+def _get_product_ids_cached(ttl: float = PRODUCTS_CACHE_TTL) -> list:
+    """取得所有產品ID，TTL 內且產品未變動時直接返回上次結果"""
+    product_ids = _peek_product_ids(ttl)
+    if product_ids is None:
+        now = time.monotonic()
+        product_ids = [product.product_id for product in db_manager.get_products()]
+        _PRODUCTS_CACHE.update(ts=now, key=_products_cache_key(), data=product_ids)
+    return product_ids
+
+
+def invalidate_products_cache():
+    """清除產品列表快取，下次開啟對話框時重新查詢"""
+    _PRODUCTS_CACHE["data"] = None
+
+
+class ProductsWorkerSignals(QObject):
+    """ProductsWorker 的信號，QRunnable 本身不能定義信號"""
+    finished = Signal(list)  # product_ids
+    error = Signal(str)
+
+
+class ProductsWorker(QRunnable):
+    """在背景線程查詢產品ID列表，等待資料庫掃描時不阻塞介面"""
     
-    # 定義信號
-    move_requested = Signal(str, str, str, str, str, list)  # component_id, lot_id, station, source_product, target_product, file_types
+    def __init__(self):
+        super().__init__()
+        self.signals = ProductsWorkerSignals()
     
-    def __init__(self, component_id: str, lot_id: str, station: str, source_product: str, parent=None):
+    def run(self):
+        try:
+            self.signals.finished.emit(_get_product_ids_cached())
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+
+# 可移動的檔案類型：(勾選框標籤, 檔案類型鍵)
+_FILE_TYPES = (
+    ("CSV 檔案", "csv"),
+    ("Map 圖像檔案 (Basemap, Lossmap, FPY)", "map"),
+    ("Org 資料夾", "org"),
+    ("ROI 資料夾", "roi"),
+)
+
+NO_TARGET_PRODUCT = "沒有可用的目標產品"
+
+
+class _MoveFileDialogBase(QDialog):
+    """
+    移動檔案對話框的共用基底
+    
+    負責信息區塊、目標產品選單、檔案類型勾選框、確認框與按鈕列；子類別提供
+    _source_products，並覆寫 _info_lines()、_confirm_message() 與 _emit_and_accept()
+    描述要移動的組件及發送各自的移動請求信號。
+    """
+    
+    MOVE_BUTTON_TEXT = "開始移動"
+    INFO_TITLE = "移動信息"
+    CONFIRM_TITLE = "確認移動"
+    
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.component_id = component_id
-        self.lot_id = lot_id
-        self.station = station
-        self.source_product = source_product
-        
-        self.setWindowTitle("移動檔案")
         self.setModal(True)
-        self.resize(400, 300)
-        
-        self.setup_ui()
-        self.load_products()
-        
+        # 產品列表在對話框第一次顯示時才載入
+        self._products_loaded = False
+        self._products_worker = None
+        self._file_type_checks = []
+    
     def setup_ui(self):
         """設置UI"""
         layout = QVBoxLayout(self)
         
-        # 基本信息顯示
-        info_group = QGroupBox("移動信息")
-        info_layout = QVBoxLayout(info_group)
-        
-        info_layout.addWidget(QLabel(f"組件ID: {self.component_id}"))
-        info_layout.addWidget(QLabel(f"批次ID: {self.lot_id}"))
-        info_layout.addWidget(QLabel(f"站點: {self.station}"))
-        info_layout.addWidget(QLabel(f"源產品: {self.source_product}"))
-        
-        # 添加分隔線
-        line = QFrame()
-        line.setFrameShape(QFrame.HLine)
-        line.setFrameShadow(QFrame.Sunken)
-        info_layout.addWidget(line)
-        
-        layout.addWidget(info_group)
+        # 信息顯示
+        layout.addWidget(self._build_info_group())
         
         # 目標產品選擇
         target_group = QGroupBox("目標產品")
@@ -66,28 +127,46 @@ class MoveFileDialog(QDialog):
         layout.addWidget(target_group)
         
         # 檔案類型選擇
-        file_type_group = QGroupBox("要移動的檔案類型")
-        file_type_layout = QVBoxLayout(file_type_group)
+        layout.addWidget(self._build_file_type_group())
         
-        self.csv_checkbox = QCheckBox("CSV 檔案")
-        self.csv_checkbox.setChecked(True)
-        file_type_layout.addWidget(self.csv_checkbox)
+        # 按鈕
+        layout.addLayout(self._build_button_row())
+    
+    def _build_info_group(self) -> QGroupBox:
+        """建立對話框上方的信息區塊，逐行顯示 _info_lines() 並以分隔線結尾"""
+        info_group = QGroupBox(self.INFO_TITLE)
+        info_layout = QVBoxLayout(info_group)
         
-        self.map_checkbox = QCheckBox("Map 圖像檔案 (Basemap, Lossmap, FPY)")
-        self.map_checkbox.setChecked(True)
-        file_type_layout.addWidget(self.map_checkbox)
+        for text in self._info_lines():
+            info_layout.addWidget(QLabel(text))
         
-        self.org_checkbox = QCheckBox("Org 資料夾")
-        self.org_checkbox.setChecked(True)
-        file_type_layout.addWidget(self.org_checkbox)
+        # 添加分隔線
+        line = QFrame()
+        line.setFrameShape(QFrame.HLine)
+        line.setFrameShadow(QFrame.Sunken)
+        info_layout.addWidget(line)
         
-        self.roi_checkbox = QCheckBox("ROI 資料夾")
-        self.roi_checkbox.setChecked(True)
-        file_type_layout.addWidget(self.roi_checkbox)
+        return info_group
+    
+    def _info_lines(self) -> list:
+        """信息區塊顯示的文字行"""
+        return [f"源產品: {', '.join(sorted(self._source_products))}"]
+    
+    def _build_file_type_group(self) -> QGroupBox:
+        """依 _FILE_TYPES 建立檔案類型勾選區塊"""
+        file_type_group = QGroupBox("要移動的檔案類型")
+        file_type_layout = QVBoxLayout(file_type_group)
         
-        layout.addWidget(file_type_group)
+        for label, key in _FILE_TYPES:
+            checkbox = QCheckBox(label)
+            checkbox.setChecked(True)
+            file_type_layout.addWidget(checkbox)
+            self._file_type_checks.append((checkbox, key))
         
-        # 按鈕
+        return file_type_group
+    
+    def _build_button_row(self) -> QHBoxLayout:
+        """建立全選/全不選、取消與開始移動按鈕列"""
         button_layout = QHBoxLayout()
         
         self.select_all_btn = QPushButton("全選")
@@ -104,123 +183,215 @@ class MoveFileDialog(QDialog):
         self.cancel_btn.clicked.connect(self.reject)
         button_layout.addWidget(self.cancel_btn)
         
-        self.move_btn = QPushButton("開始移動")
+        self.move_btn = QPushButton(self.MOVE_BUTTON_TEXT)
         self.move_btn.clicked.connect(self.start_move)
         button_layout.addWidget(self.move_btn)
         
-        layout.addLayout(button_layout)
-        
+        return button_layout
+    
+    def showEvent(self, event):
+        """第一次顯示時載入產品列表"""
+        super().showEvent(event)
+        if not self._products_loaded:
+            self._products_loaded = True
+            self._on_first_show()
+    
+    def _on_first_show(self):
+        self.load_products()
+    
     def load_products(self):
-        """載入可用的產品列表"""
+        """載入可用的產品列表，快取未命中時交給背景線程查詢"""
+        product_ids = _peek_product_ids()
+        if product_ids is not None:
+            self._populate_products(product_ids)
+            return
+        
+        self.target_product_combo.setEnabled(False)
+        self.move_btn.setEnabled(False)
+        
+        # 保留 worker 參照，確保信號物件在查詢完成前不被回收
+        self._products_worker = ProductsWorker()
+        self._products_worker.signals.finished.connect(self._populate_products)
+        self._products_worker.signals.error.connect(self._on_products_error)
+        QThreadPool.globalInstance().start(self._products_worker)
+    
+    def _populate_products(self, product_ids: list):
+        """以產品ID填充目標產品下拉選單，排除所有源產品"""
+        self._products_worker = None
+        items = [product_id for product_id in product_ids if product_id not in self._source_products]
+        
+        # 一次加入所有選項，填充期間不發出 currentIndexChanged
+        combo = self.target_product_combo
+        combo.blockSignals(True)
         try:
-            products = db_manager.get_products()
-            
-            for product in products:
-                # 排除當前源產品
-                if product.product_id != self.source_product:
-                    self.target_product_combo.addItem(product.product_id)
-                    
-            if self.target_product_combo.count() == 0:
-                self.target_product_combo.addItem("沒有可用的目標產品")
-                self.move_btn.setEnabled(False)
-                
-        except Exception as e:
-            logger.error(f"載入產品列表失敗: {e}")
-            QMessageBox.warning(self, "錯誤", f"載入產品列表失敗: {str(e)}")
-            self.move_btn.setEnabled(False)
+            combo.clear()
+            combo.addItems(items or [NO_TARGET_PRODUCT])
+        finally:
+            combo.blockSignals(False)
+        
+        combo.setEnabled(True)
+        self.move_btn.setEnabled(bool(items))
+    
+    def _on_products_error(self, message: str):
+        """產品列表載入失敗"""
+        self._products_worker = None
+        logger.error(f"載入產品列表失敗: {message}")
+        QMessageBox.warning(self, "錯誤", f"載入產品列表失敗: {message}")
+        self.target_product_combo.setEnabled(True)
+        self.move_btn.setEnabled(False)
     
     def select_all(self):
         """全選檔案類型"""
-        self.csv_checkbox.setChecked(True)
-        self.map_checkbox.setChecked(True)
-        self.org_checkbox.setChecked(True)
-        self.roi_checkbox.setChecked(True)
+        for checkbox, _ in self._file_type_checks:
+            checkbox.setChecked(True)
     
     def deselect_all(self):
         """全不選檔案類型"""
-        self.csv_checkbox.setChecked(False)
-        self.map_checkbox.setChecked(False)
-        self.org_checkbox.setChecked(False)
-        self.roi_checkbox.setChecked(False)
+        for checkbox, _ in self._file_type_checks:
+            checkbox.setChecked(False)
     
     def get_selected_file_types(self):
         """獲取選中的檔案類型"""
-        file_types = []
-        
-        if self.csv_checkbox.isChecked():
-            file_types.append("csv")
-        if self.map_checkbox.isChecked():
-            file_types.append("map")
-        if self.org_checkbox.isChecked():
-            file_types.append("org")
-        if self.roi_checkbox.isChecked():
-            file_types.append("roi")
-            
-        return file_types
+        return [key for checkbox, key in self._file_type_checks if checkbox.isChecked()]
     
-    def start_move(self):
-        """開始移動檔案"""
-        # 檢查是否選擇了目標產品
+    def _get_move_selection(self):
+        """檢查目標產品與檔案類型，無效時提示並返回 None"""
         target_product = self.target_product_combo.currentText()
-        if not target_product or target_product == "沒有可用的目標產品":
+        if not target_product or target_product == NO_TARGET_PRODUCT:
             QMessageBox.warning(self, "錯誤", "請選擇有效的目標產品")
-            return
+            return None
         
-        # 檢查是否選擇了檔案類型
         file_types = self.get_selected_file_types()
         if not file_types:
             QMessageBox.warning(self, "錯誤", "請至少選擇一種檔案類型")
-            return
+            return None
         
-        # 確認對話框
-        file_types_str = ", ".join(file_types)
-        msg = f"確定要將組件 {self.component_id} 的以下檔案從 {self.source_product} 移動到 {target_product} 嗎？\n\n"
-        msg += f"檔案類型: {file_types_str}\n\n"
-        msg += "注意：此操作不可撤銷！"
+        return target_product, file_types
+    
+    def _confirm_move(self, title: str, msg: str, target_product: str, file_types: list):
+        """以非阻塞的確認框詢問使用者，選擇「是」後才發送移動請求"""
+        box = QMessageBox(QMessageBox.Question, title, msg, QMessageBox.Yes | QMessageBox.No, self)
+        box.setDefaultButton(QMessageBox.No)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.finished.connect(
+            lambda _: self._on_confirm_finished(box, target_product, file_types)
+        )
+        box.open()
+    
+    def _on_confirm_finished(self, box: QMessageBox, target_product: str, file_types: list):
+        if box.standardButton(box.clickedButton()) == QMessageBox.Yes:
+            self._emit_and_accept(target_product, file_types)
+    
+    def start_move(self):
+        """檢查選擇後顯示確認框，確認後才發送移動請求"""
+        selection = self._get_move_selection()
+        if selection is None:
+            return
+        target_product, file_types = selection
         
-        reply = QMessageBox.question(
-            self, "確認移動", msg,
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.No
+        msg = self._confirm_message(target_product, file_types)
+        self._confirm_move(self.CONFIRM_TITLE, msg, target_product, file_types)
+    
+    def _confirm_message(self, target_product: str, file_types: list) -> str:
+        """確認框的訊息"""
+        return (
+            f"確定要將檔案移動到 {target_product} 嗎？\n\n"
+            f"檔案類型: {', '.join(file_types)}\n\n"
+            "注意：此操作不可撤銷！"
         )
+    
+    def _emit_and_accept(self, target_product: str, file_types: list):
+        """關閉對話框；子類別先發射各自的移動請求信號再呼叫此方法"""
+        self.accept()
+
+
+class MoveFileDialog(_MoveFileDialogBase):
+    """移動檔案對話框"""
+    
+    # 定義信號
+    move_requested = Signal(str, str, str, str, str, list)  # component_id, lot_id, station, source_product, target_product, file_types
+    
+    def __init__(self, component_id: str, lot_id: str, station: str, source_product: str, parent=None):
+        super().__init__(parent)
+        self.component_id = component_id
+        self.lot_id = lot_id
+        self.station = station
+        self.source_product = source_product
+        self._source_products = {source_product}
         
-        if reply == QMessageBox.Yes:
-            # 發射移動請求信號
-            self.move_requested.emit(
-                self.component_id,
-                self.lot_id,
-                self.station,
-                self.source_product,
-                target_product,
-                file_types
-            )
-            self.accept()
+        self.setWindowTitle("移動檔案")
+        self.resize(400, 300)
+        
+        self.setup_ui()
+        
+    def _info_lines(self) -> list:
+        """基本信息顯示"""
+        return [
+            f"組件ID: {self.component_id}",
+            f"批次ID: {self.lot_id}",
+            f"站點: {self.station}",
+            f"源產品: {self.source_product}",
+        ]
+    
+    def _confirm_message(self, target_product: str, file_types: list) -> str:
+        return (
+            f"確定要將組件 {self.component_id} 的以下檔案從 {self.source_product} 移動到 {target_product} 嗎？\n\n"
+            f"檔案類型: {', '.join(file_types)}\n\n"
+            "注意：此操作不可撤銷！"
+        )
+    
+    def _emit_and_accept(self, target_product: str, file_types: list):
+        # 發射移動請求信號
+        self.move_requested.emit(
+            self.component_id,
+            self.lot_id,
+            self.station,
+            self.source_product,
+            target_product,
+            file_types
+        )
+        super()._emit_and_accept(target_product, file_types)
 
 
-class BatchMoveFileDialog(QDialog):
+class BatchMoveFileDialog(_MoveFileDialogBase):
     """批量移動檔案對話框"""
     
+    MOVE_BUTTON_TEXT = "開始批量移動"
+    CONFIRM_TITLE = "確認批量移動"
+    
     # 定義信號 - components_data: list of tuples (component_id, lot_id, station, source_product)
     batch_move_requested = Signal(list, str, list)  # components_data, target_product, file_types
     
     def __init__(self, components_data: list, parent=None):
         super().__init__(parent)
-        self.components_data = components_data  # [(component_id, lot_id, station, source_product), ...]
+        # 依欄位分開保存，只需單一欄位時不必逐筆拆解 tuple；
+        # 批次、站點與源產品在各組件間大量重複，駐留後整個批量任務共用同一字串物件
+        columns = list(zip(*components_data)) or [()] * 4
+        self.component_ids = list(columns[0])
+        self.lot_ids = [sys.intern(lot_id) for lot_id in columns[1]]
+        self.stations = [sys.intern(station) for station in columns[2]]
+        self.source_product_ids = [sys.intern(product) for product in columns[3]]
+        # 組件數與源產品在對話框存在期間不變，載入目標產品、標題與確認訊息共用
+        self._component_count = len(self.component_ids)
+        self._source_products = set(self.source_product_ids)
+        self._source_products_str = ", ".join(sorted(self._source_products))
         
         self.setWindowTitle("批量移動檔案")
-        self.setModal(True)
         self.resize(600, 500)
         
         self.setup_ui()
-        self.load_products()
-        self.populate_components_table()
-        
-    def setup_ui(self):
-        """設置UI"""
-        layout = QVBoxLayout(self)
         
-        # 信息顯示
-        info_group = QGroupBox(f"批量移動信息 (共 {len(self.components_data)} 個組件)")
+    def _on_first_show(self):
+        """第一次顯示時載入產品列表並填充組件表格"""
+        self.load_products()
+        if self._component_count > DEFERRED_TABLE_ROWS:
+            QTimer.singleShot(0, self.populate_components_table)
+        else:
+            self.populate_components_table()
+        
+    def _build_info_group(self) -> QGroupBox:
+        """批量移動信息與組件列表表格"""
+        info_group = QGroupBox(f"批量移動信息 (共 {self._component_count} 個組件)")
         info_layout = QVBoxLayout(info_group)
         
         # 組件列表表格
@@ -233,159 +404,49 @@ class BatchMoveFileDialog(QDialog):
         self.components_table.setMaximumHeight(200)
         
         info_layout.addWidget(self.components_table)
-        layout.addWidget(info_group)
-        
-        # 目標產品選擇
-        target_group = QGroupBox("目標產品")
-        target_layout = QVBoxLayout(target_group)
-        
-        target_layout.addWidget(QLabel("選擇目標產品:"))
-        self.target_product_combo = QComboBox()
-        target_layout.addWidget(self.target_product_combo)
-        
-        layout.addWidget(target_group)
-        
-        # 檔案類型選擇
-        file_type_group = QGroupBox("要移動的檔案類型")
-        file_type_layout = QVBoxLayout(file_type_group)
-        
-        self.csv_checkbox = QCheckBox("CSV 檔案")
-        self.csv_checkbox.setChecked(True)
-        file_type_layout.addWidget(self.csv_checkbox)
-        
-        self.map_checkbox = QCheckBox("Map 圖像檔案 (Basemap, Lossmap, FPY)")
-        self.map_checkbox.setChecked(True)
-        file_type_layout.addWidget(self.map_checkbox)
-        
-        self.org_checkbox = QCheckBox("Org 資料夾")
-        self.org_checkbox.setChecked(True)
-        file_type_layout.addWidget(self.org_checkbox)
-        
-        self.roi_checkbox = QCheckBox("ROI 資料夾")
-        self.roi_checkbox.setChecked(True)
-        file_type_layout.addWidget(self.roi_checkbox)
-        
-        layout.addWidget(file_type_group)
-        
-        # 按鈕
-        button_layout = QHBoxLayout()
-        
-        self.select_all_btn = QPushButton("全選")
-        self.select_all_btn.clicked.connect(self.select_all)
-        button_layout.addWidget(self.select_all_btn)
-        
-        self.deselect_all_btn = QPushButton("全不選")
-        self.deselect_all_btn.clicked.connect(self.deselect_all)
-        button_layout.addWidget(self.deselect_all_btn)
-        
-        button_layout.addStretch()
-        
-        self.cancel_btn = QPushButton("取消")
-        self.cancel_btn.clicked.connect(self.reject)
-        button_layout.addWidget(self.cancel_btn)
-        
-        self.move_btn = QPushButton("開始批量移動")
-        self.move_btn.clicked.connect(self.start_batch_move)
-        button_layout.addWidget(self.move_btn)
-        
-        layout.addLayout(button_layout)
+        return info_group
     
     def populate_components_table(self):
-        """填充組件列表表格"""
-        self.components_table.setRowCount(len(self.components_data))
-        
-        for row, (component_id, lot_id, station, source_product) in enumerate(self.components_data):
-            self.components_table.setItem(row, 0, QTableWidgetItem(component_id))
-            self.components_table.setItem(row, 1, QTableWidgetItem(lot_id))
-            self.components_table.setItem(row, 2, QTableWidgetItem(station))
-            self.components_table.setItem(row, 3, QTableWidgetItem(source_product))
-    
-    def load_products(self):
-        """載入可用的產品列表"""
+        """填充組件列表表格，填充期間暫停重繪與信號，完成後只更新一次"""
+        table = self.components_table
+        
+        # 先逐欄建立所有儲存格項目，再一次放入表格
+        columns = [
+            [QTableWidgetItem(value) for value in values]
+            for values in (self.component_ids, self.lot_ids, self.stations, self.source_product_ids)
+        ]
+        
+        sorting_enabled = table.isSortingEnabled()
+        table.setSortingEnabled(False)
+        table.setUpdatesEnabled(False)
+        table.blockSignals(True)
         try:
-            products = db_manager.get_products()
-            
-            # 獲取所有源產品
-            source_products = set(comp[3] for comp in self.components_data)
-            
-            for product in products:
-                # 排除所有源產品
-                if product.product_id not in source_products:
-                    self.target_product_combo.addItem(product.product_id)
-                    
-            if self.target_product_combo.count() == 0:
-                self.target_product_combo.addItem("沒有可用的目標產品")
-                self.move_btn.setEnabled(False)
-                
-        except Exception as e:
-            logger.error(f"載入產品列表失敗: {e}")
-            QMessageBox.warning(self, "錯誤", f"載入產品列表失敗: {str(e)}")
-            self.move_btn.setEnabled(False)
+            table.setRowCount(self._component_count)
+            for column, items in enumerate(columns):
+                for row, item in enumerate(items):
+                    table.setItem(row, column, item)
+        finally:
+            table.blockSignals(False)
+            table.setUpdatesEnabled(True)
+            table.setSortingEnabled(sorting_enabled)
     
-    def select_all(self):
-        """全選檔案類型"""
-        self.csv_checkbox.setChecked(True)
-        self.map_checkbox.setChecked(True)
-        self.org_checkbox.setChecked(True)
-        self.roi_checkbox.setChecked(True)
+    def get_components_data(self) -> list:
+        """返回 [(component_id, lot_id, station, source_product), ...]"""
+        return list(zip(self.component_ids, self.lot_ids, self.stations, self.source_product_ids))
     
-    def deselect_all(self):
-        """全不選檔案類型"""
-        self.csv_checkbox.setChecked(False)
-        self.map_checkbox.setChecked(False)
-        self.org_checkbox.setChecked(False)
-        self.roi_checkbox.setChecked(False)
+    def _confirm_message(self, target_product: str, file_types: list) -> str:
+        return (
+            f"確定要將以下 {self._component_count} 個組件的檔案移動到 {target_product} 嗎？\n\n"
+            f"源產品: {self._source_products_str}\n"
+            f"檔案類型: {', '.join(file_types)}\n\n"
+            "注意：此操作不可撤銷！"
+        )
     
-    def get_selected_file_types(self):
-        """獲取選中的檔案類型"""
-        file_types = []
-        
-        if self.csv_checkbox.isChecked():
-            file_types.append("csv")
-        if self.map_checkbox.isChecked():
-            file_types.append("map")
-        if self.org_checkbox.isChecked():
-            file_types.append("org")
-        if self.roi_checkbox.isChecked():
-            file_types.append("roi")
-            
-        return file_types
-    
-    def start_batch_move(self):
-        """開始批量移動檔案"""
-        # 檢查是否選擇了目標產品
-        target_product = self.target_product_combo.currentText()
-        if not target_product or target_product == "沒有可用的目標產品":
-            QMessageBox.warning(self, "錯誤", "請選擇有效的目標產品")
-            return
-        
-        # 檢查是否選擇了檔案類型
-        file_types = self.get_selected_file_types()
-        if not file_types:
-            QMessageBox.warning(self, "錯誤", "請至少選擇一種檔案類型")
-            return
-        
-        # 確認對話框
-        file_types_str = ", ".join(file_types)
-        source_products = set(comp[3] for comp in self.components_data)
-        source_products_str = ", ".join(source_products)
-        
-        msg = f"確定要將以下 {len(self.components_data)} 個組件的檔案移動到 {target_product} 嗎？\n\n"
-        msg += f"源產品: {source_products_str}\n"
-        msg += f"檔案類型: {file_types_str}\n\n"
-        msg += "注意：此操作不可撤銷！"
-        
-        reply = QMessageBox.question(
-            self, "確認批量移動", msg,
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.No
+    def _emit_and_accept(self, target_product: str, file_types: list):
+        # 發射批量移動請求信號，組件資料只在確認移動時組回 tuple 列表
+        self.batch_move_requested.emit(
+            self.get_components_data(),
+            target_product,
+            file_types
         )
-        
-        if reply == QMessageBox.Yes:
-            # 發射批量移動請求信號
-            self.batch_move_requested.emit(
-                self.components_data,
-                target_product,
-                file_types
-            )
-            self.accept() 
\ No newline at end of file
+        super()._emit_and_accept(target_product, file_types)
@@ -10,22 +10,212 @@ import psutil
 
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
-    QTabWidget, QTableWidget, QTableWidgetItem, QPushButton,
+    QTabWidget, QTableWidget, QTableWidgetItem, QTableView, QAbstractItemView, QPushButton,
     QLabel, QProgressBar, QMessageBox, QFileDialog, QComboBox,
     QSizePolicy, QHeaderView, QStatusBar, QToolBar, QToolButton,
-    QMenu, QDialog, QApplication, QCheckBox, QFrame, QTextEdit
+    QMenu, QDialog, QApplication, QCheckBox, QFrame, QTextEdit,
+    QStyledItemDelegate, QStyleOptionButton, QStyle
+)
+from PySide6.QtCore import (
+    Qt, QSize, Signal, Slot, QThread, QTimer, QAbstractTableModel, QModelIndex,
+    QObject, QRunnable, QThreadPool
 )
-from PySide6.QtCore import Qt, QSize, Signal, Slot, QThread, QTimer
 from PySide6.QtGui import QIcon, QAction, QPixmap, QFont, QColor
 
 from ..utils import get_logger, config
 from ..models import db_manager, ComponentInfo
 from ..controllers import data_processor, online_manager
 from ..controllers.storage_manager import storage_manager
-from .dialogs import MoveFileDialog, BatchMoveFileDialog
+from .dialogs import MoveFileDialog, BatchMoveFileDialog, invalidate_products_cache
 
 logger = get_logger("main_window")
 
+# 產品資料表依序顯示的站點
+STATIONS = ('MT', 'DC2', 'INNER1', 'RDL', 'INNER2', 'CU', 'EMC')
+
+# 資料表欄位標題
+PRODUCT_TABLE_HEADERS = ('Product', 'LOT', *STATIONS)
+COMPONENT_TABLE_HEADERS = [
+    'Product', 'LOT', 'Station', 'Component ID', 'Org', 'CSV', 'Basemap', 'Lossmap', 'FPY', 'Actions'
+]
+# Actions 欄位索引（繪製查看按鈕）
+COMPONENT_ACTION_COLUMN = 9
+COMPONENT_ACTION_TEXT = "查看"
+# 元件檔案狀態只有以下三種值，模型直接回傳共用的字串
+STATUS_OK = sys.intern("OK")
+STATUS_NONE = sys.intern("NONE")
+STATUS_NA = sys.intern("N/A")
+# 任務完成後合併刷新元件表格的延遲（毫秒）
+COMPONENT_REFRESH_DELAY_MS = 100
+
+
+class ProductTableModel(QAbstractTableModel):
+    """產品資料表模型，每列保存已格式化的顯示字串，由視圖按需查詢可見列（置中由委派處理）"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[tuple] = []
+        self._lot_ids: List[str] = []  # 與 _rows 對應的內部批次ID
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(PRODUCT_TABLE_HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            return self._rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return PRODUCT_TABLE_HEADERS[section]
+        return None
+
+    def set_rows(self, rows: List[tuple], lot_ids: List[str]):
+        """一次替換全部資料列"""
+        self.beginResetModel()
+        self._rows = rows
+        self._lot_ids = lot_ids
+        self.endResetModel()
+
+    def clear(self):
+        """清空資料"""
+        self.set_rows([], [])
+
+    def row_values(self, row: int) -> tuple:
+        """獲取指定列的顯示字串"""
+        return self._rows[row]
+
+    def lot_id_at(self, row: int) -> str:
+        """獲取指定列的內部批次ID"""
+        return self._lot_ids[row]
+
+
+class CenterAlignDelegate(QStyledItemDelegate):
+    """所有儲存格統一置中顯示，模型不必逐格回傳 TextAlignmentRole"""
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        option.displayAlignment = Qt.AlignCenter
+
+
+class ActionButtonDelegate(QStyledItemDelegate):
+    """以 QStyle 直接在儲存格內繪製按鈕外觀，點擊由視圖的 clicked 信號處理"""
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = index.data(Qt.DisplayRole)
+        button.state = QStyle.State_Enabled
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+
+
+class ComponentTableModel(QAbstractTableModel):
+    """元件資料表模型，直接保存 ComponentInfo，狀態字串在 data() 中按欄位計算，UserRole 返回元件本身"""
+
+    # 各欄位的顯示值格式化函式，依欄位索引排列：(model, component) -> str
+    _COL_FORMATTERS = (
+        lambda model, c: model.product,
+        lambda model, c: model.lot_display,
+        lambda model, c: c.station,
+        lambda model, c: c.component_id,
+        lambda model, c: STATUS_OK if c.org_path else STATUS_NONE,
+        lambda model, c: STATUS_OK if c.csv_path else STATUS_NONE,
+        lambda model, c: STATUS_OK if c.basemap_path else STATUS_NONE,
+        lambda model, c: STATUS_NA if c.station == "MT" else (STATUS_OK if c.lossmap_path else STATUS_NONE),
+        lambda model, c: STATUS_OK if c.fpy_path else STATUS_NONE,
+        lambda model, c: COMPONENT_ACTION_TEXT,
+    )
+
+    # 檔案狀態欄位範圍（Org ~ FPY），元件處理完成後只需重繪這些欄位
+    STATUS_FIRST_COLUMN = 4
+    STATUS_LAST_COLUMN = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[ComponentInfo] = []
+        self._row_by_component: Dict[tuple, int] = {}  # (站點, 元件ID) -> 列索引
+        self.product = None
+        self.lot_display = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COMPONENT_TABLE_HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            return self._COL_FORMATTERS[index.column()](self, self._rows[index.row()])
+        if role == Qt.UserRole:
+            return self._rows[index.row()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COMPONENT_TABLE_HEADERS[section]
+        return None
+
+    def set_rows(self, rows: List[ComponentInfo], product: Optional[str] = None,
+                 lot_display: Optional[str] = None):
+        """一次替換全部資料列"""
+        self.beginResetModel()
+        self._rows = rows
+        self._row_by_component = {(c.station, c.component_id): row for row, c in enumerate(rows)}
+        self.product = product
+        self.lot_display = lot_display
+        self.endResetModel()
+
+    def clear(self):
+        """清空資料"""
+        self.set_rows([])
+
+    def component_at(self, row: int) -> ComponentInfo:
+        """獲取指定列的元件"""
+        return self._rows[row]
+
+    def replace_component(self, component: ComponentInfo) -> bool:
+        """
+        以最新的元件資料替換對應列，只通知狀態欄位重繪
+        
+        Returns:
+            bool: 表格中有該元件時返回 True
+        """
+        row = self._row_by_component.get((component.station, component.component_id))
+        if row is None:
+            return False
+        self._rows[row] = component
+        self.dataChanged.emit(
+            self.index(row, self.STATUS_FIRST_COLUMN), self.index(row, self.STATUS_LAST_COLUMN)
+        )
+        return True
+
+
+class ScanWorkerSignals(QObject):
+    """ScanWorker 的信號，QRunnable 本身不能定義信號"""
+    finished = Signal()
+    error = Signal(str)
+
+
+class ScanWorker(QRunnable):
+    """在背景線程重新掃描資料庫，掃描期間不阻塞介面"""
+    
+    def __init__(self):
+        super().__init__()
+        self.signals = ScanWorkerSignals()
+    
+    def run(self):
+        try:
+            db_manager.scan_database()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit()
+
 
 class TaskProgressDialog(QDialog):
     """任務進度對話框，用於顯示長時間任務的進度"""
@@ -59,49 +249,77 @@ class TaskProgressDialog(QDialog):
         self.cancel_button.clicked.connect(self.reject)
         layout.addWidget(self.cancel_button)
         
-        # 任務ID和計時器
+        # 任務ID，狀態由 data_processor 的信號推送，不再定時輪詢
         self.task_id = None
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_status)
-        self.timer.start(500)  # 每500毫秒更新
+        self._connected = False
     
     def set_task_id(self, task_id):
         """設置要追蹤的任務ID"""
         self.task_id = task_id
-    
-    def update_status(self):
-        """更新任務狀態"""
-        if not self.task_id:
-            return
-            
-        status = data_processor.get_task_status(self.task_id)
-        task = status.get("task")
+        if not self._connected:
+            data_processor.signaler.progress_updated.connect(self._on_progress)
+            data_processor.signaler.task_completed.connect(self._on_completed)
+            self._connected = True
         
+        # 任務可能在連接信號前已經結束，補查一次當前狀態
+        status = data_processor.get_task_status(task_id)
+        task = status.get("task")
         if not task:
             return
-            
-        # 根據任務狀態更新UI
-        if task["status"] == "completed":
-            self.progress_bar.setRange(0, 100)
+        if task["status"] in ("completed", "failed"):
+            self._on_completed(task_id, task["status"] == "completed", status.get("message", ""))
+        elif task["status"] == "running":
+            self._on_progress(task_id, task["task_type"])
+    
+    def _on_progress(self, task_id, message):
+        """任務進度更新"""
+        if task_id != self.task_id:
+            return
+        self.status_label.setText(f"處理中... {message}")
+    
+    def _on_completed(self, task_id, success, message):
+        """任務完成或失敗"""
+        if task_id != self.task_id:
+            return
+        self.progress_bar.setRange(0, 100)
+        if success:
             self.progress_bar.setValue(100)
-            self.status_label.setText(f"完成: {status.get('message', '')}")
-            self.timer.stop()
-            self.cancel_button.setText("關閉")
-        elif task["status"] == "failed":
-            self.progress_bar.setRange(0, 100)
-            self.progress_bar.setValue(0)
-            self.status_label.setText(f"失敗: {status.get('message', '')}")
-            self.timer.stop()
-            self.cancel_button.setText("關閉")
+            self.status_label.setText(f"完成: {message}")
         else:
-            self.status_label.setText(f"處理中... {task['task_type']}")
+            self.progress_bar.setValue(0)
+            self.status_label.setText(f"失敗: {message}")
+        self.cancel_button.setText("關閉")
+    
+    def done(self, result):
+        """關閉時斷開信號，避免對話框關閉後仍接收任務通知"""
+        if self._connected:
+            data_processor.signaler.progress_updated.disconnect(self._on_progress)
+            data_processor.signaler.task_completed.disconnect(self._on_completed)
+            self._connected = False
+        super().done(result)
 
 
 class MainWindow(QMainWindow):
     """應用程式主視窗"""
     
+    # 對話框訊息，{} 依序為 產品/批次/站點
+    _MSG_NEED_SELECTION = "請先選擇產品、批次和站點"
+    _BASEMAP_TEMPLATE = (
+        "正在為 {}/{}/{} 生成 Basemap...\n"
+        "流程將遵循原始databasemanager的執行順序：\n"
+        "1. 讀取config參數\n"
+        "2. 原始 CSV 偏移確認\n"
+        "3. 去表頭 + rename\n"
+        "4. 做 Basemap"
+    )
+    _LOSSMAP_TEMPLATE = "正在為 {}/{}/{} 生成 Lossmap..."
+    _FPY_TEMPLATE = "正在為 {}/{}/{} 生成 FPY{}..."
+    
     def __init__(self):
         super().__init__()
+        self._refresh_pending = False  # 是否已排定元件表格刷新
+        self._scan_worker = None  # 進行中的資料庫掃描
+        self._scan_dialog = None
         self.init_ui()
         
         # 載入資料
@@ -165,15 +383,17 @@ class MainWindow(QMainWindow):
         top_layout = QVBoxLayout(top_panel)
         
         # 產品資料表
-        self.product_table = QTableWidget(0, 9)
-        self.product_table.setHorizontalHeaderLabels(['Product', 'LOT', 'MT', 'DC2', 'INNER1', 'RDL', 'INNER2', 'CU', 'EMC'])
-        self.product_table.setEditTriggers(QTableWidget.NoEditTriggers)  # 設為不可編輯
+        self.product_model = ProductTableModel(self)
+        self.product_table = QTableView()
+        self.product_table.setModel(self.product_model)
+        self.product_table.setItemDelegate(CenterAlignDelegate(self.product_table))
+        self.product_table.setEditTriggers(QAbstractItemView.NoEditTriggers)  # 設為不可編輯
         self.product_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.product_table.verticalHeader().setVisible(False)  # 隱藏行號
-        self.product_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.product_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.product_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.product_table.setSelectionMode(QAbstractItemView.SingleSelection)
         self.product_table.setAlternatingRowColors(True)
-        self.product_table.cellClicked.connect(self.on_product_table_cell_clicked)
+        self.product_table.clicked.connect(self.on_product_table_clicked)
         
         top_layout.addWidget(self.product_table)
         splitter.addWidget(top_panel)
@@ -190,17 +410,23 @@ class MainWindow(QMainWindow):
         component_layout = QVBoxLayout(self.component_tab)
         
         # 元件資料表
-        self.component_table = QTableWidget(0, 10)
-        self.component_table.setHorizontalHeaderLabels(
-            ['Product', 'LOT', 'Station', 'Component ID', 'Org', 'CSV', 'Basemap', 'Lossmap', 'FPY', 'Actions']
-        )
-        self.component_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.component_model = ComponentTableModel(self)
+        self.component_table = QTableView()
+        self.component_table.setModel(self.component_model)
+        self.component_table.setItemDelegate(CenterAlignDelegate(self.component_table))
+        self.component_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.component_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.component_table.verticalHeader().setVisible(False)
-        self.component_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.component_table.setSelectionMode(QTableWidget.ExtendedSelection)  # 支持多選
+        self.component_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.component_table.setSelectionMode(QAbstractItemView.ExtendedSelection)  # 支持多選
         self.component_table.setAlternatingRowColors(True)
         
+        # 查看按鈕由委派繪製，不再為每列建立按鈕元件
+        self.component_table.setItemDelegateForColumn(
+            COMPONENT_ACTION_COLUMN, ActionButtonDelegate(self.component_table)
+        )
+        self.component_table.clicked.connect(self.on_component_table_clicked)
+        
         # 設置右鍵選單
         self.component_table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.component_table.customContextMenuRequested.connect(self.show_component_context_menu)
@@ -421,43 +647,20 @@ class MainWindow(QMainWindow):
         self.statusBar.showMessage("正在載入資料...")
         
         # 清空表格
-        self.product_table.setRowCount(0)
-        self.component_table.setRowCount(0)
+        self.component_model.clear()
         
-        # 獲取所有產品
-        products = db_manager.get_products()
+        # 收集產品資料表的所有列，最後一次性交給模型
+        # 每列: 產品、批次（使用原始批次ID顯示）、各站點元件數量
+        summaries = db_manager.get_all_lot_summaries()
+        rows = [
+            (product_id, lot.get_display_id(),
+             *[f"{station_counts.get(station, 0)} PCS" for station in STATIONS])
+            for product_id, lot, station_counts in summaries
+        ]
+        # 存儲實際的批次ID，用於後續查詢
+        lot_ids = [lot.lot_id for _, lot, _ in summaries]
         
-        # 填充產品資料表
-        for product in products:
-            # 獲取產品批次
-            lots = db_manager.get_lots_by_product(product.product_id)
-            
-            for lot in lots:
-                # 產品和批次數據 - 使用原始批次ID顯示
-                row_data = [product.product_id, lot.get_display_id()]
-                
-                # 各站點數據
-                for station in ['MT', 'DC2', 'INNER1', 'RDL', 'INNER2', 'CU', 'EMC']:
-                    if station in lot.stations:
-                        # 計算元件數量
-                        components = db_manager.get_components_by_lot_station(lot.lot_id, station)
-                        row_data.append(f"{len(components)} PCS")
-                    else:
-                        row_data.append("0 PCS")
-                
-                # 添加行
-                row = self.product_table.rowCount()
-                self.product_table.insertRow(row)
-                
-                # 填充資料
-                for col, data in enumerate(row_data):
-                    item = QTableWidgetItem(data)
-                    item.setTextAlignment(Qt.AlignCenter)
-                    self.product_table.setItem(row, col, item)
-                    
-                    # 存儲實際的批次ID作為項目數據，用於後續查詢
-                    if col == 1:  # 批次列
-                        item.setData(Qt.UserRole, lot.lot_id)  # 存儲內部批次ID
+        self._bulk_update(self.product_table, lambda: self.product_model.set_rows(rows, lot_ids))
         
         # 更新統計資訊
         stats = db_manager.get_component_count()
@@ -465,20 +668,23 @@ class MainWindow(QMainWindow):
         
         self.statusBar.showMessage("資料載入完成", 3000)
     
-    def on_product_table_cell_clicked(self, row, col):
+    def on_product_table_clicked(self, index):
         """產品資料表點擊事件處理"""
+        row = index.row()
+        col = index.column()
+        values = self.product_model.row_values(row)
+        
         # 獲取選中的產品和批次
-        self.selected_product = self.product_table.item(row, 0).text()
+        self.selected_product = values[0]
         
-        # 獲取批次 - 從UserRole中獲取內部批次ID，顯示仍使用顯示名稱
-        lot_item = self.product_table.item(row, 1)
-        self.selected_lot = lot_item.data(Qt.UserRole)  # 內部批次ID
-        self.selected_lot_display = lot_item.text()  # 顯示名稱
+        # 獲取批次 - 內部批次ID用於查詢，顯示仍使用顯示名稱
+        self.selected_lot = self.product_model.lot_id_at(row)  # 內部批次ID
+        self.selected_lot_display = values[1]  # 顯示名稱
         
         # 獲取選中的站點
         if col >= 2:
             station_index = col - 2
-            self.selected_station = ['MT', 'DC2', 'INNER1', 'RDL', 'INNER2', 'CU', 'EMC'][station_index]
+            self.selected_station = STATIONS[station_index]
         else:
             self.selected_station = None
         
@@ -487,10 +693,8 @@ class MainWindow(QMainWindow):
     
     def update_component_table(self):
         """更新元件表格"""
-        # 清空表格
-        self.component_table.setRowCount(0)
-        
         if not self.selected_product or not self.selected_lot:
+            self.component_model.clear()
             return
             
         # 要顯示的站點
@@ -503,61 +707,36 @@ class MainWindow(QMainWindow):
             if lot:
                 stations = lot.stations
         
-        # 針對每個站點獲取元件
+        # 針對每個站點獲取元件，收集成一個扁平列表後一次性重設模型
+        components = []
         for station in stations:
-            components = db_manager.get_components_by_lot_station(self.selected_lot, station)
-            
-            for component in components:
-                row = self.component_table.rowCount()
-                self.component_table.insertRow(row)
-                
-                # 產品、批次、站點
-                self.component_table.setItem(row, 0, self._create_table_item(self.selected_product))
-                self.component_table.setItem(row, 1, self._create_table_item(self.selected_lot_display))
-                self.component_table.setItem(row, 2, self._create_table_item(station))
-                
-                # 元件ID
-                self.component_table.setItem(row, 3, self._create_table_item(component.component_id))
-                
-                # Org 狀態
-                org_status = "OK" if component.org_path else "NONE"
-                self.component_table.setItem(row, 4, self._create_table_item(org_status))
-                
-                # CSV 狀態
-                csv_status = "OK" if component.csv_path else "NONE"
-                self.component_table.setItem(row, 5, self._create_table_item(csv_status))
-                
-                # Basemap 狀態
-                basemap_status = "OK" if component.basemap_path else "NONE"
-                self.component_table.setItem(row, 6, self._create_table_item(basemap_status))
-                
-                # Lossmap 狀態
-                if station == "MT":
-                    lossmap_status = "N/A"
-                else:
-                    lossmap_status = "OK" if component.lossmap_path else "NONE"
-                self.component_table.setItem(row, 7, self._create_table_item(lossmap_status))
-                
-                # FPY 狀態
-                fpy_status = "OK" if component.fpy_path else "NONE"
-                self.component_table.setItem(row, 8, self._create_table_item(fpy_status))
-                
-                # 操作按鈕
-                action_widget = QWidget()
-                action_layout = QHBoxLayout(action_widget)
-                action_layout.setContentsMargins(0, 0, 0, 0)
-                
-                view_btn = QPushButton("查看")
-                view_btn.clicked.connect(lambda checked=False, c=component: self.on_view_component(c))
-                action_layout.addWidget(view_btn)
-                
-                self.component_table.setCellWidget(row, 9, action_widget)
+            components.extend(db_manager.get_components_by_lot_station(self.selected_lot, station))
+        
+        self._bulk_update(
+            self.component_table,
+            lambda: self.component_model.set_rows(components, self.selected_product, self.selected_lot_display)
+        )
+    
+    def on_component_table_clicked(self, index):
+        """元件資料表點擊事件處理，點擊查看欄時顯示元件信息"""
+        if index.column() != COMPONENT_ACTION_COLUMN:
+            return
+        component = index.data(Qt.UserRole)
+        if component is not None:
+            self.on_view_component(component)
     
-    def _create_table_item(self, text):
-        """創建表格項目並設置為居中"""
-        item = QTableWidgetItem(text)
-        item.setTextAlignment(Qt.AlignCenter)
-        return item
+    def _bulk_update(self, view, fill):
+        """批量填充表格期間暫停重繪、信號與排序，完成後一次刷新"""
+        sorting_enabled = view.isSortingEnabled()
+        view.setSortingEnabled(False)
+        view.setUpdatesEnabled(False)
+        view.blockSignals(True)
+        try:
+            fill()
+        finally:
+            view.blockSignals(False)
+            view.setUpdatesEnabled(True)
+            view.setSortingEnabled(sorting_enabled)
     
     def on_view_component(self, component):
         """查看元件"""
@@ -578,9 +757,7 @@ class MainWindow(QMainWindow):
     def show_component_context_menu(self, position):
         """顯示元件表格的右鍵選單"""
         # 獲取選中的行
-        selected_rows = set()
-        for item in self.component_table.selectedItems():
-            selected_rows.add(item.row())
+        selected_rows = {index.row() for index in self.component_table.selectionModel().selectedRows()}
         
         if not selected_rows:
             return
@@ -593,18 +770,10 @@ class MainWindow(QMainWindow):
             row = list(selected_rows)[0]
             
             # 獲取該行的組件信息
-            product_item = self.component_table.item(row, 0)
-            lot_item = self.component_table.item(row, 1)
-            station_item = self.component_table.item(row, 2)
-            component_id_item = self.component_table.item(row, 3)
-            
-            if not all([product_item, lot_item, station_item, component_id_item]):
-                return
-            
-            product = product_item.text()
-            lot_display = lot_item.text()
-            station = station_item.text()
-            component_id = component_id_item.text()
+            component = self.component_model.component_at(row)
+            product = self.component_model.product
+            station = component.station
+            component_id = component.component_id
             
             # 獲取實際的批次ID
             lot_id = self.selected_lot  # 使用當前選擇的lot_id
@@ -712,19 +881,15 @@ class MainWindow(QMainWindow):
         try:
             # 從選中的行收集組件數據
             components_data = []
+            product = self.component_model.product
             for row in selected_rows:
-                product_item = self.component_table.item(row, 0)
-                lot_item = self.component_table.item(row, 1)
-                station_item = self.component_table.item(row, 2)
-                component_id_item = self.component_table.item(row, 3)
-                
-                if all([product_item, lot_item, station_item, component_id_item]):
-                    components_data.append((
-                        component_id_item.text(),  # component_id
-                        self.selected_lot,         # lot_id (使用內部ID)
-                        station_item.text(),       # station
-                        product_item.text()        # source_product
-                    ))
+                component = self.component_model.component_at(row)
+                components_data.append((
+                    component.component_id,  # component_id
+                    self.selected_lot,       # lot_id (使用內部ID)
+                    component.station,       # station
+                    product                  # source_product
+                ))
             
             if not components_data:
                 QMessageBox.warning(self, "警告", "無法獲取選中的組件信息")
@@ -784,21 +949,26 @@ class MainWindow(QMainWindow):
             logger.error(f"處理批量移動檔案請求失敗: {e}")
             QMessageBox.critical(self, "錯誤", f"批量移動檔案失敗: {str(e)}")
     
+    def _require_selection(self) -> bool:
+        """確認已選擇產品、批次和站點，否則提示使用者"""
+        if not (self.selected_product and self.selected_lot and self.selected_station):
+            QMessageBox.warning(self, "警告", self._MSG_NEED_SELECTION)
+            return False
+        return True
+    
+    def _selection_labels(self) -> tuple:
+        """當前選擇的 (產品, 批次顯示名稱, 站點)，用於對話框訊息"""
+        return self.selected_product, self.selected_lot_display, self.selected_station
+    
     def on_process_basemap_clicked(self):
         """生成 Basemap 按鈕點擊事件"""
-        if not self.selected_product or not self.selected_lot or not self.selected_station:
-            QMessageBox.warning(self, "警告", "請先選擇產品、批次和站點")
+        if not self._require_selection():
             return
         
         # 創建任務對話框
         dialog = TaskProgressDialog(
             "生成 Basemap", 
-            f"正在為 {self.selected_product}/{self.selected_lot_display}/{self.selected_station} 生成 Basemap...\n"
-            f"流程將遵循原始databasemanager的執行順序：\n"
-            f"1. 讀取config參數\n"
-            f"2. 原始 CSV 偏移確認\n"
-            f"3. 去表頭 + rename\n"
-            f"4. 做 Basemap",
+            self._BASEMAP_TEMPLATE.format(*self._selection_labels()),
             self
         )
         
@@ -817,8 +987,7 @@ class MainWindow(QMainWindow):
     
     def on_process_lossmap_clicked(self):
         """生成 Lossmap 按鈕點擊事件"""
-        if not self.selected_product or not self.selected_lot or not self.selected_station:
-            QMessageBox.warning(self, "警告", "請先選擇產品、批次和站點")
+        if not self._require_selection():
             return
         
         # 第一站不能生成Lossmap
@@ -829,7 +998,7 @@ class MainWindow(QMainWindow):
         # 創建任務對話框
         dialog = TaskProgressDialog(
             "生成 Lossmap", 
-            f"正在為 {self.selected_product}/{self.selected_lot_display}/{self.selected_station} 生成 Lossmap...",
+            self._LOSSMAP_TEMPLATE.format(*self._selection_labels()),
             self
         )
         
@@ -847,8 +1016,7 @@ class MainWindow(QMainWindow):
     
     def on_process_fpy_clicked(self):
         """生成 FPY 按鈕點擊事件"""
-        if not self.selected_product or not self.selected_lot or not self.selected_station:
-            QMessageBox.warning(self, "警告", "請先選擇產品、批次和站點")
+        if not self._require_selection():
             return
         
         # 詢問用戶是否使用並行處理
@@ -866,8 +1034,9 @@ class MainWindow(QMainWindow):
         # 創建任務對話框
         dialog = TaskProgressDialog(
             "生成 FPY", 
-            f"正在為 {self.selected_product}/{self.selected_lot_display}/{self.selected_station} 生成 FPY" +
-            (" (並行模式)" if task_type == "fpy_parallel" else "") + "...",
+            self._FPY_TEMPLATE.format(
+                *self._selection_labels(), " (並行模式)" if task_type == "fpy_parallel" else ""
+            ),
             self
         )
         
@@ -886,19 +1055,63 @@ class MainWindow(QMainWindow):
     
     def on_refresh_clicked(self):
         """刷新資料按鈕點擊事件"""
-        # 重新掃描資料庫
-        db_manager.scan_database()
+        if self._scan_worker is not None:
+            return
+        
+        # 重新掃描資料庫（背景線程），完成後再重新載入資料；
+        # 掃描結果一次替換資料快取，掃描期間其他操作讀取的仍是完整的舊快取
+        self.refresh_btn.setEnabled(False)
+        self.statusBar.showMessage("正在掃描資料庫...")
+        
+        self._scan_dialog = TaskProgressDialog("重新掃描資料", "正在掃描資料庫...", self)
+        self._scan_dialog.setAttribute(Qt.WA_DeleteOnClose)
+        self._scan_dialog.cancel_button.setText("隱藏")
+        self._scan_dialog.finished.connect(self._on_scan_dialog_finished)
+        self._scan_dialog.open()
+        
+        self._scan_worker = ScanWorker()
+        self._scan_worker.signals.finished.connect(self._on_scan_finished)
+        self._scan_worker.signals.error.connect(self._on_scan_error)
+        QThreadPool.globalInstance().start(self._scan_worker)
+    
+    def _on_scan_finished(self):
+        """資料庫掃描完成"""
+        self._end_scan()
+        invalidate_products_cache()
+        # load_data 會清空元件表格，掃描期間延後的刷新不需再執行
+        self._refresh_pending = False
         
         # 重新載入資料
         self.load_data()
     
+    def _on_scan_error(self, message):
+        """資料庫掃描失敗"""
+        self._end_scan()
+        # 執行掃描期間延後的元件表格刷新
+        if self._refresh_pending:
+            self._do_refresh()
+        logger.error(f"重新掃描資料庫失敗: {message}")
+        self.statusBar.showMessage("資料庫掃描失敗", 5000)
+        QMessageBox.critical(self, "錯誤", f"重新掃描資料庫失敗: {message}")
+    
+    def _end_scan(self):
+        """結束掃描狀態，關閉進度對話框並恢復按鈕"""
+        self._scan_worker = None
+        if self._scan_dialog is not None:
+            self._scan_dialog.close()
+        self.refresh_btn.setEnabled(True)
+    
+    def _on_scan_dialog_finished(self, _result):
+        """掃描進度對話框已關閉（完成或被使用者隱藏）"""
+        self._scan_dialog = None
+    
     @Slot(str, bool, str)
     def on_task_completed(self, task_id, success, message):
         """任務完成回調 - 使用Qt槽接收信號"""
         # 獲取任務信息
         task_status = data_processor.get_task_status(task_id)
-        if task_status and "task" in task_status:
-            task = task_status["task"]
+        task = task_status.get("task") if task_status else None
+        if task:
             task_type = task.get("task_type", "")
             
             # 如果是批量移動任務，顯示完成訊息
@@ -907,10 +1120,45 @@ class MainWindow(QMainWindow):
                     self.statusBar.showMessage(f"批量移動檔案完成: {message}", 5000)
                 else:
                     self.statusBar.showMessage(f"批量移動檔案失敗: {message}", 5000)
+            
+            # 掃描期間讀到的是即將被替換的舊快取，掃描完成後 load_data 會重新載入，刷新延後到掃描結束
+            if self._scan_worker is not None:
+                self._refresh_pending = True
+                return
+            
+            # 單一元件的處理任務只刷新該元件所在的列
+            if self._refresh_component_row(task):
+                return
         
-        # 重新載入元件表格
+        # 重新載入元件表格，短時間內連續完成的任務合併為一次刷新
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            QTimer.singleShot(COMPONENT_REFRESH_DELAY_MS, self._do_refresh)
+    
+    def _do_refresh(self):
+        """執行排定的元件表格刷新，掃描進行中時保留標記待掃描結束後處理"""
+        if self._scan_worker is not None:
+            return
+        self._refresh_pending = False
         self.update_component_table()
     
+    def _refresh_component_row(self, task: Dict[str, Any]) -> bool:
+        """
+        只刷新任務對應元件的一列，保留捲動位置與選取
+        
+        Returns:
+            bool: 已完成單列刷新時返回 True，否則需要重建整個表格
+        """
+        component_id = task.get("component_id")
+        if (not component_id or task.get("task_type") in ("move_files", "batch_move_files")
+                or task.get("lot_id") != self.selected_lot):
+            return False
+        
+        component = db_manager.get_component(task["lot_id"], task.get("station"), component_id)
+        if component is None:
+            return False
+        return self.component_model.replace_component(component)
+    
     def on_online_clicked(self):
         """在線處理按鈕點擊事件"""
         if self.online_btn.isChecked():
@@ -3,6 +3,7 @@ Database Manager Plus 主程序
 """
 import sys
 import os
+import multiprocessing
 from pathlib import Path
 
 # 設置 matplotlib 後端，避免線程問題
@@ -11,28 +12,14 @@ matplotlib.use('Agg')  # 使用非互動式後端
 
 from app.utils.logger import get_logger, setup_logging
 from app.utils.config_manager import load_config
-from app.models.database_manager import db_manager
-from app.controllers.data_processor import DataProcessor
-from app.views.main_window import MainWindow
 
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
-import qdarkstyle
-
-
-# 設置工作目錄為腳本所在目錄
-script_dir = Path(__file__).parent
-os.chdir(script_dir)
-
-# 初始化日誌
-setup_logging()
 logger = get_logger("main")
 
-# 初始化數據處理器
-data_processor = DataProcessor()
 
-def validate_configs():
+def validate_configs(data_processor):
     """驗證應用配置"""
+    from app.models.database_manager import db_manager
+    
     # 驗證站點順序配置
     station_order_valid, station_order_info = db_manager.validate_station_order()
     if not station_order_valid:
@@ -61,11 +48,27 @@ def validate_configs():
 
 def main():
     """應用程序入口點"""
+    # 資料庫、處理器與介面模塊在此才載入：繪圖進程以 spawn 啟動時會重新執行本檔的
+    # 模塊層級程式碼，子進程不應載入資料庫快取或建立 Qt 物件
+    from app.controllers.data_processor import DataProcessor
+    from app.views.main_window import MainWindow
+    from PySide6.QtWidgets import QApplication
+    import qdarkstyle
+    
+    # 設置工作目錄為腳本所在目錄
+    os.chdir(Path(__file__).parent)
+    
+    # 初始化日誌
+    setup_logging()
+    
+    # 初始化數據處理器
+    data_processor = DataProcessor()
+    
     # 載入配置文件
     load_config()
     
     # 驗證配置
-    validate_configs()
+    validate_configs(data_processor)
     
     # 建立 Qt 應用
     app = QApplication(sys.argv)
@@ -84,4 +87,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 繪圖進程池在打包後的執行檔中需要此呼叫
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
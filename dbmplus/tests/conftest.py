@@ -0,0 +1,12 @@
+"""
+測試共用設定
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# 讓測試以 `app.` 匯入應用程式模組，與 main.py 相同
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# 日誌目錄依 sys.argv[0] 所在目錄推算，測試時改到暫存目錄，避免寫入 pytest 的安裝目錄
+sys.argv[0] = str(Path(tempfile.mkdtemp(prefix="dbmplus-test-")) / "pytest")
@@ -0,0 +1,110 @@
+"""
+ConfigManager 讀寫與快取的測試
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from app.utils import config_manager as config_module
+from app.utils.config_manager import ConfigManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """指向暫存設定檔的獨立 ConfigManager，不影響全局單例與專案內的 settings.json"""
+    settings = tmp_path / "settings.json"
+    settings.write_text(json.dumps({"database": {"base_path": "D:/db"}, "value": 1}), encoding="utf-8")
+
+    instance = object.__new__(ConfigManager)
+    instance._initialized = False
+    instance.__init__()
+    instance.config_file = settings
+    instance.msgpack_file = settings.with_suffix(".msgpack")
+    instance.load_config()
+    return instance
+
+
+def test_update_visible_to_get(manager):
+    assert manager.get("value") == 1
+    manager.update("value", 2)
+    manager.update("database.base_path", "E:/db")
+    assert manager.get("value") == 2
+    assert manager.get("database.base_path") == "E:/db"
+
+
+def test_get_during_update_does_not_cache_stale_value(manager, monkeypatch):
+    """get() 以舊配置重建唯讀配置時，並行的 update() 不得被其寫入的快取覆蓋"""
+    manager.update("other", 0)  # 讓下一次 get() 重建唯讀配置
+    snapshot_taken = threading.Event()
+    release = threading.Event()
+    original_freeze = config_module._deep_freeze
+
+    def slow_freeze(value):
+        frozen = original_freeze(value)
+        # 只在最外層（整份配置）凍結完成後暫停，模擬 get() 已取得舊快照
+        if value is manager.config and not snapshot_taken.is_set():
+            snapshot_taken.set()
+            release.wait(5)
+        return frozen
+
+    monkeypatch.setattr(config_module, "_deep_freeze", slow_freeze)
+
+    reader = threading.Thread(target=manager.get, args=("value",))
+    writer = threading.Thread(target=manager.update, args=("value", 2))
+    reader.start()
+    assert snapshot_taken.wait(5)
+    writer.start()
+    time.sleep(0.1)
+    release.set()
+    reader.join(5)
+    writer.join(5)
+
+    assert manager.get("value") == 2
+
+
+def _count_writes(manager, monkeypatch):
+    writes = []
+    original = manager._write_json
+
+    def counting_write():
+        writes.append(time.monotonic())
+        original()
+
+    monkeypatch.setattr(manager, "_write_json", counting_write)
+    return writes
+
+
+def test_update_does_not_write(manager, monkeypatch):
+    writes = _count_writes(manager, monkeypatch)
+    manager.update("value", 2)
+    time.sleep(manager.FLUSH_DELAY * 2)
+    assert writes == []
+    assert manager._writer_thread is None
+    assert json.loads(manager.config_file.read_text(encoding="utf-8"))["value"] == 1
+
+
+def test_save_config_debounced(manager, monkeypatch):
+    monkeypatch.setattr(manager, "FLUSH_DELAY", 0.2)
+    writes = _count_writes(manager, monkeypatch)
+    for i in range(5):
+        manager.update("value", i)
+        manager.save_config()
+    assert writes == []
+
+    deadline = time.monotonic() + 5
+    while not writes and time.monotonic() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.3)
+    assert len(writes) == 1
+    assert json.loads(manager.config_file.read_text(encoding="utf-8"))["value"] == 4
+
+
+def test_pending_save_flushed_at_exit(manager, monkeypatch):
+    monkeypatch.setattr(manager, "FLUSH_DELAY", 60)
+    manager.update("value", 3)
+    manager.save_config()
+    manager._flush_pending()
+    assert json.loads(manager.config_file.read_text(encoding="utf-8"))["value"] == 3
+    assert not manager._unsaved
@@ -0,0 +1,206 @@
+"""
+data_utils 數值運算的測試，結果與原本以 pandas merge / apply 實作的版本比對
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils import data_utils
+from app.utils.data_utils import (
+    apply_mask, calculate_loss_chain, calculate_loss_points, convert_to_binary, flip_data
+)
+
+RULES = {'good': ['OK', 'Pass'], 'bad': ['NG', 'Dirty']}
+
+MASK_RULES = [
+    {'start_row': 0, 'end_row': 10, 'start_col': 0, 'end_col': 50},
+    {'start_row': 40, 'end_row': 60, 'start_col': 30, 'end_col': 35},
+    {'start_row': 5},  # 缺少欄位的規則記錄錯誤後略過
+]
+
+
+def reference_convert_to_binary(df, rules):
+    """原本以 apply 實作的 convert_to_binary"""
+    df_copy = df.copy()
+    df_copy['binary'] = df_copy['DefectType'].apply(lambda x: 1 if x in rules['good'] else 0)
+    return df_copy[['Col', 'Row', 'binary']]
+
+
+def reference_flip_data(df, axis):
+    """原本的 flip_data"""
+    df_copy = df.copy()
+    if axis == 'horizontal':
+        df_copy['Col'] = df_copy['Col'].max() - df_copy['Col']
+    elif axis == 'vertical':
+        df_copy['Row'] = df_copy['Row'].max() - df_copy['Row']
+    return df_copy
+
+
+def reference_apply_mask(df, mask_rules):
+    """原本逐規則過濾的 apply_mask"""
+    df_copy = df.copy()
+    for rule in mask_rules:
+        try:
+            mask = ~((df_copy['Row'] >= int(rule["start_row"])) & (df_copy['Row'] <= int(rule["end_row"])) &
+                     (df_copy['Col'] >= int(rule["start_col"])) & (df_copy['Col'] <= int(rule["end_col"])))
+            df_copy = df_copy[mask]
+        except (KeyError, TypeError):
+            pass
+    return df_copy
+
+
+def reference_loss_chain(dfs):
+    """原本 data_processor 中逐站 outer merge、fillna(0) 後取最小值的作法"""
+    renamed = [df.rename(columns={'binary': f'binary_{i}'}) for i, df in enumerate(dfs)]
+    merged = renamed[0]
+    for df in renamed[1:]:
+        merged = pd.merge(merged, df, on=['Col', 'Row'], how='outer')
+    merged = merged.fillna(0)
+    binary_cols = [col for col in merged.columns if col.startswith('binary_')]
+    merged['CombinedDefectType'] = merged[binary_cols].min(axis=1)
+    return merged[['Col', 'Row', 'CombinedDefectType']]
+
+
+def reference_loss_points(prev_df, curr_df):
+    """原本以 pd.merge 實作的 calculate_loss_points"""
+    merged = pd.merge(prev_df, curr_df, on=['Col', 'Row'], suffixes=('_prev', '_curr'))
+    parts = []
+    for status, prev, curr in (('good_to_good', 1, 1), ('good_to_bad', 1, 0), ('bad_to_bad', 0, 0)):
+        part = merged[(merged['binary_prev'] == prev) & (merged['binary_curr'] == curr)]
+        parts.append(part[['Col', 'Row']].assign(status=status))
+    return pd.concat(parts)
+
+
+def as_sorted_rows(df):
+    return sorted(zip(df['Col'].tolist(), df['Row'].tolist(), df['status'].astype(str).tolist()))
+
+
+def make_station(rng, n, size, dtype=np.int64):
+    return pd.DataFrame({
+        'Col': rng.integers(0, size, n).astype(dtype),
+        'Row': rng.integers(0, size, n).astype(dtype),
+        'binary': rng.integers(0, 2, n).astype(np.uint8),
+    })
+
+
+@pytest.fixture(params=['dense', 'join'])
+def loss_path(request, monkeypatch):
+    """分別測試 numba 稠密網格與 searchsorted 連接兩條路徑"""
+    if request.param == 'dense':
+        if data_utils._loss_codes_kernel is None:
+            pytest.skip("未安裝 numba")
+    else:
+        monkeypatch.setattr(data_utils, '_loss_codes_kernel', None)
+    return request.param
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_loss_points_match_merge_with_duplicates(loss_path, seed):
+    rng = np.random.default_rng(seed)
+    # 小網格使座標大量重複
+    prev_df = make_station(rng, 400, 12)
+    curr_df = make_station(rng, 400, 12)
+    result = calculate_loss_points(prev_df, curr_df)
+    assert as_sorted_rows(result) == as_sorted_rows(reference_loss_points(prev_df, curr_df))
+
+
+def test_loss_points_duplicate_prev_points_kept(loss_path):
+    prev_df = pd.DataFrame({'Col': [1, 1, 2, 2], 'Row': [1, 1, 2, 2], 'binary': [1, 1, 0, 0]})
+    curr_df = pd.DataFrame({'Col': [1, 2], 'Row': [1, 2], 'binary': [0, 0]})
+    result = calculate_loss_points(prev_df, curr_df)
+    assert len(result) == 4
+    assert as_sorted_rows(result) == as_sorted_rows(reference_loss_points(prev_df, curr_df))
+
+
+def test_loss_points_unique_points_match_merge(loss_path):
+    rng = np.random.default_rng(42)
+    coords = rng.permutation(200 * 200)[:5000]
+    prev_df = pd.DataFrame({'Col': coords // 200, 'Row': coords % 200, 'binary': rng.integers(0, 2, 5000)})
+    coords = rng.permutation(200 * 200)[:5000]
+    curr_df = pd.DataFrame({'Col': coords // 200, 'Row': coords % 200, 'binary': rng.integers(0, 2, 5000)})
+    result = calculate_loss_points(prev_df, curr_df)
+    assert as_sorted_rows(result) == as_sorted_rows(reference_loss_points(prev_df, curr_df))
+
+
+def make_defects(rng, n, size=100):
+    return pd.DataFrame({
+        'Col': rng.integers(0, size, n),
+        'Row': rng.integers(0, size, n),
+        'DefectType': rng.choice(['OK', 'Pass', 'NG', 'Dirty', None], n),
+    })
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_convert_to_binary_matches_apply(categorical):
+    df = make_defects(np.random.default_rng(1), 2000)
+    expected = reference_convert_to_binary(df, RULES)
+    if categorical:
+        df = df.astype({'DefectType': 'category'})
+    result = convert_to_binary(df, RULES)
+    assert result['Col'].tolist() == expected['Col'].tolist()
+    assert result['Row'].tolist() == expected['Row'].tolist()
+    assert result['binary'].tolist() == expected['binary'].tolist()
+
+
+@pytest.fixture(params=['numpy', 'numexpr'])
+def flip_path(request, monkeypatch):
+    """分別測試 NumPy 與 numexpr 兩條路徑"""
+    if request.param == 'numexpr':
+        if data_utils.numexpr is None:
+            pytest.skip("未安裝 numexpr")
+        monkeypatch.setattr(data_utils, 'NUMEXPR_MIN_ROWS', 0)
+    return request.param
+
+
+@pytest.mark.parametrize('axis', ['horizontal', 'vertical', 'diagonal'])
+def test_flip_data_matches_reference(flip_path, axis):
+    df = make_defects(np.random.default_rng(2), 500)
+    result = flip_data(df, axis)
+    pd.testing.assert_frame_equal(result, reference_flip_data(df, axis), check_dtype=False)
+
+
+@pytest.fixture(params=['numpy', 'numexpr', 'numba'])
+def mask_path(request, monkeypatch):
+    """分別測試 NumPy、numexpr 與 numba 三條路徑"""
+    if request.param == 'numpy':
+        return request.param
+    if request.param == 'numexpr' and data_utils.numexpr is None:
+        pytest.skip("未安裝 numexpr")
+    if request.param == 'numba' and data_utils._mask_kernel is None:
+        pytest.skip("未安裝 numba")
+    monkeypatch.setattr(data_utils, 'NUMEXPR_MIN_ROWS', 0)
+    if request.param == 'numexpr':
+        monkeypatch.setattr(data_utils, '_mask_kernel', None)
+    return request.param
+
+
+def test_apply_mask_matches_reference(mask_path):
+    df = make_defects(np.random.default_rng(3), 3000)
+    result = apply_mask(df, MASK_RULES)
+    pd.testing.assert_frame_equal(result, reference_apply_mask(df, MASK_RULES))
+
+
+def test_apply_mask_nothing_masked(mask_path):
+    df = make_defects(np.random.default_rng(4), 100)
+    rules = [{'start_row': 500, 'end_row': 600, 'start_col': 0, 'end_col': 10}]
+    pd.testing.assert_frame_equal(apply_mask(df, rules), reference_apply_mask(df, rules))
+
+
+def unique_station(rng, n, size=60):
+    coords = rng.permutation(size * size)[:n]
+    return pd.DataFrame({
+        'Col': coords // size,
+        'Row': coords % size,
+        'binary': rng.integers(0, 2, n).astype(np.uint8),
+    })
+
+
+@pytest.mark.parametrize('stations', [1, 2, 4])
+def test_loss_chain_matches_outer_merge(stations):
+    rng = np.random.default_rng(stations)
+    dfs = [unique_station(rng, 2000) for _ in range(stations)]
+    result = calculate_loss_chain(dfs)
+    expected = reference_loss_chain(dfs)
+    as_rows = lambda df: sorted(zip(df['Col'].tolist(), df['Row'].tolist(),
+                                    df['CombinedDefectType'].astype(int).tolist()))
+    assert as_rows(result) == as_rows(expected)
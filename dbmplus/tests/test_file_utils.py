@@ -0,0 +1,98 @@
+"""
+file_utils 讀取與型別縮減的測試
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.utils.file_utils import _downcast, _sniff_sep, _sniff_sep_cached, find_header_row, load_csv, remove_header_and_rename
+
+
+def test_downcast_small_coordinates_to_int16():
+    df = _downcast(pd.DataFrame({'Col': [0, 5, 100], 'Row': [-3, 0, 7], 'binary': [1, 0, 1]}))
+    assert df['Col'].dtype == np.int16
+    assert df['Row'].dtype == np.int16
+    assert df['binary'].dtype == np.uint8
+
+
+def test_downcast_large_coordinates_to_int32():
+    df = _downcast(pd.DataFrame({'Col': [0, 40_000], 'Row': [0, 1]}))
+    assert df['Col'].dtype == np.int32
+    assert df['Col'].tolist() == [0, 40_000]
+    assert df['Row'].dtype == np.int16
+
+
+def test_downcast_keeps_out_of_range_and_non_integer_columns():
+    df = _downcast(pd.DataFrame({'Col': [0, 2**40], 'Row': [0.5, 1.5]}))
+    assert df['Col'].dtype == np.int64
+    assert df['Row'].dtype == np.float64
+
+
+def test_downcast_keeps_binary_with_missing_values():
+    df = _downcast(pd.DataFrame({'Col': [1, 3], 'Row': [2, 4], 'binary': [1.0, np.nan]}))
+    assert df['binary'].dtype == np.float64
+
+
+def test_load_csv_with_blank_binary(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("Col,Row,binary\n1,2,1\n3,4,\n", encoding="utf-8")
+    df = load_csv(path)
+    assert df['Col'].tolist() == [1, 3]
+    assert df['binary'].isna().tolist() == [False, True]
+
+
+def test_downcast_empty_frame():
+    df = _downcast(pd.DataFrame({'Col': pd.Series([], dtype=np.int64)}))
+    assert df['Col'].dtype == np.int16
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_sniff_sep_per_file(tmp_path):
+    """同一目錄中不同分隔符的檔案各自偵測"""
+    comma = _write(tmp_path / "a.csv", "info\nCol,Row,DefectType\n1,2,OK\n3,4,NG\n")
+    tab = _write(tmp_path / "b.csv", "Col\tRow\tDefectType\n1\t2\tOK\n3\t4\tNG\n")
+    assert _sniff_sep(comma) == ","
+    assert _sniff_sep(tab) == "\t"
+    assert load_csv(tab)['DefectType'].tolist() == ["OK", "NG"]
+
+
+def test_sniff_sep_rechecks_modified_file(tmp_path):
+    path = _write(tmp_path / "a.csv", "Col,Row,DefectType\n1,2,OK\n3,4,NG\n")
+    assert _sniff_sep(path) == ","
+    _write(path, "Col;Row;DefectType\n1;2;OK\n3;4;NG\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert _sniff_sep(path) == ";"
+
+
+def test_sniff_sep_requires_header_confirmation(tmp_path):
+    """資料中的分號不應被誤判為分隔符，標題行無法確認時使用逗號"""
+    path = _write(tmp_path / "a.csv", "Col,Row,DefectType\n1;2;3\n4;5;6\n7;8;9\n")
+    assert _sniff_sep(path) == ","
+
+
+def test_comma_heuristic_is_opt_in(tmp_path):
+    """沒有標題列名的檔案只在 comma_fallback=True 時以逗號數量猜測標題行"""
+    path = _write(tmp_path / "a.csv", "meta\na,b,c,d,e\n1,2,3,4,5\n")
+    assert find_header_row(path) is None
+    assert find_header_row(path, comma_fallback=True) == 1
+
+    ok, _ = remove_header_and_rename(path, output_path=tmp_path / "out.csv")
+    assert not ok
+    assert not (tmp_path / "out.csv").exists()
+
+
+def test_sniff_sep_caches_unsniffable_file(tmp_path):
+    """無法偵測分隔符的檔案同樣快取退回的 ','，不會每次重新讀取"""
+    path = _write(tmp_path / "a.csv", "Col Row DefectType\nxyz\nabc def\n")
+    before = _sniff_sep_cached.cache_info()
+    assert _sniff_sep(path) == ","
+    assert _sniff_sep(path) == ","
+    after = _sniff_sep_cached.cache_info()
+    assert after.misses - before.misses == 1
+    assert after.hits - before.hits == 1
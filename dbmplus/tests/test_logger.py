@@ -0,0 +1,84 @@
+"""
+BufferedRotatingFileHandler 與 FlushingQueueListener 的測試
+"""
+import logging
+import logging.handlers
+import queue
+import time
+
+from app.utils import logger as log_module
+from app.utils.logger import BufferedRotatingFileHandler, FlushingQueueListener, LOG_FLUSH_INTERVAL
+
+
+class CountingFormatter(logging.Formatter):
+    """記錄 format() 被呼叫的次數"""
+
+    def __init__(self):
+        super().__init__("%(message)s")
+        self.calls = 0
+
+    def format(self, record):
+        self.calls += 1
+        return super().format(record)
+
+
+def _make_logger(name, log_queue):
+    logger = logging.getLogger(name)
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    return logger
+
+
+def _wait_for(path, text, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if path.exists() and text in path.read_text(encoding="utf-8"):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_idle_listener_flushes_buffered_records(tmp_path):
+    log_file = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(log_file, maxBytes=1 << 20, backupCount=1, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log_queue = queue.SimpleQueue()
+    listener = FlushingQueueListener(log_queue, handler)
+    listener.start()
+    try:
+        logger = _make_logger("test_idle_flush", log_queue)
+        logger.info("first")
+        logger.info("second")
+        # 之後不再有記錄，仍應在刷新間隔後寫入檔案
+        assert _wait_for(log_file, "second", LOG_FLUSH_INTERVAL * 3)
+    finally:
+        listener.stop()
+        handler.close()
+
+
+def test_record_is_formatted_once(tmp_path):
+    handler = BufferedRotatingFileHandler(tmp_path / "app.log", maxBytes=1 << 20, backupCount=1, encoding="utf-8")
+    formatter = CountingFormatter()
+    handler.setFormatter(formatter)
+    try:
+        handler.handle(logging.makeLogRecord({"msg": "hello", "levelno": logging.INFO}))
+        assert formatter.calls == 1
+    finally:
+        handler.close()
+
+
+def test_rollover_still_happens(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_module, "LOG_ROLLOVER_CHECK_BYTES", 1)
+    log_file = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(log_file, maxBytes=200, backupCount=2, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    try:
+        for i in range(20):
+            handler.handle(logging.makeLogRecord({"msg": f"line {i:02d} " + "x" * 40, "levelno": logging.INFO}))
+        handler.flush_now()
+    finally:
+        handler.close()
+    assert (tmp_path / "app.log.1").exists()
+    assert log_file.stat().st_size <= 200
@@ -0,0 +1,37 @@
+"""
+繪圖進程池的測試
+"""
+import logging
+import time
+
+import pandas as pd
+
+from app.utils.data_utils import plot_fpy_map, render_plots
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_worker_logs_are_forwarded_to_parent(tmp_path):
+    capture = CaptureHandler()
+    logger = logging.getLogger("data_utils")
+    logger.addHandler(capture)
+    try:
+        df = pd.DataFrame({'Col': [1, 2, 3], 'Row': [1, 2, 3], 'CombinedDefectType': [1, 0, 1]})
+        output_path = tmp_path / "fpy.png"
+        assert render_plots([(plot_fpy_map, df, str(output_path))]) == [True]
+        assert output_path.exists()
+        
+        # 只有繪圖進程會記錄這一行，出現在主進程的 handler 即代表已轉送
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and not any(str(output_path) in m for m in capture.messages):
+            time.sleep(0.05)
+        assert any(str(output_path) in m for m in capture.messages)
+    finally:
+        logger.removeHandler(capture)
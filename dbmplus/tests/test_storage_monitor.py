@@ -0,0 +1,40 @@
+"""
+StorageMonitor 歸檔報告寫入的測試
+"""
+import json
+
+import pytest
+
+from app.utils.storage_monitor import StorageMonitor
+
+
+@pytest.fixture
+def monitor(tmp_path, monkeypatch):
+    """報告檔寫入暫存目錄的 StorageMonitor"""
+    instance = StorageMonitor()
+    log_file = tmp_path / "archive_reports.log"
+    monkeypatch.setattr(instance, "_report_log_file", lambda: str(log_file))
+    instance.log_file = log_file
+    yield instance
+    instance.close()
+
+
+def _read_reports(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_failed_flush_keeps_pending_reports(monitor, monkeypatch):
+    monitor.add_archive_report({"files_moved": 1})
+
+    def fail():
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(monitor, "_report_log_file", fail)
+        monitor._flush_pending_reports()
+    assert len(monitor._pending_reports) == 1
+
+    monitor._flush_pending_reports()
+    assert monitor._pending_reports == []
+    assert [report["files_moved"] for report in _read_reports(monitor.log_file)] == [1]
+